@@ -24,6 +24,35 @@ class LLMConfig(BaseModel):
     role        : str = ""
     SENTIMENT_CLASSES : List = SENTIMENT_CLASSES
     TOPIC_CLASSES :     List = TOPIC_CLASSES
+
+    # 비동기 동시 호출 (gpt4o / gemini) : concurrency > 1 이면 Async caller 사용
+    concurrency : int = 1
+    rpm         : Optional[int] = None      # 분당 요청 수 제한
+    tpm         : Optional[int] = None      # 분당 토큰 수 제한 (프롬프트 길이 기반 추정 → 응답 usage 로 보정)
+    max_retries : int = 3                   # 429 / 5xx / 연결 오류 재시도 (지수 backoff)
+    api_base    : Optional[str] = None      # OpenAI 호환 엔드포인트 (로컬 mock 서버 테스트용)
+    batch_size  : int = 32                  # 라벨링 시 caller 한 번에 넘기는 텍스트 수
+    # OpenAI Batch API job 모드 (gpt4o 전용) : 요청 JSONL 제출 → polling → custom_id 로 결과 매핑
+    batch_api           : bool = False
+    batch_dir           : Optional[str] = None      # 요청 JSONL / job manifest 저장 폴더 (기본 ./outputs/llm_batches)
+    batch_poll_interval : float = 30.0              # 상태 확인 간격 (초)
+    batch_timeout       : Optional[float] = None    # 대기 상한 (초). 초과 시 에러 문자열, manifest 로 재실행 시 이어서 진행
+
+    # HF zero-shot (gpt-opensrc) : 파이프라인은 프로세스당 1회 로드 후 공유
+    zshot_model   : Optional[str] = None                  # None → MoritzLaurer/mDeBERTa-v3-base-mnli-xnli
+    zshot_backend : Literal["torch", "onnx"] = "torch"    # onnx: ONNX Runtime int8 (CPU)
+    zshot_dtype   : Optional[str] = None                  # torch backend dtype ("fp16", "bf16", ...)
+    zshot_engine  : Literal["batched", "pipeline"] = "batched"   # batched: 길이 정렬 + token budget NLI 엔진
+    zshot_token_budget : int = 8192                       # batched 엔진 forward 1회당 (배치 × 최대 길이) 상한
+
+    # 로컬 LLaMA (LlamaCaller)
+    llama_mode       : Literal["score", "generate"] = "score"   # score: "1".."K" 다음 토큰 logit 제약 채점 (생성 없음)
+    llama_batch_size : int = 16                                 # left padding 배치 크기
+    llama_prefix_cache : bool = True                            # 고정 지시문 prefix 의 KV-cache 를 (모델, task) 당 1회 계산 후 재사용
+    price_per_1m : Optional[Tuple[float, float]] = None         # (입력, 출력) USD / 1M tokens 비용 추정 단가 (None: 내장 가격표)
+
+    label_cache : Optional[str] = None      # None | "auto" | sqlite 경로 : (backend, model, 프롬프트, 텍스트) 라벨 영구 캐시
+    pack_size   : int = 1                   # 생성형(gpt4o / gemini) 요청 1건에 묶는 문장 수 (JSON 배열 출력, 실패 항목은 단건 폴백)
     
     @field_validator("max_token")
     @classmethod
@@ -32,6 +61,13 @@ class LLMConfig(BaseModel):
             raise ValueError("max token shoule be greater than ")
         
         return v
+
+    @field_validator("concurrency", "batch_size", "pack_size")
+    @classmethod
+    def _validate_positive(cls, v: int):
+        if v <= 0:
+            raise ValueError("concurrency / batch_size / pack_size should be > 0")
+        return v
     
     @classmethod
     def CLASSIFY_SENTIMENT(cls) -> "LLMConfig":
@@ -11,6 +11,7 @@ class BaseConfig(BaseModel):
     model_name: str
     finetuned: bool = False
     device: str = Field(default_factory=lambda: "cuda" if torch.cuda.is_available() else "cpu")
+    dtype: Optional[str] = None   # None → 모델 기본(fp32), "bf16" / "fp16" 지원
 
     # inference options
     batch_size: int = 2
@@ -21,6 +22,12 @@ class BaseConfig(BaseModel):
     # checkpoint path
     ckpt_path: Optional[str] = None
 
+    # inference backend (sentiment/topic): "torch" | "onnx" (ONNX Runtime CPU, int8 dynamic quantization)
+    backend: str = "torch"
+    onnx_quantize: bool = True
+    onnx_cache_dir: Optional[str] = None        # None → assets/.precomputed/onnx
+    onnx_min_agreement: float = 0.95            # fp32 대비 top-1 일치율이 이보다 낮으면 경고
+
     # optional LoRA / Delta parameters
     r: int = 8
     alpha: int = 16
@@ -28,6 +35,11 @@ class BaseConfig(BaseModel):
     delta_scale: float = 2.0
     use_cls: bool = True
 
+    # sarcasm inference mode: fused DeltaWoDense / CPU int8 / TorchScript·torch.compile
+    fuse_lora: bool = True
+    quantize_int8: bool = False
+    compile_mode: Optional[str] = None          # None | "script" | "compile"
+
     model_config = ConfigDict(extra="allow")
 
     @field_validator("batch_size")
@@ -37,6 +49,20 @@ class BaseConfig(BaseModel):
             raise ValueError("batch_size must be > 0")
         return v
 
+    @field_validator("backend")
+    @classmethod
+    def _check_backend(cls, v: str) -> str:
+        if v not in ("torch", "onnx"):
+            raise ValueError("backend must be 'torch' or 'onnx'")
+        return v
+
+    @field_validator("compile_mode")
+    @classmethod
+    def _check_compile_mode(cls, v: Optional[str]) -> Optional[str]:
+        if v not in (None, "script", "compile"):
+            raise ValueError("compile_mode must be None, 'script' or 'compile'")
+        return v
+
     @field_validator("max_length")
     @classmethod
     def _check_max_length(cls, v: int) -> int:
@@ -111,6 +137,12 @@ class DefaultModuleConfig(BaseModuleConfig):
     # suicide model (global settings)
     suicide_model: BaseConfig = BaseConfig(
         model_name="BM-K/KoSimCSE-roberta-multitask",
+        batch_size=64,       # suicide group 배치 크기 (pipeline.batch_size 대신 사용, masked pooling 이라 결과는 배치 크기와 무관)
+        max_length=128,
+        index_mode="dense",  # dense | blocked | topk | faiss (큰 keyword 어휘용, scripts/benchmark_suicide_index.py)
+        index_topk=32,
+        embedding_store=None,            # None | "auto" | sqlite 경로 : 제목 임베딩 영구 저장 (재채점 시 encoder 생략)
+        embedding_store_tokens="fp16",   # 토큰 임베딩 저장 정밀도 fp32 | fp16 | int8
         current_date="suicide_keyword_final",  # YYYY-MM
         sim_weights={
             "token_subtag": 0.5,
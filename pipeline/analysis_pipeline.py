@@ -2,13 +2,14 @@ from __future__ import annotations
 import os
 import json
 import time
-from typing import List, Dict, Literal
-from dataclasses import dataclass
+import hashlib
+from collections import deque
+from typing import Any, List, Dict, Literal, Optional, Tuple
+from dataclasses import dataclass, field
 import logging
 import pprint
 
 import torch
-from transformers import pipeline
 
 from mindcastlib.configs import BaseConfig, AnalysisConfig
 from mindcastlib.src import (
@@ -17,7 +18,18 @@ from mindcastlib.src import (
     prepare_data_with_temporal_condition, prepare_data,
     should_collapse6, macro_slices_60x6, predict_6sentiments,
 )
-from mindcastlib.src.sarc_utils import load_sarcasm_model, predict_sarcasm
+from mindcastlib.src.data_utils import (
+    collect_title_inputs, collect_comment_inputs,
+    insert_title_results, insert_comment_results,
+)
+from mindcastlib.src.analysis_utils import (
+    predict_6sentiments_encoded, predict_text_classification_encoded, concat_results,
+)
+from mindcastlib.src.sarc_utils import load_sarcasm_model, predict_sarcasm, predict_sarcasm_encoded
+from mindcastlib.src.registry_utils import ModelRegistry, get_hf_pipeline, get_onnx_pipeline
+from mindcastlib.src.checkpoint_utils import (
+    JobLedger, BatchCheckpoint, atomic_write_json, config_sha1, file_sha1,
+)
 
 Target = Literal["title", "comments"]
 Task = Literal["sentiment", "topic", "summary", "sarcasm", "suicide"]
@@ -50,6 +62,30 @@ class MCPipeSpec:
     cfg: BaseConfig
 
 
+# ============================================================
+# 🔧 tokenizer fingerprint — 같은 vocab/설정이면 토큰화 결과 공유
+# ============================================================
+_FINGERPRINTS: Dict[int, str] = {}
+
+
+def tokenizer_fingerprint(tokenizer) -> str:
+    """
+    tokenizer 클래스 + vocab + special token 구성으로 지문 생성.
+    모델 이름이 달라도(KLUE BERT 계열 등) vocab이 같으면 동일 지문 → 인코딩 공유 가능.
+    레지스트리가 tokenizer 인스턴스를 공유하므로 인스턴스별로 한 번만 계산.
+    """
+    if id(tokenizer) in _FINGERPRINTS:
+        return _FINGERPRINTS[id(tokenizer)]
+
+    h = hashlib.sha1()
+    h.update(type(tokenizer).__name__.encode("utf-8"))
+    vocab = sorted(tokenizer.get_vocab().items())
+    h.update(json.dumps(vocab, ensure_ascii=False).encode("utf-8"))
+    h.update(json.dumps(tokenizer.special_tokens_map, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    _FINGERPRINTS[id(tokenizer)] = h.hexdigest()
+    return _FINGERPRINTS[id(tokenizer)]
+
+
 # ============================================================
 # 🔧 ModuleCallable — 각 task별 호출 래퍼
 # ============================================================
@@ -67,12 +103,26 @@ class ModuleCallable:
         self.target = spec.target
         self.cfg = spec.cfg
         self.device = DEVICE_MAP.get(self.task, "cpu")
+        self.dtype = getattr(self.cfg, "dtype", None)
+        # runner 고유 배치 크기 (None 이면 pipeline.batch_size 를 따름)
+        self.batch_size: Optional[int] = None
+
+        # 모델은 ModelRegistry 로 (model, device, dtype) 당 프로세스에서 1회만 로드
 
         # ----- Sarcasm (커스텀 모델) -----
         if self.task == "sarcasm":
             print(f"[INIT] 🧠 Loading sarcasm model on {self.device}")
-            self.model, self.tokenizer = load_sarcasm_model(
-                device=self.device
+            fuse = getattr(self.cfg, "fuse_lora", True)
+            int8 = getattr(self.cfg, "quantize_int8", False)
+            compile_mode = getattr(self.cfg, "compile_mode", None)
+            self.model, self.tokenizer = ModelRegistry.get(
+                ("sarcasm", self.cfg.model_name, self.cfg.ckpt_path, self.device, self.dtype,
+                 fuse, int8, compile_mode),
+                lambda: load_sarcasm_model(
+                    device=self.device, dtype=self.dtype,
+                    fuse=fuse, quantize_int8=int8, compile_mode=compile_mode,
+                    model_name=self.cfg.model_name, ckpt_path=self.cfg.ckpt_path,
+                ),
             )
             self.pipe = None
 
@@ -94,17 +144,36 @@ class ModuleCallable:
             # 실행
             self.model = SimilaritySearchModel(suicide_dict)
             self.pipe = None
+            # 길이 정렬 micro-batch 가 pipeline 배치(32)에 막히지 않도록 cfg.batch_size 로 공급
+            self.batch_size = self.model.batch_size
 
 
         # ----- HF pipeline 계열 (sentiment/topic/summary/classifier) -----
         else:
-            device_index = int(self.device.split(":")[-1]) if "cuda" in self.device else -1
-            print(f"[INIT] ⚙️ Loading {self.task} pipeline on {self.device}")
-            self.pipe = pipeline(
-                self.HF_TASK_MAPING[self.task],
-                model=self.cfg.model_name,
-                device=device_index,
-            )
+            self.pipe = None
+            backend = getattr(self.cfg, "backend", "torch")
+            if backend == "onnx" and self.HF_TASK_MAPING[self.task] == "text-classification":
+                try:
+                    print(f"[INIT] ⚙️ Loading {self.task} ONNX Runtime backend on cpu")
+                    self.pipe = get_onnx_pipeline(
+                        self.cfg.model_name,
+                        quantize=self.cfg.onnx_quantize,
+                        cache_dir=self.cfg.onnx_cache_dir,
+                        max_length=self.cfg.max_length,
+                        min_agreement=self.cfg.onnx_min_agreement,
+                    )
+                    self.device = "cpu"
+                except ImportError as e:
+                    logging.warning(f"[INIT] ONNX backend unavailable ({e}) → torch pipeline 사용")
+
+            if self.pipe is None:
+                print(f"[INIT] ⚙️ Loading {self.task} pipeline on {self.device}")
+                self.pipe = get_hf_pipeline(
+                    self.HF_TASK_MAPING[self.task],
+                    model_name=self.cfg.model_name,
+                    device=self.device,
+                    dtype=self.dtype,
+                )
 
         # ----- sentiment 전용: 60-way → 6-way collapse 여부 -----
         self._collapse6 = False
@@ -113,67 +182,141 @@ class ModuleCallable:
             self._macro_slices = macro_slices_60x6()
             self._collapse6 = should_collapse6(self.task, self.pipe.model)
 
+        # ----- 공유 토큰화용 키 (tokenizer 지문 + 토큰화 옵션) -----
+        self.tokenizer = self._resolve_tokenizer()
+        self.encode_key = self._build_encode_key()
+
     # --------------------------------------------------------
-    # 🧩 실행 (data: Dict → Dict)
+    # 🧩 공유 토큰화 지원
+    #   - encode_key 가 같은 runner 끼리 한 번 만든 인코딩을 재사용
+    #   - encode_key 가 None 이면 (summary 등) 텍스트 경로로만 실행
     # --------------------------------------------------------
-    def __call__(self, data: Dict) -> Dict:
-        if len(data) == 0:
-            return {}
-
+    @property
+    def func_name(self) -> str:
+        if getattr(self, "_func_name", None):
+            return self._func_name     # release() 후에는 고정된 값
+        if self.task == "sarcasm":
+            return "SarcasmDetectionPipeLine"
+        if self.task == "suicide":
+            return "SuicideDetectionPipeLine"
+        if self._collapse6:
+            return "SentimentClassificationPipeLine"
+        return self.pipe.task
+
+    def release(self):
+        """
+        모델 가중치 참조 해제. target / func_name / encode_key / tokenizer 메타데이터만 유지.
+        spawn 워커 풀의 부모 프로세스처럼 실행 계획만 필요하고 추론은 하지 않는 경우용.
+        """
+        self._func_name = self.func_name
+        self.model = None
+        self.pipe = None
+
+    def _resolve_tokenizer(self):
+        if self.task == "sarcasm":
+            return self.tokenizer
+        if self.task == "suicide":
+            return self.model.tokenizer
+        if self.pipe is not None and self.pipe.task == "text-classification":
+            return self.pipe.tokenizer
+        return None
+
+    def _build_encode_key(self) -> Optional[Tuple]:
+        if self.tokenizer is None:
+            return None
+        if self.task == "sarcasm":
+            opts = (True, self.cfg.max_length)
+        elif self.task == "suicide":
+            opts = (True, self.model.max_length)   # SimilaritySearchModel._encode_titles 와 동일
+        else:
+            opts = (self.cfg.truncation, self.cfg.max_length)
+        return (tokenizer_fingerprint(self.tokenizer),) + opts
+
+    def encode(self, texts: List[str]):
+        """encode_key 에 해당하는 옵션으로 토큰화 (CPU 텐서)."""
+        _, truncation, max_length = self.encode_key
+        return self.tokenizer(
+            texts,
+            truncation=truncation,
+            max_length=max_length,
+            padding=True,
+            return_tensors="pt",
+        )
+
+    def predict_encoded(self, texts: List[str], enc) -> List[Any]:
+        """이미 토큰화된 배치로 추론. 출력 형식은 predict(texts) 와 동일."""
+        if self.task == "sarcasm":
+            return predict_sarcasm_encoded(enc, self.model, device=self.device)
+        if self.task == "suicide":
+            return self._format_suicide(self.model.predict(texts, inputs=enc))
+        if self._collapse6:
+            return predict_6sentiments_encoded(
+                enc=enc,
+                pipe=self.pipe,
+                macro_slices=self._macro_slices,
+                as_arrays=True,
+                **self.cfg.model_dump()
+            )
+        return predict_text_classification_encoded(enc, self.pipe.model)
+
+    @staticmethod
+    def _format_suicide(results: List[Dict]) -> List[Dict]:
+        """
+        SimilaritySearchModel(titles) → List[Dict]
+        Dict 내부:
+          - suicide_related: bool
+          - keyword_mask: Dict[str, bool]
+          - subtag_mask: Dict[str, bool]
+        """
+        out = []
+        for r in results:
+            out.append({
+                "suicide_related": r["suicide_related"],
+                "suicide_keyword_mask": r["keyword_mask"],
+                "suicide_subtag_mask": r["subtag_mask"],
+            })
+        return out
+
+    def predict(self, texts: List[str]) -> List[Any]:
         # ----- Sarcasm -----
         if self.task == "sarcasm":
-            def func(texts: List[str]):
-                return predict_sarcasm(
-                    texts=texts,
-                    model=self.model,
-                    tokenizer=self.tokenizer,
-                    device=self.device,
-                    max_length=self.cfg.max_length,
-                )
-            fn = "SarcasmDetectionPipeLine"
+            return predict_sarcasm(
+                texts=texts,
+                model=self.model,
+                tokenizer=self.tokenizer,
+                device=self.device,
+                max_length=self.cfg.max_length,
+            )
 
         # ----- Suicide -----
-        elif self.task == "suicide":
-            def func(texts: List[str]):
-                """
-                SimilaritySearchModel(titles) → List[Dict]
-                Dict 내부:
-                  - suicide_related: bool
-                  - keyword_mask: Dict[str, bool]
-                  - subtag_mask: Dict[str, bool]
-                """
-                results = self.model(texts)
-                out = []
-                for r in results:
-                    out.append({
-                        "suicide_related": r["suicide_related"],
-                        "suicide_keyword_mask": r["keyword_mask"],
-                        "suicide_subtag_mask": r["subtag_mask"],
-                    })
-                return out
-            fn = "SuicideDetectionPipeLine"
+        if self.task == "suicide":
+            return self._format_suicide(self.model.predict(texts))
 
         # ----- Sentiment(특수: 60-way → 6-way collapse) -----
-        elif self._collapse6:
-            def func(texts: List[str]):
-                return predict_6sentiments(
-                    texts=texts,
-                    pipe=self.pipe,
-                    macro_slices=self._macro_slices,
-                    **self.cfg.model_dump()
-                )
-            fn = "SentimentClassificationPipeLine"
+        if self._collapse6:
+            return predict_6sentiments(
+                texts=texts,
+                pipe=self.pipe,
+                macro_slices=self._macro_slices,
+                as_arrays=True,
+                **self.cfg.model_dump()
+            )
 
         # ----- 일반 HF pipeline (topic/summary/기타 sentiment) -----
-        else:
-            func = self.pipe
-            fn = self.pipe.task
+        return self.pipe(texts)
+
+    # --------------------------------------------------------
+    # 🧩 실행 (data: Dict → Dict)
+    # --------------------------------------------------------
+    def __call__(self, data: Dict) -> Dict:
+        if len(data) == 0:
+            return {}
 
         # ----- title / comments 에 적용 -----
         if self.target == "title":
-            return apply_func_to_title(func=func, func_name=fn, data=data)
+            return apply_func_to_title(func=self.predict, func_name=self.func_name, data=data)
         elif self.target == "comments":
-            return apply_func_to_comments(func=func, func_name=fn, data=data)
+            return apply_func_to_comments(func=self.predict, func_name=self.func_name, data=data)
         return data
 
 
@@ -184,6 +327,82 @@ def build_task_callable(task: Task, target: Target, cfg: BaseConfig) -> ModuleCa
     return ModuleCallable(MCPipeSpec(task=task, target=target, cfg=cfg))
 
 
+# ============================================================
+# 🔧 공유 실행 계획 — target별 1회 추출, tokenizer별 1회 토큰화
+# ============================================================
+_COLLECT = {"title": collect_title_inputs, "comments": collect_comment_inputs}
+_INSERT = {"title": insert_title_results, "comments": insert_comment_results}
+
+
+@dataclass
+class EncodingGroup:
+    """같은 target + 같은 encode_key 를 쓰는 runner 묶음 (key=None 이면 텍스트 경로)."""
+    target: Target
+    encode_key: Optional[Tuple]
+    runners: Dict[str, ModuleCallable] = field(default_factory=dict)
+
+    def resolve_batch_size(self, default: int) -> int:
+        """runner 가 배치 크기를 지정했으면 그중 최솟값, 아니면 pipeline 기본값."""
+        sizes = [r.batch_size for r in self.runners.values() if getattr(r, "batch_size", None)]
+        return min(sizes) if sizes else default
+
+
+def build_execution_plan(runners: Dict[str, ModuleCallable]) -> Dict[str, List[EncodingGroup]]:
+    """runner 들을 target → encode_key 순으로 묶는다. (runner 등록 순서 유지)"""
+    plan: Dict[str, List[EncodingGroup]] = {}
+    for key, runner in runners.items():
+        groups = plan.setdefault(runner.target, [])
+        group = None
+        if runner.encode_key is not None:
+            group = next((g for g in groups if g.encode_key == runner.encode_key), None)
+        if group is None:
+            group = EncodingGroup(target=runner.target, encode_key=runner.encode_key)
+            groups.append(group)
+        group.runners[key] = runner
+    return plan
+
+
+def run_group_batch(group: EncodingGroup, batch: List[str]) -> Dict[str, List[Any]]:
+    """group 하나에 대해 배치 1개 실행. 토큰화는 group 당 1회, 결과는 runner key 별로 반환."""
+    if group.encode_key is None:
+        return {key: runner.predict(batch) for key, runner in group.runners.items()}
+
+    first = next(iter(group.runners.values()))
+    enc = first.encode(batch)
+    return {key: runner.predict_encoded(batch, enc) for key, runner in group.runners.items()}
+
+
+def run_execution_plan(
+    plan: Dict[str, List[EncodingGroup]],
+    data: Dict,
+    batch_size: int = 32,
+    monitoring: bool = False,
+) -> Dict[str, List[Any]]:
+    """
+    target 텍스트를 한 번만 추출하고, 배치마다 group 당 한 번만 토큰화해
+    group 내 모든 runner 에 같은 인코딩을 전달한다. 반환: runner key → 결과 리스트.
+    """
+    results: Dict[str, List[Any]] = {}
+    for target, groups in plan.items():
+        texts = _COLLECT[target](data)
+        for group in groups:
+            if monitoring:
+                names = ", ".join(group.runners)
+                mode = "shared-encoding" if group.encode_key is not None else "text"
+                logging.info(f"[RUN] {target} x{len(texts)} ({mode}) → {names}")
+            chunks: Dict[str, List[Any]] = {key: [] for key in group.runners}
+            bs = group.resolve_batch_size(batch_size)
+            for i in range(0, len(texts), bs):
+                batch_out = run_group_batch(group, texts[i:i + bs])
+                for key, out in batch_out.items():
+                    chunks[key].append(out)
+
+            # 60→6 감정 결과는 배열째로 합치고 dict 변환은 insert 시점에만
+            for key, cs in chunks.items():
+                results[key] = concat_results(cs)
+    return results
+
+
 # ============================================================
 # 🧩 메인 AnalysisPipeLine
 # ============================================================
@@ -195,12 +414,16 @@ class AnalysisPipeLine:
         monitoring: bool = True,
         save: bool = True,
         save_dir: str | None = None,
+        shared_encoding: bool = True,
+        batch_size: int = 32,
     ):
         self.cfg = analysis_config
         self.realtime = realtime
         self.monitoring = monitoring
         self.save = save
         self.save_dir = save_dir or "./outputs"
+        self.shared_encoding = shared_encoding
+        self.batch_size = batch_size
         os.makedirs(self.save_dir, exist_ok=True)
 
         if self.cfg is None:
@@ -267,22 +490,33 @@ class AnalysisPipeLine:
         else:
             logging.info("suicide excluded!")
 
+    def release_models(self):
+        """모든 runner 의 가중치 해제 + ModelRegistry 비우기 (spawn 워커 풀 부모용, 이후 run() 불가)."""
+        import gc
+        for runner in self.runners.values():
+            runner.release()
+        ModelRegistry.clear()
+        gc.collect()
+
     # --------------------------------------------------------
     # 🧩 실행
     # --------------------------------------------------------
-    def run(self, data: Dict) -> Dict:
+    def run(self, data: Dict, out_path: str | None = None) -> Dict:
         t0 = time.time()
-        for key, runner in self.runners.items():
-            if self.monitoring:
-                logging.info(f"[RUN] executing runner: {key}")
-                print(f" → Using device: {runner.device}")
-            data = runner(data)
+        if self.shared_encoding:
+            data = self._run_shared(data)
+        else:
+            for key, runner in self.runners.items():
+                if self.monitoring:
+                    logging.info(f"[RUN] executing runner: {key}")
+                    print(f" → Using device: {runner.device}")
+                data = runner(data)
 
         if self.save:
-            ts = time.strftime("%Y%m%d_%H%M%S")
-            out_path = os.path.join(self.save_dir, f"infer_{ts}.json")
-            with open(out_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            if out_path is None:
+                ts = time.strftime("%Y%m%d_%H%M%S")
+                out_path = os.path.join(self.save_dir, f"infer_{ts}.json")
+            atomic_write_json(out_path, data)
             if self.monitoring:
                 logging.info(f"[Inference] saved to {out_path}")
 
@@ -292,6 +526,372 @@ class AnalysisPipeLine:
         return data
 
 
+    # --------------------------------------------------------
+    # 🧩 공유 토큰화 실행 (target 1회 추출 / tokenizer 1회 토큰화)
+    # --------------------------------------------------------
+    def _run_shared(self, data: Dict) -> Dict:
+        if len(data) == 0:
+            return {}
+
+        plan = build_execution_plan(self.runners)
+        results = run_execution_plan(
+            plan, data, batch_size=self.batch_size, monitoring=self.monitoring
+        )
+
+        # runner 등록 순서대로 삽입 → analyses 키 순서는 순차 실행과 동일
+        for key, runner in self.runners.items():
+            _INSERT[runner.target](data, runner.func_name, results[key])
+        return data
+
+
+# ============================================================
+# 🧩 InferenceWorkerPool — CPU 멀티 프로세스 추론
+#   - 워커 N개, 워커마다 intra-op 스레드 수 고정 (+ 코어 pinning)
+#   - spawn: 워커마다 자기 모델 복사본 로드
+#   - fork : 부모가 로드한 모델을 상속 (가중치는 copy-on-write 로 공유)
+#            단, 부모에서 torch/OpenMP 스레드가 이미 떠 있으면 fork 후 deadlock 위험 → 경고
+#   - spawn 으로 쓸 때는 부모 pipeline 의 가중치를 release_models() 로 해제 (부모는 실행 계획만 필요)
+#   - 작업 단위는 (group index, 텍스트 배치) → runner key 별 결과
+# ============================================================
+_WORKER: Dict[str, Any] = {}
+
+
+def _pool_worker_init(cfg_json: str, threads: int, pin: bool, rank_counter, pipe_kwargs: Dict):
+    with rank_counter.get_lock():
+        rank = rank_counter.value
+        rank_counter.value += 1
+
+    if pin and hasattr(os, "sched_setaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+        mine = cores[rank * threads:(rank + 1) * threads]
+        if mine:
+            os.sched_setaffinity(0, mine)
+
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # fork 로 상속된 경우 이미 초기화됨
+
+    pipe = _WORKER.get("pipeline")
+    if pipe is None:
+        pipe = AnalysisPipeLine(
+            analysis_config=AnalysisConfig.model_validate_json(cfg_json),
+            monitoring=False,
+            save=False,
+            **pipe_kwargs,
+        )
+    _WORKER["groups"] = [g for gs in build_execution_plan(pipe.runners).values() for g in gs]
+    _WORKER["rank"] = rank
+
+
+def _pool_worker_run(group_index: int, batch: List[str]) -> Dict[str, List[Any]]:
+    return run_group_batch(_WORKER["groups"][group_index], batch)
+
+
+class InferenceWorkerPool:
+    """
+    CorpusAnalysisEngine 의 배치를 여러 프로세스로 분산.
+    group index 는 같은 config 로 만든 plan 에서 동일하므로 워커 쪽 group 과 1:1 대응.
+    """
+
+    def __init__(
+        self,
+        pipeline: AnalysisPipeLine,
+        num_workers: int,
+        threads_per_worker: int | None = None,
+        start_method: Literal["spawn", "fork"] = "spawn",
+        pin_threads: bool = True,
+        max_inflight: int | None = None,
+    ):
+        import multiprocessing as mp
+        from concurrent.futures import ProcessPoolExecutor
+
+        if num_workers <= 0:
+            raise ValueError("num_workers must be > 0")
+        if any("cuda" in r.device for r in pipeline.runners.values()):
+            logging.warning("[Pool] CUDA runner detected — worker pool is intended for CPU-only nodes")
+
+        n_cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker or max(1, n_cores // num_workers)
+        self.max_inflight = max_inflight or 2 * num_workers
+
+        ctx = mp.get_context(start_method)
+        if start_method == "fork" and torch.get_num_threads() > 1:
+            logging.warning(
+                f"[Pool] fork with {torch.get_num_threads()} torch threads already initialized in the parent "
+                "— OpenMP 스레드 풀이 상속되어 워커가 멈출 수 있음. spawn 사용 권장"
+            )
+        if start_method == "fork":
+            _WORKER["pipeline"] = pipeline   # 자식 프로세스가 그대로 상속
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=ctx,
+            initializer=_pool_worker_init,
+            initargs=(
+                pipeline.cfg.model_dump_json(),
+                self.threads_per_worker,
+                pin_threads,
+                ctx.Value("i", 0),
+                {
+                    "save_dir": pipeline.save_dir,
+                    "shared_encoding": pipeline.shared_encoding,
+                    "batch_size": pipeline.batch_size,
+                },
+            ),
+        )
+        logging.info(
+            f"[Pool] {num_workers} workers x {self.threads_per_worker} threads ({start_method})"
+        )
+
+    def submit(self, group_index: int, batch: List[str]):
+        return self._executor.submit(_pool_worker_run, group_index, batch)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+        _WORKER.pop("pipeline", None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+# ============================================================
+# 🧩 CorpusAnalysisEngine — 여러 입력 파일을 공유 배치로 처리
+#   - 파일 경계를 넘어 batch_size 단위로 추론 (작은 파일도 배치를 꽉 채움)
+#   - 각 텍스트는 (file_id, index) provenance 로 추적
+#   - 파일의 모든 텍스트 결과가 모이면 그 파일만 즉시 저장 후 메모리에서 해제
+# ============================================================
+@dataclass
+class _FileState:
+    input_path: str
+    output_path: str
+    data: Dict
+    results: Dict[str, List[Any]]   # runner key → 결과 (collect 순서)
+    pending: int = 0                # 아직 결과가 안 나온 (group, text) 개수
+    input_hash: str | None = None
+    ckpt: BatchCheckpoint | None = None
+
+
+class CorpusAnalysisEngine:
+    def __init__(
+        self,
+        pipeline: AnalysisPipeLine,
+        batch_size: int | None = None,
+        monitoring: bool = True,
+        pool: "InferenceWorkerPool | None" = None,
+        ledger: JobLedger | None = None,
+        skip_completed: bool = True,
+        checkpoint: bool = False,
+    ):
+        self.pipeline = pipeline
+        self.batch_size = batch_size or pipeline.batch_size
+        self.monitoring = monitoring
+        self.pool = pool
+        # ledger: 완료된 (입력 해시, config 해시) 건너뛰기 / checkpoint: 파일별 배치 결과 누적 후 재개
+        self.ledger = ledger
+        self.skip_completed = skip_completed
+        self.checkpoint = checkpoint
+        self.config_hash = config_sha1(pipeline.cfg)
+        self.plan = build_execution_plan(pipeline.runners)
+        self.groups: List[EncodingGroup] = [g for gs in self.plan.values() for g in gs]
+        self._group_bs = [g.resolve_batch_size(self.batch_size) for g in self.groups]
+
+    # --------------------------------------------------------
+    def run(self, jobs: List[Tuple[str, str]]) -> List[str]:
+        """
+        jobs: [(input_json, output_json), ...]
+        반환: 저장에 성공한 output 경로 리스트
+        """
+        t0 = time.time()
+        self._files: Dict[int, _FileState] = {}
+        self._queues: List[deque] = [deque() for _ in self.groups]
+        self._inflight: deque = deque()   # pool 모드: (items, future)
+        self._done: List[str] = []
+        n_texts = 0
+        n_skipped = 0
+
+        for file_id, (input_path, output_path) in enumerate(jobs):
+            input_hash = None
+            if self.ledger is not None or self.checkpoint:
+                try:
+                    input_hash = file_sha1(input_path)
+                except OSError as e:
+                    print(f"❌ Error: {input_path}: {e}")
+                    continue
+            if (
+                self.ledger is not None and self.skip_completed
+                and self.ledger.is_complete(input_path, input_hash, self.config_hash)
+            ):
+                print(f"⏭️ Skip (completed): {input_path}")
+                n_skipped += 1
+                continue
+            n_texts += self._register(file_id, input_path, output_path, input_hash)
+
+            # 가득 찬 배치는 바로 처리 (파일 경계와 무관)
+            for gi in range(len(self.groups)):
+                while len(self._queues[gi]) >= self._group_bs[gi]:
+                    self._flush(gi)
+
+        # 남은 부분 배치 처리
+        for gi in range(len(self.groups)):
+            while self._queues[gi]:
+                self._flush(gi)
+        while self._inflight:
+            self._drain_one()
+
+        if self.monitoring:
+            logging.info(
+                f"[Corpus] {len(self._done)}/{len(jobs)} files ({n_skipped} skipped), "
+                f"{n_texts} texts in {time.time() - t0:.2f}s"
+            )
+        return self._done
+
+    # --------------------------------------------------------
+    def _register(self, file_id: int, input_path: str, output_path: str, input_hash: str | None = None) -> int:
+        try:
+            with open(input_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"❌ Error: {input_path}: {e}")
+            return 0
+
+        state = _FileState(
+            input_path=input_path, output_path=output_path, data=data, results={}, input_hash=input_hash,
+        )
+
+        # 체크포인트: 이전 실행에서 끝난 (group, index) 는 다시 큐에 넣지 않음
+        done_idx: Dict[int, set] = {}
+        if self.checkpoint:
+            state.ckpt = BatchCheckpoint(
+                f"{output_path}.ckpt.jsonl",
+                header={"input_hash": input_hash, "config_hash": self.config_hash},
+            )
+            records = state.ckpt.load()
+            for rec in records:
+                done_idx.setdefault(rec["group"], set()).update(rec["idx"])
+            if records:
+                print(f"↩️ Resume: {input_path} ({len(records)} checkpointed batches)")
+
+        n_texts = 0
+        for target, groups in self.plan.items():
+            texts = _COLLECT[target](data)
+            n_texts += len(texts)
+            for group in groups:
+                gi = self.groups.index(group)
+                for key in group.runners:
+                    state.results[key] = [None] * len(texts)
+                todo = [(file_id, i, t) for i, t in enumerate(texts) if i not in done_idx.get(gi, ())]
+                self._queues[gi].extend(todo)
+                state.pending += len(todo)
+
+        if self.checkpoint:
+            for rec in records:
+                for key, outs in rec["results"].items():
+                    for i, r in zip(rec["idx"], outs):
+                        state.results[key][i] = r
+
+        self._files[file_id] = state
+        if state.pending == 0:
+            self._finalize(file_id)
+        return n_texts
+
+    # --------------------------------------------------------
+    def _flush(self, gi: int):
+        queue = self._queues[gi]
+        items = [queue.popleft() for _ in range(min(self._group_bs[gi], len(queue)))]
+        # 이미 실패 처리된 파일의 텍스트는 건너뜀
+        items = [it for it in items if it[0] in self._files]
+        if not items:
+            return
+        texts = [t for _, _, t in items]
+
+        if self.pool is None:
+            try:
+                batch_out = run_group_batch(self.groups[gi], texts)
+            except Exception as e:
+                self._fail(items, e)
+                return
+            self._apply(gi, items, batch_out)
+            return
+
+        # pool 모드: 워커에 제출하고 in-flight 개수만 제한
+        self._inflight.append((gi, items, self.pool.submit(gi, texts)))
+        while len(self._inflight) >= self.pool.max_inflight:
+            self._drain_one()
+
+    def _drain_one(self):
+        gi, items, fut = self._inflight.popleft()
+        try:
+            batch_out = fut.result()
+        except Exception as e:
+            self._fail(items, e)
+            return
+        self._apply(gi, items, batch_out)
+
+    def _fail(self, items, e: Exception):
+        for fid in sorted({fid for fid, _, _ in items}):
+            self._fail_file(fid, e)
+
+    def _fail_file(self, fid: int, e: Exception):
+        if fid in self._files:
+            print(f"❌ Error: {self._files[fid].input_path}: {e}")
+            state = self._files.pop(fid)
+            if state.ckpt is not None:
+                state.ckpt.close()   # 체크포인트는 남겨서 다음 실행에서 재개
+
+    def _apply(self, gi: int, items, batch_out: Dict[str, List[Any]]):
+        # pool 모드에서는 제출 후 같은 파일의 다른 배치가 실패했을 수 있음
+        per_file: Dict[int, List[int]] = {}
+        for j, (fid, _, _) in enumerate(items):
+            if fid in self._files:
+                per_file.setdefault(fid, []).append(j)
+
+        for fid, js in per_file.items():
+            state = self._files[fid]
+            for key, outs in batch_out.items():
+                for j in js:
+                    state.results[key][items[j][1]] = outs[j]
+            state.pending -= len(js)
+
+            if state.ckpt is not None:
+                state.ckpt.append({
+                    "group": gi,
+                    "idx": [items[j][1] for j in js],
+                    "results": {key: [outs[j] for j in js] for key, outs in batch_out.items()},
+                })
+
+        for fid in sorted(per_file):
+            if self._files[fid].pending == 0:
+                self._finalize(fid)
+
+    # --------------------------------------------------------
+    def _finalize(self, file_id: int):
+        state = self._files[file_id]
+        data = state.data
+        # 결과 삽입/저장/원장 기록 실패는 이 파일만 실패 처리 (다른 파일은 계속 진행)
+        try:
+            for key, runner in self.pipeline.runners.items():
+                _INSERT[runner.target](data, runner.func_name, state.results[key])
+
+            atomic_write_json(state.output_path, data)
+            if self.ledger is not None:
+                self.ledger.record(state.input_path, state.input_hash, self.config_hash, state.output_path)
+        except Exception as e:
+            self._fail_file(file_id, e)
+            return
+
+        self._files.pop(file_id)
+        if state.ckpt is not None:
+            state.ckpt.remove()
+        self._done.append(state.output_path)
+        print(f"✅ Done: {state.input_path} → {state.output_path}")
+
+
 # ============================================================
 # 🧪 Test Entry
 # ============================================================
@@ -11,12 +11,21 @@ import torch
 
 from mindcastlib.configs import LabelingConfig
 from mindcastlib.src import apply_func_to_title, apply_func_to_comments, extract_titles, extract_comments, prepare_data_with_temporal_condition, prepare_data
+from mindcastlib.src.data_utils import (
+    collect_title_inputs, collect_comment_inputs, insert_title_results, insert_comment_results,
+)
 from mindcastlib.src import LLMPipeLine, prompt_and_save_if_missing, load_api_keys
+from mindcastlib.src.llm_metrics_utils import merge_metrics, is_error_label
+from mindcastlib.src.llm_cache_utils import is_cacheable
+from mindcastlib.src.checkpoint_utils import BatchCheckpoint, atomic_write_json, config_sha1, file_sha1
 
 
 Target = Literal["title", "comments"]
 Task = Literal["sentiment", "topic"]
 
+_COLLECT = {"title": collect_title_inputs, "comments": collect_comment_inputs}
+_INSERT = {"title": insert_title_results, "comments": insert_comment_results}
+
 
 @dataclass
 class MCLabelSpec:
@@ -39,10 +48,14 @@ class ModuleCallable:
         if len(data) == 0:
             return {}
         
+        batch_size = getattr(self.cfg, "batch_size", 32)
+        if self.pipe.whole_input:
+            # Batch API 는 전체 입력을 한 job 으로 제출, 동시 요청 caller 는 semaphore 가 동시성을 제한
+            batch_size = max(1, len(_COLLECT[self.target](data)))
         if self.target == "title":
-            return apply_func_to_title(func = self.pipe, data = data)
+            return apply_func_to_title(func = self.pipe, data = data, batch_size = batch_size)
         elif self.target == "comments":
-            return apply_func_to_comments(func = self.pipe, data = data)
+            return apply_func_to_comments(func = self.pipe, data = data, batch_size = batch_size)
         
         return data
     
@@ -99,24 +112,151 @@ class LabelingPipeLine:
             logging.info("topic excluded!")
             
             
+    def metrics_report(self, elapsed: float) -> Dict:
+        """runner 별 / backend 별 요청·토큰·지연·재시도·에러·추정 비용 요약."""
+        runners = {key: runner.pipe.metrics_summary() for key, runner in self.runners.items()}
+        by_backend: Dict[str, list] = {}
+        for runner in self.runners.values():
+            pipe = runner.pipe
+            by_backend.setdefault(pipe.backend, []).append(
+                (pipe._caller.metrics, pipe._caller.model_id, getattr(pipe.cfg, "price_per_1m", None))
+            )
+        return {
+            "total_seconds": round(elapsed, 3),
+            "runners": runners,
+            "backends": {backend: merge_metrics(parts) for backend, parts in by_backend.items()},
+        }
+
+    def close(self) -> None:
+        """runner 별 caller 자원(비동기 client / 이벤트 루프) 정리. 다음 run 에서 다시 생성됨."""
+        for runner in self.runners.values():
+            runner.pipe.close()
+
     def run(self, data:Dict) -> Dict:
         t0 = time.time()
-        for key, runner in self.runners.items():
-            if self.monitoring:
-                logging.info(f"[RUN] executing runner: {key}")
-            data = runner(data)
+        try:
+            for key, runner in self.runners.items():
+                if self.monitoring:
+                    logging.info(f"[RUN] executing runner: {key}")
+                data = runner(data)
+        finally:
+            self.close()
+
+        self._finish(data, t0)
+        return data
+
+    def _finish(self, data: Dict, t0: float) -> str | None:
+        """metrics 로그 + labeling_<ts>.json / .metrics.json 저장. 저장 경로 반환."""
+        out_path = None
+        self.last_metrics = self.metrics_report(time.time() - t0)
+        if self.monitoring:
+            for key, runner in self.runners.items():
+                stats = runner.pipe.cache_stats()
+                if stats:
+                    logging.info(f"[Cache] {key}: {stats}")
+            for backend, m in self.last_metrics["backends"].items():
+                logging.info(
+                    f"[Metrics] {backend}: items={m['items']} requests={m['requests']} "
+                    f"retries={m['retries']} error_rate={m['error_rate']:.2%} "
+                    f"tokens={m['input_tokens']}/{m['output_tokens']} p50={m['latency_ms']['p50']}ms "
+                    f"p99={m['latency_ms']['p99']}ms cost=${m['est_cost_usd']}"
+                )
             
         if self.save:
             ts = time.strftime("%Y%m%d_%H%M%S")
             out_path = os.path.join(self.save_dir, f"labeling_{ts}.json")
             with open(out_path, "w", encoding="utf-8") as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            # 실행 요약은 같은 이름의 .metrics.json 으로 옆에 저장
+            metrics_path = os.path.join(self.save_dir, f"labeling_{ts}.metrics.json")
+            atomic_write_json(metrics_path, self.last_metrics)
             if self.monitoring:
-                logging.info(f"[Labeling] saved to {out_path}")
+                logging.info(f"[Labeling] saved to {out_path} (+ {os.path.basename(metrics_path)})")
 
         if self.monitoring:
             logging.info(f"[RUN] done in {time.time() - t0:.2f}s")
+        return out_path
 
+    # --------------------------------------------------------
+    # 🌊 streaming + checkpoint 모드
+    #  - runner 별 입력을 chunk_size 단위로 라벨링하고, chunk 가 끝날 때마다 성공한 라벨을
+    #    BatchCheckpoint(JSONL) 에 추가 → 중단(쿼터 소진, 프로세스 종료) 후 재실행하면 남은 항목만 호출
+    #  - 에러 라벨("[... 오류: ...]")과 파싱 실패("")는 기록하지 않으므로 재실행 시 다시 시도 (라벨 캐시와 같은 기준)
+    #  - 마지막이 아닌 chunk 전체가 에러면(쿼터/인증/연결 실패) 더 진행해도 소용없으므로 중단 (체크포인트 유지)
+    #  - 최종 문서는 모든 runner 가 끝난 뒤 한 번만 조립/저장
+    # --------------------------------------------------------
+    def run_streaming(
+        self,
+        data: Dict | str,
+        chunk_size: int = 1000,
+        checkpoint_path: str | None = None,
+    ) -> Dict:
+        """
+        data: 로드된 dict 또는 news_comments.json 경로
+        checkpoint_path: 기본 <save_dir>/labeling_<입력 해시>.ckpt.jsonl (같은 입력 + config 면 이어서 진행)
+        """
+        t0 = time.time()
+        if isinstance(data, str):
+            input_hash = file_sha1(data)
+            with open(data, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        else:
+            input_hash = config_sha1(data)
+
+        ckpt = BatchCheckpoint(
+            checkpoint_path or os.path.join(self.save_dir, f"labeling_{input_hash[:16]}.ckpt.jsonl"),
+            header={"input_hash": input_hash, "config_hash": config_sha1(self.cfg)},
+        )
+        records = ckpt.load()
+        if records and self.monitoring:
+            logging.info(f"[Checkpoint] resume from {ckpt.path} ({len(records)} chunks)")
+
+        results: Dict[str, List] = {}
+        n_errors = 0
+        try:
+            for key, runner in self.runners.items():
+                texts = _COLLECT[runner.target](data)
+                labels: List = [None] * len(texts)
+                for rec in records:
+                    if rec["runner"] == key:
+                        for i, lb in zip(rec["idx"], rec["labels"]):
+                            labels[i] = lb
+                todo = [i for i, lb in enumerate(labels) if lb is None]
+                if self.monitoring:
+                    logging.info(f"[Stream] {key}: {len(texts) - len(todo)}/{len(texts)} checkpointed, {len(todo)} to label")
+
+                for start in range(0, len(todo), chunk_size):
+                    idx = todo[start:start + chunk_size]
+                    outs = runner.pipe([texts[i] for i in idx])
+                    ok = [(i, lb) for i, lb in zip(idx, outs) if is_cacheable(lb)]
+                    for i, lb in zip(idx, outs):
+                        labels[i] = lb
+                    if ok:
+                        ckpt.append({"runner": key, "idx": [i for i, _ in ok], "labels": [lb for _, lb in ok]})
+                    if start + chunk_size < len(todo) and all(is_error_label(lb) for lb in outs):
+                        raise RuntimeError(f"{key}: chunk 전체 실패 ({outs[0]})")
+                    n_errors += len(idx) - len(ok)
+                    if self.monitoring:
+                        logging.info(f"[Stream] {key}: {start + len(idx)}/{len(todo)} (retry later {len(idx) - len(ok)})")
+                results[key] = labels
+        except Exception as e:
+            ckpt.close()
+            logging.error(f"❌ [Stream] stopped: {e} → 재실행하면 {ckpt.path} 에서 이어서 진행")
+            raise
+        finally:
+            self.close()
+
+        # 최종 문서 조립 (apply_func_to_* 와 같은 analyses key)
+        for key, runner in self.runners.items():
+            _INSERT[runner.target](data, runner.pipe.__class__.__name__, results[key])
+        self._finish(data, t0)
+
+        if n_errors:
+            # 에러 / 빈 라벨 항목이 남아 있으면 체크포인트를 유지 → 재실행 시 그 항목만 다시 호출
+            ckpt.close()
+            logging.warning(f"[Stream] {n_errors} error/empty labels kept for retry ← {ckpt.path}")
+        else:
+            ckpt.remove()
         return data
     
     
@@ -0,0 +1,78 @@
+# ============================================================
+# 📦 scripts/benchmark_prompt_packing.py
+#  - 생성형 라벨링(gpt4o / gemini)의 pack_size 별 요청 수·프롬프트 길이·시간 비교
+#  - 단건 모드(pack_size=1) 결과 대비 라벨 일치율, --gold 가 있으면 정확도까지 측정
+#  - 실제 API 를 호출하므로 --limit 으로 소량 샘플만 사용할 것
+#
+# 사용 예:
+#   python -m mindcastlib.scripts.benchmark_prompt_packing \
+#       --input news_comments.json --target comments --task sentiment --llm gemini --pack_sizes 5 10 20
+# ============================================================
+
+from __future__ import annotations
+import json
+import argparse
+from typing import List
+
+from mindcastlib.configs import LLMConfig
+from mindcastlib.src.data_utils import collect_title_inputs, collect_comment_inputs
+from mindcastlib.src.llm_utils import load_api_keys, measure_pack_parity
+
+
+SAMPLE_TEXTS = [
+    "나 오늘 너무 행복해",
+    "짜증난다 진짜",
+    "앞으로 어떻게 될지 너무 불안하네요",
+    "그 말에 상처받았어요",
+    "갑자기 이런 일이 생겨서 당황스럽다",
+    "너무 슬퍼서 눈물이 난다",
+    "코스피 사흘 만에 반등… 외국인 순매수",
+    "국회 본회의서 예산안 처리 무산",
+    "신형 스마트폰 공개, 인공지능 기능 강화",
+    "손흥민 시즌 10호골 폭발",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="LLM prompt packing parity benchmark")
+    parser.add_argument("--input", type=str, default=None, help="news_comments.json (없으면 샘플 문장)")
+    parser.add_argument("--target", type=str, default="comments", choices=["title", "comments"])
+    parser.add_argument("--task", type=str, default="sentiment", choices=["sentiment", "topic"])
+    parser.add_argument("--llm", type=str, default="gemini", choices=["gpt4o", "gemini"])
+    parser.add_argument("--pack_sizes", type=int, nargs="+", default=[5, 10])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--gold", type=str, default=None, help="입력 순서와 같은 정답 라벨 JSON 리스트 (선택)")
+    parser.add_argument("--env", type=str, default="mindcast.env")
+    return parser.parse_args()
+
+
+def load_texts(path: str | None, target: str) -> List[str]:
+    if path is None:
+        return list(SAMPLE_TEXTS)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return collect_title_inputs(data) if target == "title" else collect_comment_inputs(data)
+
+
+def main():
+    args = parse_args()
+    load_api_keys(args.env)
+
+    texts = load_texts(args.input, args.target)[:args.limit]
+    trues = None
+    if args.gold:
+        with open(args.gold, "r", encoding="utf-8") as f:
+            trues = json.load(f)[:len(texts)]
+
+    cfg = LLMConfig.CLASSIFY_SENTIMENT() if args.task == "sentiment" else LLMConfig.CLASSIFY_TOPIC()
+    cfg.llm_name = args.llm
+    cfg.concurrency = args.concurrency
+
+    print(f"[Bench] {len(texts)} texts, llm={args.llm}, task={args.task}, pack_sizes={args.pack_sizes}")
+    for row in measure_pack_parity(cfg, texts, tuple(args.pack_sizes), trues=trues):
+        print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# ============================================================
+# 📦 scripts/benchmark_suicide_index.py
+#  - SimilaritySearchModel 의 index_mode(dense/blocked/topk/faiss) 속도·정확도 비교
+#  - 정확도: dense(정확) 대비 재계산된 token×subtag 유사도 오차, 재계산 비율(rescored),
+#            suicide_related / keyword_mask 일치율
+#  - --synthetic_vocab : subtag 임베딩을 노이즈 복제해 큰 어휘(M)에서의 token×subtag 단계만 측정
+# ============================================================
+
+from __future__ import annotations
+import os
+import json
+import time
+import argparse
+from typing import Dict, List
+
+import torch
+import torch.nn.functional as F
+
+from mindcastlib.configs import DefaultModuleConfig
+from mindcastlib.src.data_utils import collect_title_inputs
+from mindcastlib.src.suicide_utils import SimilaritySearchModel, INDEX_MODES, SUBTAG_FLOOR
+
+
+SAMPLE_TITLES = [
+    "청년 실업률이 급증하고 있다",
+    "주식 시장이 상승 중이다",
+    "가계부채와 빚 문제가 심각하다",
+    "구직 단념자 역대 최대… 쉬었음 청년 늘어",
+    "소비자물가 3%대 상승, 서민 부담 커져",
+    "국회 본회의서 예산안 처리 무산",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Suicide index mode benchmark")
+    parser.add_argument("--input", type=str, default=None, help="news_comments.json (없으면 샘플 제목)")
+    parser.add_argument("--modes", type=str, nargs="+", default=list(INDEX_MODES), choices=list(INDEX_MODES))
+    parser.add_argument("--topk", type=int, default=32)
+    parser.add_argument("--block_size", type=int, default=1024)
+    parser.add_argument("--batch_size", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--synthetic_vocab", type=int, nargs="*", default=[],
+                        help="예: 10000 100000 → 해당 크기의 가상 subtag 어휘로 token×subtag 단계만 측정")
+    return parser.parse_args()
+
+
+def load_titles(path: str | None) -> List[str]:
+    if path is None:
+        return SAMPLE_TITLES * 32
+    with open(path, "r", encoding="utf-8") as f:
+        return collect_title_inputs(json.load(f))
+
+
+def _timeit(fn, repeats: int) -> float:
+    fn()  # warmup (faiss/allocator)
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - t0) / repeats * 1000
+
+
+def _encode(model: SimilaritySearchModel, titles: List[str]):
+    token_emb, _, attn_mask = model._encode_titles(titles)
+    return F.normalize(token_emb, dim=-1), attn_mask
+
+
+def _diff(approx: torch.Tensor, exact: torch.Tensor) -> Dict:
+    """topk/faiss 는 후보 keyword 만 정확히 재계산하고 나머지는 SUBTAG_FLOOR → 재계산된 값의 오차와 비율."""
+    rescored = approx > SUBTAG_FLOOR
+    diff = (approx.float() - exact.float()).abs()[rescored]
+    return {
+        "rescored": round(float(rescored.float().mean()), 4),
+        "max_abs_diff": round(float(diff.max()), 6) if diff.numel() else 0.0,
+    }
+
+
+def bench_modes(model: SimilaritySearchModel, titles: List[str], modes: List[str], repeats: int) -> List[Dict]:
+    """실제 어휘로 전체 predict + token×subtag 단계 비교."""
+    token_norm, attn_mask = _encode(model, titles[:model.batch_size])
+    exact = model._token_subtag_max(token_norm, attn_mask, mode="dense")
+
+    base_mode = model.index_mode
+    model.index_mode = "dense"
+    ref = model.predict(titles)
+
+    rows = []
+    for mode in modes:
+        if mode == "faiss" and model.faiss_index is None:
+            print("[Bench] faiss index 없음 → skip")
+            continue
+        model.index_mode = mode
+        approx = model._token_subtag_max(token_norm, attn_mask)
+        t_step = _timeit(lambda: model._token_subtag_max(token_norm, attn_mask), repeats)
+        t_all = _timeit(lambda: model.predict(titles), 1)
+        out = model.predict(titles)
+        rows.append({
+            "mode": model.index_mode,
+            "token_subtag_ms": round(t_step, 2),
+            "predict_ms": round(t_all, 1),
+            **_diff(approx, exact),
+            "related_agree": sum(a["suicide_related"] == b["suicide_related"] for a, b in zip(out, ref)) / len(ref),
+            "keyword_mask_agree": sum(a["keyword_mask"] == b["keyword_mask"] for a, b in zip(out, ref)) / len(ref),
+        })
+    model.index_mode = base_mode
+    return rows
+
+
+def bench_synthetic(model: SimilaritySearchModel, titles: List[str], vocab_sizes: List[int],
+                    modes: List[str], repeats: int) -> List[Dict]:
+    """가상 대형 어휘 (실제 subtag 임베딩 + 노이즈)에서 token×subtag 단계만 비교."""
+    token_norm, attn_mask = _encode(model, titles[:model.batch_size])
+    saved = (model.bow_norm, model.faiss_index, model.index_mode, model.keyword_of_subtag)
+
+    rows = []
+    for M in vocab_sizes:
+        src_idx = torch.randint(0, saved[0].size(0), (M,))
+        src = saved[0][src_idx]
+        model.bow_norm = F.normalize(src + 0.1 * torch.randn_like(src), dim=-1)
+        model.keyword_of_subtag = saved[3][src_idx.to(saved[3].device)]   # 복제된 subtag 는 원래 keyword 소속
+        model.faiss_index = None
+        exact = model._token_subtag_max(token_norm, attn_mask, mode="dense")
+        for mode in modes:
+            model.index_mode = mode
+            if mode == "faiss":
+                try:
+                    from mindcastlib.src.suicide_utils import FaissSubtagIndex
+                    model.faiss_index = FaissSubtagIndex(model.bow_norm)
+                except ImportError:
+                    continue
+            approx = model._token_subtag_max(token_norm, attn_mask)
+            rows.append({
+                "M": M,
+                "mode": mode,
+                "token_subtag_ms": round(_timeit(lambda: model._token_subtag_max(token_norm, attn_mask), repeats), 2),
+                **_diff(approx, exact),
+            })
+
+    model.bow_norm, model.faiss_index, model.index_mode, model.keyword_of_subtag = saved
+    return rows
+
+
+def main():
+    args = parse_args()
+
+    import mindcastlib
+    pkg_root = os.path.dirname(mindcastlib.__file__)
+    cfg = DefaultModuleConfig().suicide_model.model_dump()
+    cfg.update({
+        "suicide_config_root": os.path.join(pkg_root, "configs", "suicide"),
+        "encoder_device": "cuda:0" if torch.cuda.is_available() else "cpu",
+        "batch_size": args.batch_size,
+        "index_mode": "faiss" if "faiss" in args.modes else "dense",
+        "index_topk": args.topk,
+        "index_block_size": args.block_size,
+    })
+    model = SimilaritySearchModel(cfg)
+    titles = load_titles(args.input)
+    print(f"[Bench] {len(titles)} titles, {model.bow_norm.size(0)} subtags, topk={args.topk}")
+
+    for row in bench_modes(model, titles, args.modes, args.repeats):
+        print(json.dumps(row, ensure_ascii=False))
+    for row in bench_synthetic(model, titles, args.synthetic_vocab, args.modes, args.repeats):
+        print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -49,6 +49,144 @@ def format_date_for_filename(dt):
     return dt.strftime("seei_%Y%m%d")
 
 
+# ======================================================
+# 게시글 단위 점수 / 집계 (sweep_suicide_thresholds 와 공용)
+# ======================================================
+def post_seei_score(comments):
+    """
+    게시글 1개의 SEEI 구성요소. 댓글이 없으면 None (집계에서 제외).
+
+    SEEI 공식: direction × neg_ratio × log(1 + comments)
+      - direction: 부정 50% 이상이면 +1, 미만이면 -1
+    """
+    n = len(comments)
+    if n == 0:
+        return None
+
+    # 댓글 볼륨
+    vol = math.log(1 + n)
+
+    # 부정 비율 계산
+    neg_count = sum(1 for c in comments if c[0]["label"] in NEG_EMO)
+    neg_ratio = neg_count / n
+
+    direction = 1 if neg_ratio >= 0.5 else -1
+    return {
+        "n": n,
+        "neg_count": neg_count,
+        "neg_ratio": neg_ratio,
+        "score": direction * neg_ratio * vol,
+    }
+
+
+def matched_keywords(kw_mask, sub_mask, main_to_sub):
+    """keyword mask 또는 해당 keyword 의 subtag mask 중 하나라도 True 인 keyword 목록"""
+    return [
+        main_kw for main_kw, sub_kws in main_to_sub.items()
+        if kw_mask.get(main_kw, False) or any(sub_mask.get(s, False) for s in sub_kws)
+    ]
+
+
+class SeeiAccumulator:
+    """
+    게시글들을 누적해 keyword 별 SEEI / 통계를 계산
+    ⚠️ 키워드가 있는 포스트만 집계!
+    """
+
+    def __init__(self, main_to_sub):
+        self.main_to_sub = main_to_sub
+        self.keyword_scores = {k: 0.0 for k in main_to_sub}
+        self.keyword_stats = {
+            k: {
+                "posts": 0,
+                "comments": 0,
+                "neg_comments": 0,
+                "neg_ratio": 0.0
+            }
+            for k in main_to_sub
+        }
+        self.emotion_counter = Counter()
+
+        # 전체 통계 (키워드 있는 것만)
+        self.total_posts = 0
+        self.total_comments = 0
+        self.total_neg_comments = 0
+
+    def add(self, kw_mask, sub_mask, comments, post_score=None):
+        """post_score: 같은 게시글을 여러 번 집계할 때 post_seei_score 결과 재사용"""
+        post_score = post_score or post_seei_score(comments)
+        if post_score is None:
+            return
+
+        matched = matched_keywords(kw_mask, sub_mask, self.main_to_sub)
+        for main_kw in matched:
+            self.keyword_scores[main_kw] += post_score["score"]
+
+            # 키워드별 통계
+            self.keyword_stats[main_kw]["posts"] += 1
+            self.keyword_stats[main_kw]["comments"] += post_score["n"]
+            self.keyword_stats[main_kw]["neg_comments"] += post_score["neg_count"]
+
+        # 키워드가 하나라도 있는 포스트만 전체 통계에 포함 ⭐
+        if matched:
+            self.total_posts += 1
+            self.total_comments += post_score["n"]
+            self.total_neg_comments += post_score["neg_count"]
+
+            # 감정 분포 카운트 (키워드 있는 포스트만!)
+            for c in comments:
+                self.emotion_counter[c[0]["label"]] += 1
+
+    def result(self, base_date):
+        # ===== 키워드별 neg_ratio 계산 =====
+        for kw, stats in self.keyword_stats.items():
+            if stats["comments"] > 0:
+                stats["neg_ratio"] = (stats["neg_comments"] / stats["comments"]) * 100
+            else:
+                stats["neg_ratio"] = 0.0
+
+        # ===== 총합 및 비율 계산 =====
+        keyword_scores = self.keyword_scores
+        total_seei = sum(keyword_scores.values())
+
+        # 키워드별 비율 (절댓값 기준)
+        abs_sum = sum(abs(v) for v in keyword_scores.values())
+        keyword_ratios = {
+            k: (abs(v) / abs_sum * 100) if abs_sum > 0 else 0.0
+            for k, v in keyword_scores.items()
+        }
+
+        # 감정별 비율
+        total_emotions = sum(self.emotion_counter.values())
+        emotion_ratios = {
+            emo: (cnt / total_emotions * 100) if total_emotions > 0 else 0.0
+            for emo, cnt in self.emotion_counter.items()
+        }
+
+        return {
+            "date": base_date.strftime("%Y-%m-%d"),
+            "keyword_scores": keyword_scores,
+            "keyword_stats": self.keyword_stats,  # 추가! ⭐
+            "total_seei": total_seei,
+            "keyword_ratios": keyword_ratios,
+            "emotion_dist": dict(self.emotion_counter),
+            "emotion_ratios": emotion_ratios,
+            "stats": {
+                "total_posts": self.total_posts,  # 키워드 있는 것만!
+                "total_comments": self.total_comments,  # 키워드 있는 것만!
+                "total_neg_comments": self.total_neg_comments,  # 키워드 있는 것만!
+                "neg_ratio_overall": (self.total_neg_comments / self.total_comments * 100)
+                                    if self.total_comments > 0 else 0.0
+            }
+        }
+
+
+def seei_window(data):
+    """파일 기준 날짜(첫 block 의 date)와 ±3일 윈도우"""
+    base_date = parse_dt(data[0]["date"])
+    return base_date, base_date - timedelta(days=3), base_date + timedelta(days=3)
+
+
 # ======================================================
 # 핵심: 일별 SEEI 계산
 # ======================================================
@@ -79,33 +217,11 @@ def compute_daily_seei(json_path, main_to_sub):
     if len(data) == 0:
         raise ValueError(f"No data blocks found in {json_path}")
     
-    date_str = data[0]["date"]
-    base_date = datetime.strptime(date_str, "%Y-%m-%d")
-    
     # ±3일 윈도우
-    win_low = base_date - timedelta(days=3)
-    win_high = base_date + timedelta(days=3)
-    
-    # ===== 2. 초기화 =====
-    keyword_scores = {k: 0.0 for k in main_to_sub}
-    keyword_stats = {
-        k: {
-            "posts": 0,
-            "comments": 0,
-            "neg_comments": 0,
-            "neg_ratio": 0.0
-        } 
-        for k in main_to_sub
-    }
+    base_date, win_low, win_high = seei_window(data)
     
-    emotion_counter = Counter()
-    
-    # 전체 통계 (키워드 있는 것만)
-    total_posts_with_keyword = 0
-    total_comments_with_keyword = 0
-    total_neg_comments_with_keyword = 0
-    
-    # ===== 3. 점수 계산 (키워드 있는 것만!) =====
+    # ===== 2. 점수 계산 (키워드 있는 것만!) =====
+    acc = SeeiAccumulator(main_to_sub)
     for block in data:
         for post in block["posts"]:
             t_date = parse_dt(post["news_date"])
@@ -115,95 +231,15 @@ def compute_daily_seei(json_path, main_to_sub):
                 continue
             
             analyses = post["analyses"]
-            kw_mask = analyses["SuicideDetectionPipeLine_title"][0]["suicide_keyword_mask"]
-            sub_mask = analyses["SuicideDetectionPipeLine_title"][0]["suicide_subtag_mask"]
-            comments = analyses["SentimentClassificationPipeLine_comments"]
-            
-            n = len(comments)
-            if n == 0:
-                continue
-            
-            # 댓글 볼륨
-            vol = math.log(1 + n)
-            
-            # 부정 비율 계산
-            neg_count = sum(1 for c in comments if c[0]["label"] in NEG_EMO)
-            neg_ratio = neg_count / n
-            
-            # Direction: 부정 50% 이상이면 +1, 미만이면 -1
-            direction = 1 if neg_ratio >= 0.5 else -1
-            
-            # 키워드 매칭 체크 (어떤 키워드들이 매칭되는지 확인)
-            matched_keywords = []
-            for main_kw, sub_kws in main_to_sub.items():
-                hit = kw_mask.get(main_kw, False) or any(
-                    sub_mask.get(s, False) for s in sub_kws
-                )
-                
-                if hit:
-                    matched_keywords.append(main_kw)
-                    
-                    # SEEI 공식: direction × neg_ratio × log(1 + comments)
-                    score = direction * neg_ratio * vol
-                    keyword_scores[main_kw] += score
-                    
-                    # 키워드별 통계
-                    keyword_stats[main_kw]["posts"] += 1
-                    keyword_stats[main_kw]["comments"] += n
-                    keyword_stats[main_kw]["neg_comments"] += neg_count
-            
-            # 키워드가 하나라도 있는 포스트만 전체 통계에 포함 ⭐
-            if matched_keywords:
-                total_posts_with_keyword += 1
-                total_comments_with_keyword += n
-                total_neg_comments_with_keyword += neg_count
-                
-                # 감정 분포 카운트 (키워드 있는 포스트만!)
-                for c in comments:
-                    emotion = c[0]["label"]
-                    emotion_counter[emotion] += 1
-    
-    # ===== 4. 키워드별 neg_ratio 계산 =====
-    for kw, stats in keyword_stats.items():
-        if stats["comments"] > 0:
-            stats["neg_ratio"] = (stats["neg_comments"] / stats["comments"]) * 100
-        else:
-            stats["neg_ratio"] = 0.0
-    
-    # ===== 5. 총합 및 비율 계산 =====
-    total_seei = sum(keyword_scores.values())
-    
-    # 키워드별 비율 (절댓값 기준)
-    abs_sum = sum(abs(v) for v in keyword_scores.values())
-    keyword_ratios = {
-        k: (abs(v) / abs_sum * 100) if abs_sum > 0 else 0.0
-        for k, v in keyword_scores.items()
-    }
-    
-    # 감정별 비율
-    total_emotions = sum(emotion_counter.values())
-    emotion_ratios = {
-        emo: (cnt / total_emotions * 100) if total_emotions > 0 else 0.0
-        for emo, cnt in emotion_counter.items()
-    }
-    
-    # ===== 6. 결과 반환 =====
-    return {
-        "date": base_date.strftime("%Y-%m-%d"),
-        "keyword_scores": keyword_scores,
-        "keyword_stats": keyword_stats,  # 추가! ⭐
-        "total_seei": total_seei,
-        "keyword_ratios": keyword_ratios,
-        "emotion_dist": dict(emotion_counter),
-        "emotion_ratios": emotion_ratios,
-        "stats": {
-            "total_posts": total_posts_with_keyword,  # 키워드 있는 것만!
-            "total_comments": total_comments_with_keyword,  # 키워드 있는 것만!
-            "total_neg_comments": total_neg_comments_with_keyword,  # 키워드 있는 것만!
-            "neg_ratio_overall": (total_neg_comments_with_keyword / total_comments_with_keyword * 100) 
-                                if total_comments_with_keyword > 0 else 0.0
-        }
-    }
+            suicide = analyses["SuicideDetectionPipeLine_title"][0]
+            acc.add(
+                suicide["suicide_keyword_mask"],
+                suicide["suicide_subtag_mask"],
+                analyses["SentimentClassificationPipeLine_comments"],
+            )
+    
+    # ===== 3. 결과 반환 =====
+    return acc.result(base_date)
 
 
 # ======================================================
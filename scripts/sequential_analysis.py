@@ -11,14 +11,34 @@ import logging
 from datetime import datetime
 from pathlib import Path
 import argparse
-from mindcastlib.pipeline.analysis_pipeline import AnalysisPipeLine
+from mindcastlib.pipeline.analysis_pipeline import (
+    AnalysisPipeLine, CorpusAnalysisEngine, InferenceWorkerPool,
+)
 from mindcastlib.configs import AnalysisConfig
+from mindcastlib.src.checkpoint_utils import JobLedger, config_sha1, file_sha1
 
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Sequential Analysis Runner")
     parser.add_argument("--input_dir", type=str, required=True)
     parser.add_argument("--output_dir", type=str, required=True)
+    parser.add_argument(
+        "--engine", type=str, default="corpus", choices=["corpus", "file"],
+        help="corpus: 파일 경계를 넘는 공유 배치 / file: 파일 단위 순차 실행",
+    )
+    parser.add_argument("--batch_size", type=int, default=32)
+
+    # CPU 멀티 프로세스 추론 (corpus 엔진 전용, 1이면 현재 프로세스에서 실행)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threads_per_worker", type=int, default=None,
+                        help="워커별 torch intra-op 스레드 수 (기본: 코어 수 / workers)")
+    parser.add_argument("--start_method", type=str, default="spawn", choices=["spawn", "fork"],
+                        help="spawn: 워커별 모델 로드 / fork: 부모 모델 가중치 공유(copy-on-write)")
+    parser.add_argument("--no_pin", action="store_true", help="워커별 CPU 코어 고정 끄기")
+
+    # 재시작 / 중복 방지
+    parser.add_argument("--force", action="store_true", help="ledger 무시하고 전체 재실행")
+    parser.add_argument("--no_checkpoint", action="store_true", help="배치 체크포인트 끄기 (corpus 엔진)")
     return parser.parse_args()
 
 
@@ -29,29 +49,49 @@ def find_json_files(root_dir: str, target_name: str = "news_comments.json"):
                 yield os.path.join(dirpath, f)
 
 
-def make_output_path(input_path: str, input_root: str, output_root: str) -> str:
+def make_output_path(input_path: str, input_root: str, output_root: str, tag: str | None = None) -> str:
+    """tag(config 해시 등)가 있으면 infer_<tag>.json 으로 고정 → 재실행해도 중복 출력 없음."""
     rel_path = os.path.relpath(input_path, input_root)
     rel_dir = os.path.dirname(rel_path)
     out_dir = os.path.join(output_root, rel_dir)
     os.makedirs(out_dir, exist_ok=True)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return os.path.join(out_dir, f"infer_{timestamp}.json")
+    if tag is None:
+        tag = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(out_dir, f"infer_{tag}.json")
 
 
-def run_analysis_pipeline(input_json: str, output_json: str):
+def run_analysis_pipeline(
+    input_json: str,
+    output_json: str,
+    runner: AnalysisPipeLine | None = None,
+    ledger: JobLedger | None = None,
+    skip_completed: bool = True,
+):
     try:
+
         with open(input_json, "r", encoding="utf-8") as f:
             data = json.load(f)
 
-        runner = AnalysisPipeLine(
-            analysis_config=AnalysisConfig.SENT_CMT_TOPIC_TTL(),
-            realtime=False,
-            monitoring=True,
-            save=True,
-            save_dir=os.path.dirname(output_json),
-        )
-        runner.run(data)
+        # 모델은 ModelRegistry 가 프로세스 단위로 공유 → 새로 만들어도 재로딩 없음
+        if runner is None:
+            runner = AnalysisPipeLine(
+                analysis_config=AnalysisConfig.SENT_CMT_TOPIC_TTL(),
+                realtime=False,
+                monitoring=True,
+                save=True,
+                save_dir=os.path.dirname(output_json),
+            )
+        input_hash = file_sha1(input_json) if ledger is not None else None
+        config_hash = config_sha1(runner.cfg)
+        if ledger is not None and skip_completed and ledger.is_complete(input_json, input_hash, config_hash):
+            print(f"⏭️ Skip (completed): {input_json}")
+            return
+
+        runner.save_dir = os.path.dirname(output_json)
+        runner.run(data, out_path=output_json)
+        if ledger is not None:
+            ledger.record(input_json, input_hash, config_hash, output_json)
         print(f"✅ Done: {input_json} → {output_json}")
 
     except Exception as e:
@@ -68,10 +108,57 @@ def main():
     json_files = list(find_json_files(input_root))
     print(f"🔍 Found {len(json_files)} json files under {input_root}")
 
+    # 모델 로딩은 여기서 한 번만
+    runner = AnalysisPipeLine(
+        analysis_config=AnalysisConfig.SENT_CMT_TOPIC_TTL(),
+        realtime=False,
+        monitoring=True,
+        save=True,
+        save_dir=output_root,
+        batch_size=args.batch_size,
+    )
+
+    # 출력 이름은 config 해시로 고정, 완료 기록은 output_root/_ledger.jsonl
+    config_hash = config_sha1(runner.cfg)
+    tag = config_hash[:12]
+    ledger = JobLedger(os.path.join(output_root, "_ledger.jsonl"))
+    skip_completed = not args.force
+
+    if args.engine == "corpus":
+        jobs = [
+            (json_file, make_output_path(json_file, input_root, output_root, tag=tag))
+            for json_file in sorted(json_files)
+        ]
+        engine_kwargs = dict(
+            batch_size=args.batch_size,
+            ledger=ledger,
+            skip_completed=skip_completed,
+            checkpoint=not args.no_checkpoint,
+        )
+        if args.workers > 1:
+            if args.start_method == "spawn":
+                # 워커가 각자 모델을 로드하므로 부모는 실행 계획(target/encode_key)만 유지
+                runner.release_models()
+                print(f"[Pool] parent models released ({args.workers} spawn workers load their own copy)")
+            with InferenceWorkerPool(
+                runner,
+                num_workers=args.workers,
+                threads_per_worker=args.threads_per_worker,
+                start_method=args.start_method,
+                pin_threads=not args.no_pin,
+            ) as pool:
+                CorpusAnalysisEngine(runner, pool=pool, **engine_kwargs).run(jobs)
+        else:
+            CorpusAnalysisEngine(runner, **engine_kwargs).run(jobs)
+        return
+
+    if args.workers > 1:
+        print("⚠️ --workers is only used with --engine corpus; running in-process")
+
     for idx, json_file in enumerate(sorted(json_files)):
         print(f"\n[{idx+1}/{len(json_files)}] Running analysis for: {json_file}")
-        out_path = make_output_path(json_file, input_root, output_root)
-        run_analysis_pipeline(json_file, out_path)
+        out_path = make_output_path(json_file, input_root, output_root, tag=tag)
+        run_analysis_pipeline(json_file, out_path, runner=runner, ledger=ledger, skip_completed=skip_completed)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,192 @@
+# ============================================================
+# 📦 scripts/sweep_suicide_thresholds.py
+#  - 분석 결과(analysis_results)의 제목으로 suicide 유사도 행렬 4종을 한 번만 계산/캐시
+#  - sim_weights / threshold / subtag threshold offset / CENTROID / LOW threshold grid 를
+#    encoder 재실행 없이 벡터화해서 평가
+#  - 설정별 keyword hit 분포, keyword 별 SEEI, 총 SEEI 와 현재 설정 대비 변화량 리포트
+#  - SEEI 는 compute_daily_seei 의 게시글 점수(post_seei_score) / 집계(SeeiAccumulator) 를 그대로 사용
+#
+# 사용 예:
+#   python -m mindcastlib.scripts.sweep_suicide_thresholds \
+#       --input_dir analysis_results/2020 --grid grid.json --output sweep_report.json
+#   grid.json 예: {"threshold": [0.55, 0.6], "subtag_threshold_offset": [-0.05, 0, 0.05],
+#                 "low_threshold": [0.45, 0.5], "sim_weights": [{"token_subtag": 0.5, "sent_subtag": 0.2,
+#                 "token_centroid": 0.2, "sent_centroid": 0.1}]}
+# ============================================================
+
+from __future__ import annotations
+import os
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import torch
+
+from mindcastlib.configs import DefaultModuleConfig
+from mindcastlib.scripts.compute_daily_seei import SeeiAccumulator, parse_dt, post_seei_score, seei_window
+from mindcastlib.src.checkpoint_utils import atomic_write_json
+from mindcastlib.src.suicide_utils import (
+    SimilaritySearchModel, build_sweep_grid, compute_similarity_cache,
+    similarity_cache_meta, sweep_thresholds,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Suicide threshold sweep")
+    parser.add_argument("--input_dir", type=str, required=True, help="analysis 결과 JSON 폴더 (재귀 탐색)")
+    parser.add_argument("--grid", type=str, required=True, help="grid JSON 파일 경로 또는 JSON 문자열")
+    parser.add_argument("--output", type=str, default="suicide_sweep_report.json")
+    parser.add_argument("--cache", type=str, default=None,
+                        help="유사도 행렬 캐시 (.pt). 기본: <input_dir>/_suicide_sims.pt")
+    parser.add_argument("--current_date", type=str, default=None, help="keyword config (기본: suicide_model 설정)")
+    parser.add_argument("--batch_size", type=int, default=64)
+    parser.add_argument("--top", type=int, default=10, help="출력할 상위 설정 수 (total_seei 변화 기준)")
+    return parser.parse_args()
+
+
+# ------------------------------------------------------------
+# 📥 분석 결과 → (제목, 댓글, 게시글 SEEI 점수) rows
+# ------------------------------------------------------------
+def load_rows(input_dir: str) -> Tuple[List[str], List[Tuple[int, List[Any], Dict[str, Any]]]]:
+    """
+    파일별 ±3일 윈도우(compute_daily_seei 와 동일) 안의 게시글을 row 로 수집. 제목은 중복 제거.
+    row = (제목 index, 댓글 감정 결과, post_seei_score). 댓글이 없는 게시글은 SEEI 집계 대상이 아니므로 제외.
+    """
+    titles: Dict[str, int] = {}
+    rows = []
+    for path in sorted(Path(input_dir).rglob("*.json")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f).get("data", [])
+        except (json.JSONDecodeError, AttributeError, OSError):
+            continue
+        if not data:
+            continue
+        _, lo, hi = seei_window(data)
+        for block in data:
+            for post in block.get("posts", []):
+                title = post.get("title")
+                comments = post.get("analyses", {}).get("SentimentClassificationPipeLine_comments")
+                if not title or comments is None:
+                    continue
+                if "news_date" in post and not (lo <= parse_dt(post["news_date"]) <= hi):
+                    continue
+                score = post_seei_score(comments)
+                if score is None:
+                    continue
+                rows.append((titles.setdefault(title, len(titles)), comments, score))
+    return list(titles), rows
+
+
+def seei_reducer(model: SimilaritySearchModel, rows: List[Tuple[int, List[Any], Dict[str, Any]]]):
+    """
+    sweep_thresholds 의 reduce: 설정별 판정을 analysis 결과와 같은 mask 로 만들어
+    compute_daily_seei 와 같은 방식으로 게시글 SEEI 를 집계.
+    """
+    main_to_sub = {kw: [] for kw in model.keywords}
+    for st, k in zip(model.subtag_list, model.keyword_of_subtag.tolist()):
+        main_to_sub[model.keywords[k]].append(st)
+
+    def reduce(related: torch.Tensor, winner: torch.Tensor, subtag_active: torch.Tensor) -> Dict[str, Any]:
+        related_list = related.tolist()
+        masks: Dict[int, Tuple[Dict[str, bool], Dict[str, bool]]] = {}
+        acc = SeeiAccumulator(main_to_sub)
+        for t, comments, score in rows:
+            if not related_list[t]:
+                continue        # related 가 아니면 keyword/subtag mask 가 모두 False → 집계 대상 아님
+            if t not in masks:
+                winner_kw = model.keywords[int(winner[t])]
+                masks[t] = (
+                    {kw: kw == winner_kw for kw in model.keywords},               # format_results 와 동일
+                    dict(zip(model.subtag_list, subtag_active[t].tolist())),
+                )
+            acc.add(*masks[t], comments, post_score=score)
+        return {
+            "post_hits": {kw: st["posts"] for kw, st in acc.keyword_stats.items()},
+            "keyword_seei": dict(acc.keyword_scores),
+            "total_seei": sum(acc.keyword_scores.values()),
+        }
+
+    return reduce
+
+
+def load_or_compute_sims(model: SimilaritySearchModel, titles: List[str], cache_path: str,
+                         batch_size: int) -> Dict[str, Any]:
+    expected = similarity_cache_meta(model, titles)
+    if os.path.exists(cache_path):
+        sims = torch.load(cache_path)
+        if sims.get("meta") == expected:
+            print(f"[Load] similarity cache → {cache_path}")
+            return sims
+        print(f"[Warn] {cache_path} is stale → recomputing")
+
+    t0 = time.time()
+    sims = compute_similarity_cache(model, titles, batch_size=batch_size)
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    torch.save(sims, cache_path)
+    print(f"[Precompute] {len(titles)} titles similarity cache ({time.time() - t0:.1f}s) → {cache_path}")
+    return sims
+
+
+def main():
+    args = parse_args()
+
+    import mindcastlib
+    pkg_root = os.path.dirname(mindcastlib.__file__)
+    cfg = DefaultModuleConfig().suicide_model.model_dump()
+    cfg.update({
+        "suicide_config_root": os.path.join(pkg_root, "configs", "suicide"),
+        "encoder_device": "cuda:0" if torch.cuda.is_available() else "cpu",
+        "batch_size": args.batch_size,
+    })
+    if args.current_date:
+        cfg["current_date"] = args.current_date
+    model = SimilaritySearchModel(cfg)
+
+    titles, rows = load_rows(args.input_dir)
+    print(f"[Sweep] {len(titles)} titles / {len(rows)} posts from {args.input_dir}")
+    if not titles:
+        print("❌ 분석 결과에서 제목을 찾지 못했습니다 (SentimentClassificationPipeLine_comments 필요)")
+        return
+
+    cache_path = args.cache or os.path.join(args.input_dir, "_suicide_sims.pt")
+    sims = load_or_compute_sims(model, titles, cache_path, args.batch_size)
+
+    if os.path.exists(args.grid):
+        with open(args.grid, "r", encoding="utf-8") as f:
+            grid_spec = json.load(f)
+    else:
+        grid_spec = json.loads(args.grid)
+
+    # 첫 번째 설정은 항상 현재 모델 설정 (변화량 기준)
+    settings = build_sweep_grid(model, {}) + build_sweep_grid(model, grid_spec)
+
+    t0 = time.time()
+    summaries = sweep_thresholds(model, sims, settings, reduce=seei_reducer(model, rows))
+    print(f"[Sweep] {len(settings) - 1} settings evaluated in {time.time() - t0:.2f}s")
+
+    baseline, results = summaries[0], summaries[1:]
+    for r in results:
+        r["delta_total_seei"] = r["total_seei"] - baseline["total_seei"]
+        r["delta_post_hits"] = {
+            kw: r["post_hits"][kw] - baseline["post_hits"][kw] for kw in model.keywords
+        }
+
+    atomic_write_json(args.output, {"baseline": baseline, "results": results})
+    print(f"✅ Saved → {args.output}")
+
+    print(f"\n[Baseline] related={baseline['n_related']} total_seei={baseline['total_seei']:.3f}")
+    for r in sorted(results, key=lambda x: -abs(x["delta_total_seei"]))[:args.top]:
+        s = r["setting"]
+        print(
+            f"  thr={s['threshold']:.2f} off={s['subtag_threshold_offset']:+.2f} "
+            f"cent={s['centroid_threshold']:.2f} low={s['low_threshold']:.2f} "
+            f"w={[round(s['sim_weights'][k], 2) for k in s['sim_weights']]} "
+            f"| related={r['n_related']} total_seei={r['total_seei']:.3f} (Δ {r['delta_total_seei']:+.3f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
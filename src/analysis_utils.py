@@ -1,5 +1,6 @@
 # emotion_utils.py
-from typing import List, Sequence, Union
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Union
 import numpy as np
 import torch
 
@@ -27,6 +28,78 @@ def macro_slices_60x6() -> List[slice]:
         slice(50, 60),  # 기쁨
     ]
 
+@dataclass
+class MacroSentimentBatch:
+    """
+    60→6 집계 결과를 배열로 보관 (행마다 dict 를 만들지 않음).
+      - label_idx : [B] 6대분류 top-1 인덱스
+      - score     : [B] top-1 점수
+      - probs     : [B,6] 6대분류 확률 (return_all_scores=True 일 때만)
+    dict 변환(to_records)은 결과를 JSON 에 넣기 직전에만 수행.
+    """
+    label_idx: np.ndarray
+    score: np.ndarray
+    macro_labels: Sequence[str]
+    probs: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return int(self.label_idx.shape[0])
+
+    def __getitem__(self, i: int) -> List[dict]:
+        if self.probs is not None:
+            row = self.probs[i]
+            order = np.argsort(-row, kind="stable")
+            return [{"label": self.macro_labels[k], "score": float(row[k])} for k in order]
+        k = int(self.label_idx[i])
+        return [{"label": self.macro_labels[k], "score": float(self.score[i])}]
+
+    def labels(self) -> List[str]:
+        return [self.macro_labels[k] for k in self.label_idx.tolist()]
+
+    def to_records(self) -> List[List[dict]]:
+        """pipeline 호환 형식: 행마다 [{"label", "score"}, ...] (all scores 는 점수 내림차순)."""
+        if self.probs is not None:
+            order = np.argsort(-self.probs, axis=1, kind="stable")
+            sorted_probs = np.take_along_axis(self.probs, order, axis=1).tolist()
+            return [
+                [{"label": self.macro_labels[k], "score": sc} for k, sc in zip(ks, scs)]
+                for ks, scs in zip(order.tolist(), sorted_probs)
+            ]
+        return [
+            [{"label": self.macro_labels[k], "score": sc}]
+            for k, sc in zip(self.label_idx.tolist(), self.score.tolist())
+        ]
+
+    @classmethod
+    def concat(cls, batches: Sequence["MacroSentimentBatch"]) -> "MacroSentimentBatch":
+        return cls(
+            label_idx=np.concatenate([b.label_idx for b in batches]),
+            score=np.concatenate([b.score for b in batches]),
+            macro_labels=batches[0].macro_labels,
+            probs=None if batches[0].probs is None else np.concatenate([b.probs for b in batches]),
+        )
+
+
+def concat_results(chunks: Sequence[Any]) -> Any:
+    """
+    배치별 결과 리스트를 하나로 합침.
+    모두 MacroSentimentBatch 면 배열째로 합치고, 아니면 행 단위 리스트로 펼침.
+    """
+    if chunks and all(isinstance(c, MacroSentimentBatch) for c in chunks):
+        return MacroSentimentBatch.concat(chunks)
+    out: List[Any] = []
+    for c in chunks:
+        out.extend(c.to_records() if isinstance(c, MacroSentimentBatch) else c)
+    return out
+
+
+def expand_results(results: Any) -> List[Any]:
+    """직렬화 직전에 배열 결과를 pipeline 호환 dict 리스트로 변환."""
+    if isinstance(results, MacroSentimentBatch):
+        return results.to_records()
+    return results
+
+
 def predict_6sentiments(
     texts: Union[str, List[str]],
     pipe,
@@ -35,51 +108,91 @@ def predict_6sentiments(
     return_all_scores: bool,
     macro_labels: Sequence[str] = ("분노", "슬픔", "불안", "상처", "당황", "기쁨"),
     macro_slices: Sequence[slice] | None = None,
+    as_arrays: bool = False,
     **kwargs
 ):
     """
     HF pipeline의 tokenizer/model을 직접 써서 60-way 확률을 얻은 뒤 6대분류로 합산.
-    반환 형식은 pipeline과 호환(단일/배치 모두 지원).
+    반환 형식은 pipeline과 호환(단일/배치 모두 지원). as_arrays=True 면 MacroSentimentBatch.
     """
     single = isinstance(texts, str)
     batch_texts = [texts] if single else texts
 
-    tok = pipe.tokenizer
-    mdl = pipe.model
-    dev = mdl.device
-
-    enc = tok(
+    enc = pipe.tokenizer(
         batch_texts,
         truncation=truncation,
         max_length=max_length,
         padding=True,
         return_tensors="pt",
-    ).to(dev)
+    )
+
+    out = predict_6sentiments_encoded(
+        enc=enc,
+        pipe=pipe,
+        return_all_scores=return_all_scores,
+        macro_labels=macro_labels,
+        macro_slices=macro_slices,
+        as_arrays=as_arrays and not single,
+    )
+    return out[0] if single else out
+
+
+def predict_6sentiments_encoded(
+    enc,
+    pipe,
+    return_all_scores: bool,
+    macro_labels: Sequence[str] = ("분노", "슬픔", "불안", "상처", "당황", "기쁨"),
+    macro_slices: Sequence[slice] | None = None,
+    as_arrays: bool = False,
+    **kwargs
+):
+    """이미 토큰화된 배치(enc)로 60-way → 6대분류 합산. 여러 runner가 같은 인코딩을 공유할 때 사용."""
+    mdl = pipe.model
+    dev = mdl.device
+    enc = {k: v.to(dev) for k, v in enc.items()}  # 공유 인코딩은 제자리 이동하지 않음
 
     with torch.no_grad():
         logits = mdl(**enc).logits  # [B,60]
-        probs60 = torch.softmax(logits, dim=-1).cpu().numpy()  # [B,60]
+        probs60 = torch.softmax(logits.float(), dim=-1)  # [B,60]
 
-    if macro_slices is None:
-        macro_slices = macro_slices_60x6()
+        # 6개 그룹 합산 (행 합 1 유지) — 기본 슬라이스면 reshape 한 번으로 처리
+        if macro_slices is None or list(macro_slices) == macro_slices_60x6():
+            macro = probs60.reshape(-1, 6, 10).sum(dim=-1)  # [B,6]
+        else:
+            macro = torch.stack([probs60[:, s].sum(dim=1) for s in macro_slices], dim=1)
 
-    # 6개 그룹 합산 (행 합 1 유지)
-    macro = np.stack([probs60[:, s].sum(axis=1) for s in macro_slices], axis=1)  # [B,6]
+        score, label_idx = macro.max(dim=-1)
 
-    if return_all_scores:
-        out = []
-        for row in macro:
-            items = [{"label": lb, "score": float(sc)} for lb, sc in zip(macro_labels, row)]
-            items.sort(key=lambda x: x["score"], reverse=True)
-            out.append(items)
-    else:
-        out = []
-        for row in macro:
-            k = int(row.argmax())
-            out.append([{"label": macro_labels[k], "score": float(row[k])}])
+    batch = MacroSentimentBatch(
+        label_idx=label_idx.cpu().numpy(),
+        score=score.cpu().numpy(),
+        macro_labels=tuple(macro_labels),
+        probs=macro.cpu().numpy() if return_all_scores else None,
+    )
+    return batch if as_arrays else batch.to_records()
 
-    return out[0] if single else out
 
+def predict_text_classification_encoded(enc, model) -> List[dict]:
+    """
+    토큰화된 배치로 HF text-classification pipeline(top-1)과 같은 형식의 결과를 계산.
+    pipeline 기본 후처리와 동일하게 단일 라벨/multi-label 은 sigmoid, 그 외는 softmax.
+    """
+    enc = {k: v.to(model.device) for k, v in enc.items()}
+
+    with torch.no_grad():
+        logits = model(**enc).logits  # [B,C]
+
+    cfg = model.config
+    if cfg.num_labels == 1 or getattr(cfg, "problem_type", None) == "multi_label_classification":
+        scores = torch.sigmoid(logits)
+    else:
+        scores = torch.softmax(logits, dim=-1)
+
+    top_scores, top_idx = scores.max(dim=-1)
+    return [
+        {"label": cfg.id2label[k], "score": float(sc)}
+        for k, sc in zip(top_idx.cpu().tolist(), top_scores.cpu().tolist())
+    ]
 
 
 
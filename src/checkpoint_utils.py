@@ -0,0 +1,159 @@
+# ============================================================
+# 📦 checkpoint_utils.py — 재시작 가능한 배치 작업용 유틸
+#  - JobLedger       : 입력 해시 / config 해시 / 출력 경로를 기록하는 append-only 원장
+#  - BatchCheckpoint : 파일 하나의 배치 결과를 JSONL 로 누적 (중단 후 이어서 처리)
+#  - atomic_write_json: tmp 파일에 쓰고 os.replace → 반쯤 쓰인 결과 파일 방지
+# ============================================================
+from __future__ import annotations
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Any, Dict, List
+
+
+def file_sha1(path: str, chunk_size: int = 1 << 20) -> str:
+    """입력 파일 내용 해시 (내용이 바뀌면 재처리 대상)."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def config_sha1(cfg: Any) -> str:
+    """pydantic config 또는 dict 의 해시 (키 정렬된 JSON 기준)."""
+    if hasattr(cfg, "model_dump"):
+        cfg = cfg.model_dump(mode="json")
+    payload = json.dumps(cfg, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def atomic_write_json(path: str, data: Any, indent: int = 2) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp, path)
+
+
+# ------------------------------------------------------------
+# 📒 JobLedger
+# ------------------------------------------------------------
+class JobLedger:
+    """
+    <output_root>/_ledger.jsonl 에 완료된 작업을 한 줄씩 추가.
+    같은 input 의 마지막 기록이 (input_hash, config_hash) 와 일치하고 출력 파일이 존재하면 완료로 간주.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        logging.warning(f"[Ledger] skip broken line in {path}")
+                        continue
+                    self._latest[rec["input"]] = rec
+
+    def is_complete(self, input_path: str, input_hash: str, config_hash: str) -> bool:
+        rec = self._latest.get(os.path.abspath(input_path))
+        return (
+            rec is not None
+            and rec.get("status") == "done"
+            and rec.get("input_hash") == input_hash
+            and rec.get("config_hash") == config_hash
+            and os.path.exists(rec.get("output", ""))
+        )
+
+    def record(self, input_path: str, input_hash: str, config_hash: str, output_path: str,
+               status: str = "done", **extra) -> None:
+        rec = {
+            "input": os.path.abspath(input_path),
+            "input_hash": input_hash,
+            "config_hash": config_hash,
+            "output": os.path.abspath(output_path),
+            "status": status,
+            "finished_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            **extra,
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._latest[rec["input"]] = rec
+
+
+# ------------------------------------------------------------
+# 💾 BatchCheckpoint
+# ------------------------------------------------------------
+class BatchCheckpoint:
+    """
+    첫 줄은 header(예: input_hash/config_hash), 이후 줄은 배치 결과 레코드.
+    header 가 다르면(입력이나 config 변경) 기존 체크포인트는 버리고 새로 시작.
+    마지막 줄이 중간에 끊겨 있으면(크래시) 그 줄만 무시.
+    """
+
+    def __init__(self, path: str, header: Dict[str, Any]):
+        self.path = path
+        self.header = header
+        self._fh = None
+
+    def load(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return []
+        records: List[Dict[str, Any]] = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            raw = f.read()
+        lines = raw.splitlines()
+        if not lines:
+            return []
+        try:
+            header = json.loads(lines[0])
+        except json.JSONDecodeError:
+            header = None
+        if header != self.header:
+            logging.info(f"[Checkpoint] header mismatch → discard {self.path}")
+            os.remove(self.path)
+            return []
+        broken = False
+        for line in lines[1:]:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                broken = True
+                break
+        if broken or not raw.endswith("\n"):
+            # 끊긴 줄 뒤에 이어 쓰지 않도록 유효한 레코드만으로 다시 작성
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for rec in [self.header] + records:
+                    f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            os.replace(tmp, self.path)
+        return records
+
+    def append(self, record: Dict[str, Any]) -> None:
+        if self._fh is None:
+            fresh = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+            if fresh:
+                self._fh.write(json.dumps(self.header, ensure_ascii=False) + "\n")
+        self._fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._fh.flush()
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def remove(self) -> None:
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -7,6 +7,8 @@ import pprint
 
 import torch
 
+from .analysis_utils import concat_results, expand_results
+
 
 def prepare_data(
     data_dir: str = None   
@@ -132,43 +134,20 @@ def extract_analysis_from_comments(data: Dict, key: str, labels_only: bool = Fal
     return results
 
 
-def apply_func_to_title(
-    func: Callable | None = None,
-    func_name: str | None = None,
-    data: Dict | None = None,
-    batch_size: int = 32,
-    **kwargs
-) -> Dict:
-    if func is None:
-        raise ValueError("you should put Callable model e.g. Sentiment classification Model...")
-    if data is None:
-        raise ValueError("You should put data!")
-
-    func_name = func_name if func_name is not None else func.__class__.__name__
-
-    # ----------------------------------------------------
-    # 1️⃣ 모든 title 수집
-    # ----------------------------------------------------
+def collect_title_inputs(data: Dict) -> List[str]:
+    """apply_func_to_title 이 추론에 넣는 title 목록 (빈 title 제외)."""
     all_titles: List[str] = []
     for day in data.get("data", []):
         for post in day.get("posts", []):
             if post.get("title"):
                 all_titles.append(post["title"])
+    return all_titles
 
-    # ----------------------------------------------------
-    # 2️⃣ 배치 inference
-    # ----------------------------------------------------
-    results = []
-    for i in range(0, len(all_titles), batch_size):
-        batch = all_titles[i:i + batch_size]
-        batch_results = func(batch, **kwargs)
-        results.extend(batch_results)
 
-    func_results_iter = iter(results)
+def insert_title_results(data: Dict, func_name: str, results: List[Any]) -> Dict:
+    """collect_title_inputs 순서대로 계산된 results 를 post.analyses 에 삽입."""
+    func_results_iter = iter(expand_results(results))
 
-    # ----------------------------------------------------
-    # 3️⃣ 결과 저장
-    # ----------------------------------------------------
     for day in data.get("data", []):
         for post in day.get("posts", []):
             title = post.get("title")
@@ -200,12 +179,11 @@ def apply_func_to_title(
     return data
 
 
-
-def apply_func_to_comments(
+def apply_func_to_title(
     func: Callable | None = None,
     func_name: str | None = None,
     data: Dict | None = None,
-    batch_size: int = 32,      # ✅ 추가
+    batch_size: int = 32,
     **kwargs
 ) -> Dict:
     if func is None:
@@ -215,29 +193,41 @@ def apply_func_to_comments(
 
     func_name = func_name if func_name is not None else func.__class__.__name__
 
-    # --------------------------------------------
-    # 1️⃣ 전체 댓글 수집
-    # --------------------------------------------
+    # ----------------------------------------------------
+    # 1️⃣ 모든 title 수집
+    # ----------------------------------------------------
+    all_titles = collect_title_inputs(data)
+
+    # ----------------------------------------------------
+    # 2️⃣ 배치 inference
+    # ----------------------------------------------------
+    chunks = []
+    for i in range(0, len(all_titles), batch_size):
+        batch = all_titles[i:i + batch_size]
+        chunks.append(func(batch, **kwargs))
+    results = concat_results(chunks)
+
+    # ----------------------------------------------------
+    # 3️⃣ 결과 저장
+    # ----------------------------------------------------
+    return insert_title_results(data, func_name, results)
+
+
+
+def collect_comment_inputs(data: Dict) -> List[str]:
+    """apply_func_to_comments 가 추론에 넣는 전체 댓글 목록."""
     all_comments: List[str] = []
     for day in data.get("data", []):
         for post in day.get("posts", []):
             for comment in post.get("comments", []):
                 all_comments.append(comment)
+    return all_comments
 
-    # --------------------------------------------
-    # 2️⃣ 배치 단위 inference 수행
-    # --------------------------------------------
-    results = []
-    for i in range(0, len(all_comments), batch_size):
-        batch = all_comments[i:i + batch_size]
-        batch_results = func(batch, **kwargs)
-        results.extend(batch_results)
 
-    func_results_iter = iter(results)
+def insert_comment_results(data: Dict, func_name: str, results: List[Any]) -> Dict:
+    """collect_comment_inputs 순서대로 계산된 results 를 post 단위로 나눠 삽입."""
+    func_results_iter = iter(expand_results(results))
 
-    # --------------------------------------------
-    # 3️⃣ 결과를 다시 데이터 구조에 삽입
-    # --------------------------------------------
     for day in data.get("data", []):
         for post in day.get("posts", []):
             comments = post.get("comments", [])
@@ -260,6 +250,40 @@ def apply_func_to_comments(
 
     return data
 
+
+def apply_func_to_comments(
+    func: Callable | None = None,
+    func_name: str | None = None,
+    data: Dict | None = None,
+    batch_size: int = 32,      # ✅ 추가
+    **kwargs
+) -> Dict:
+    if func is None:
+        raise ValueError("you should put Callable model e.g. Sentiment classification Model...")
+    if data is None:
+        raise ValueError("You should put data!")
+
+    func_name = func_name if func_name is not None else func.__class__.__name__
+
+    # --------------------------------------------
+    # 1️⃣ 전체 댓글 수집
+    # --------------------------------------------
+    all_comments = collect_comment_inputs(data)
+
+    # --------------------------------------------
+    # 2️⃣ 배치 단위 inference 수행
+    # --------------------------------------------
+    chunks = []
+    for i in range(0, len(all_comments), batch_size):
+        batch = all_comments[i:i + batch_size]
+        chunks.append(func(batch, **kwargs))
+    results = concat_results(chunks)
+
+    # --------------------------------------------
+    # 3️⃣ 결과를 다시 데이터 구조에 삽입
+    # --------------------------------------------
+    return insert_comment_results(data, func_name, results)
+
 def apply_func_to_something_from_titlelike_double_data(
     func: Callable,
     target1: str,
@@ -0,0 +1,148 @@
+# ============================================================
+# 📦 embedding_utils.py — 제목 임베딩 영구 저장소 (SimilaritySearchModel 용)
+#  - key   : sha1(namespace + 제목)  (namespace = encoder 이름 / max_length / dtype)
+#  - value : 문장 임베딩(fp32) + 토큰 임베딩(fp32 / fp16 / int8 압축, padding 제외 길이만)
+#  - 같은 제목이 다른 기간 버킷 / 월별 keyword config / threshold 변경으로 다시 들어와도
+#    encoder 를 다시 돌리지 않고 저장된 임베딩으로 matmul 만 수행
+#  - sqlite3 (표준 라이브러리) 단일 파일, 프로세스별 connection (워커 풀 fork/spawn 안전)
+# ============================================================
+from __future__ import annotations
+import os
+import sqlite3
+import hashlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+
+
+TOKEN_DTYPES = ("fp32", "fp16", "int8")
+
+
+def store_namespace(model_name: str, max_length: Optional[int], dtype: Optional[str]) -> str:
+    """임베딩이 달라지는 설정을 묶은 namespace (바뀌면 다른 key → 자동으로 새로 인코딩)."""
+    return f"{model_name}|max_length={max_length}|dtype={dtype or 'fp32'}"
+
+
+class TitleEmbeddingStore:
+    """
+    제목 텍스트 해시 → (문장 임베딩, 토큰 임베딩) 저장소.
+
+    - get_many(titles)      : {i: (sent (H,), tok (L_i, H))}  (hit 만)
+    - put_many(titles, ...) : 새로 인코딩한 제목 저장
+    - hits / misses         : 조회 통계
+    """
+
+    def __init__(self, path: str, namespace: str, token_dtype: str = "fp16"):
+        if token_dtype not in TOKEN_DTYPES:
+            raise ValueError(f"token_dtype must be one of {TOKEN_DTYPES}")
+        self.path = path
+        self.namespace = namespace
+        self.token_dtype = token_dtype
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._pid = None
+
+    # --------------------------------------------------------
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # fork 된 워커에서 부모 connection 을 쓰지 않도록 프로세스별로 새로 연결
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=60)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS title_emb ("
+                " key TEXT PRIMARY KEY, dim INTEGER, n_tok INTEGER, tok_dtype TEXT,"
+                " sent BLOB, tok BLOB, tok_scale BLOB)"
+            )
+            self._pid = os.getpid()
+        return self._conn
+
+    def key(self, title: str) -> str:
+        return hashlib.sha1(f"{self.namespace}\x00{title}".encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM title_emb").fetchone()[0]
+
+    # --------------------------------------------------------
+    # 🔧 (de)serialize
+    # --------------------------------------------------------
+    def _pack_tokens(self, tok: torch.Tensor) -> Tuple[bytes, Optional[bytes]]:
+        tok = tok.detach().float().cpu()
+        if self.token_dtype == "fp32":
+            return tok.numpy().astype(np.float32).tobytes(), None
+        if self.token_dtype == "fp16":
+            return tok.numpy().astype(np.float16).tobytes(), None
+        # int8: 토큰(행)별 absmax scale
+        scale = tok.abs().amax(dim=1, keepdim=True).clamp(min=1e-8) / 127.0
+        q = torch.round(tok / scale).clamp(-127, 127).to(torch.int8)
+        return q.numpy().tobytes(), scale.squeeze(1).numpy().astype(np.float32).tobytes()
+
+    @staticmethod
+    def _unpack_tokens(blob: bytes, scale_blob: Optional[bytes], tok_dtype: str, n_tok: int, dim: int) -> torch.Tensor:
+        if tok_dtype == "fp32":
+            arr = np.frombuffer(blob, dtype=np.float32)
+        elif tok_dtype == "fp16":
+            arr = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+        else:
+            scale = np.frombuffer(scale_blob, dtype=np.float32).reshape(n_tok, 1)
+            arr = np.frombuffer(blob, dtype=np.int8).astype(np.float32).reshape(n_tok, dim) * scale
+        return torch.from_numpy(np.array(arr, dtype=np.float32).reshape(n_tok, dim))
+
+    # --------------------------------------------------------
+    def compress(self, tok: torch.Tensor) -> torch.Tensor:
+        """저장 정밀도로 왕복시킨 토큰 임베딩 (새로 인코딩한 제목도 hit 과 같은 값으로 계산하기 위함)."""
+        blob, scale_blob = self._pack_tokens(tok)
+        return self._unpack_tokens(blob, scale_blob, self.token_dtype, tok.size(0), tok.size(1))
+
+    def get_many(self, titles: Sequence[str]) -> Dict[int, Tuple[torch.Tensor, torch.Tensor]]:
+        keys = [self.key(t) for t in titles]
+        found: Dict[str, Tuple[torch.Tensor, torch.Tensor]] = {}
+        uniq = list(dict.fromkeys(keys))
+        for i in range(0, len(uniq), 500):   # sqlite 변수 개수 제한
+            chunk = uniq[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT key, dim, n_tok, tok_dtype, sent, tok, tok_scale FROM title_emb "
+                f"WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            for key, dim, n_tok, tok_dtype, sent, tok, tok_scale in rows:
+                sent_t = torch.from_numpy(np.frombuffer(sent, dtype=np.float32).copy())
+                found[key] = (sent_t, self._unpack_tokens(tok, tok_scale, tok_dtype, n_tok, dim))
+
+        out = {i: found[k] for i, k in enumerate(keys) if k in found}
+        self.hits += len(out)
+        self.misses += len(keys) - len(out)
+        return out
+
+    def put_many(self, titles: Sequence[str], sent_emb: torch.Tensor, token_embs: List[torch.Tensor]) -> None:
+        rows = []
+        for title, sent, tok in zip(titles, sent_emb, token_embs):
+            tok_blob, scale_blob = self._pack_tokens(tok)
+            rows.append((
+                self.key(title), int(tok.size(1)), int(tok.size(0)), self.token_dtype,
+                sent.detach().float().cpu().numpy().astype(np.float32).tobytes(), tok_blob, scale_blob,
+            ))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO title_emb (key, dim, n_tok, tok_dtype, sent, tok, tok_scale) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def close(self) -> None:
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+    def __getstate__(self):
+        # spawn 워커로 넘길 때 connection 은 제외
+        state = self.__dict__.copy()
+        state["_conn"], state["_pid"] = None, None
+        return state
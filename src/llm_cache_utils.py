@@ -0,0 +1,100 @@
+# ============================================================
+# 📦 llm_cache_utils.py — LLM 라벨 영구 캐시 (LLMPipeLine 앞단)
+#  - key   : sha1(backend + model id + 실제 렌더링된 프롬프트 + 텍스트)
+#  - value : 최종 라벨 문자열 (에러 문자열 "[OpenAI 오류: ...]" / 빈 라벨은 저장하지 않음)
+#  - 같은 백엔드·모델·role 프롬프트로 같은 텍스트를 다시 라벨링하면 API 를 호출하지 않음
+#    (재실행, 기간이 겹치는 데이터셋, 같은 댓글이 여러 기사에 달린 경우)
+#  - sqlite3 (표준 라이브러리) 단일 파일, 프로세스별 connection (embedding_utils 와 같은 방식)
+# ============================================================
+from __future__ import annotations
+import os
+import sqlite3
+import hashlib
+from typing import Dict, Sequence
+
+
+def label_cache_key(backend: str, model_id: str, prompt: str, text: str) -> str:
+    return hashlib.sha1("\x00".join((backend, model_id, prompt, text)).encode("utf-8")).hexdigest()
+
+
+def is_cacheable(label: str) -> bool:
+    """에러 문자열("[... 오류: ...]", "[... 연결 실패]")과 파싱 실패("")는 다음 실행에서 다시 시도."""
+    label = (label or "").strip()
+    return bool(label) and not (label.startswith("[") and label.endswith("]"))
+
+
+def default_label_cache_path() -> str:
+    import mindcastlib
+    pkg_root = os.path.dirname(mindcastlib.__file__)
+    return os.path.join(pkg_root, "assets", ".precomputed", "LLMLabels", "labels.sqlite")
+
+
+class LLMLabelCache:
+    """
+    라벨 캐시 key → 라벨 저장소.
+
+    - get_many(keys)  : {key: label}  (hit 만)
+    - put_many(items) : {key: label} 저장 (is_cacheable 통과한 라벨만)
+    - hits / misses   : 조회 통계
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._pid = None
+
+    # --------------------------------------------------------
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # fork 된 워커에서 부모 connection 을 쓰지 않도록 프로세스별로 새로 연결
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=60)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS llm_label (key TEXT PRIMARY KEY, label TEXT)")
+            self._pid = os.getpid()
+        return self._conn
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM llm_label").fetchone()[0]
+
+    # --------------------------------------------------------
+    def get_many(self, keys: Sequence[str]) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        uniq = list(dict.fromkeys(keys))
+        for i in range(0, len(uniq), 500):   # sqlite 변수 개수 제한
+            chunk = uniq[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT key, label FROM llm_label WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            found.update(rows)
+
+        n_hit = sum(1 for k in keys if k in found)
+        self.hits += n_hit
+        self.misses += len(keys) - n_hit
+        return found
+
+    def put_many(self, items: Dict[str, str]) -> int:
+        rows = [(k, v) for k, v in items.items() if is_cacheable(v)]
+        if rows:
+            with self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO llm_label (key, label) VALUES (?, ?)", rows)
+        return len(rows)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def close(self) -> None:
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+    def __getstate__(self):
+        # spawn 워커로 넘길 때 connection 은 제외
+        state = self.__dict__.copy()
+        state["_conn"], state["_pid"] = None, None
+        return state
@@ -0,0 +1,140 @@
+# ============================================================
+# 📦 llm_metrics_utils.py — LLM 라벨링 계측 (backend 별 요청/토큰/지연/재시도/에러/비용)
+#  - CallerMetrics : caller 1개(= LLMPipeLine 1개)에 붙는 누적 카운터
+#      · call    : LLMPipeLine 이 caller 를 부른 1회 (항목 수, 소요 시간, 에러/빈 라벨 항목)
+#      · request : 실제 API 요청 / 로컬 forward 1회 (지연, 입력·출력 토큰, 재시도, 실패)
+#  - summary() : p50/p90/p99 지연, 에러율, 항목당 토큰, 추정 비용(USD)
+#  - merge_metrics : 같은 backend 를 쓰는 runner 들을 합산 (backend 간 비교용)
+# ============================================================
+from __future__ import annotations
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# (입력, 출력) USD / 1M tokens — 공개 가격표 기준 추정치, 가격 변경 시 갱신하거나 cfg.price_per_1m 로 덮어쓰기
+PRICE_PER_1M_TOKENS: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+}
+LOCAL_BACKENDS = ("gpt-opensrc", "llama")     # 로컬 추론 → API 비용 0
+BATCH_API_DISCOUNT = 0.5                        # OpenAI Batch API 는 50% 가격
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """선형 보간 백분위 (numpy.percentile 기본값과 동일). 비어 있으면 None."""
+    if not values:
+        return None
+    xs = sorted(values)
+    pos = (len(xs) - 1) * q / 100.0
+    lo, hi = math.floor(pos), math.ceil(pos)
+    return xs[lo] + (xs[hi] - xs[lo]) * (pos - lo)
+
+
+def is_error_label(label: str) -> bool:
+    # llm_cache_utils.is_cacheable 과 같은 기준: "[... 오류: ...]" / "[... 연결 실패]"
+    label = (label or "").strip()
+    return label.startswith("[") and label.endswith("]")
+
+
+class CallerMetrics:
+    """
+    caller 1개의 누적 계측값.
+
+    - record_call(labels, seconds)     : LLMPipeLine → caller 호출 1회
+    - record_request(latency, error)   : API 요청 / 로컬 배치 forward 1회 (latency=None 이면 지연 미집계, 예: Batch API)
+    - add_tokens(input, output)        : 응답 usage 가 있는 백엔드만
+    - retries                          : 재시도 횟수 (AsyncCaller)
+    """
+
+    def __init__(self, backend: str = "", price_scale: float = 1.0):
+        self.backend = backend
+        self.price_scale = price_scale
+        self.calls = 0
+        self.items = 0
+        self.call_seconds = 0.0
+        self.error_items = 0
+        self.empty_items = 0
+        self.requests = 0
+        self.request_errors = 0
+        self.retries = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.latencies: List[float] = []
+
+    # --------------------------------------------------------
+    def record_call(self, labels: Sequence[str], seconds: float) -> None:
+        self.calls += 1
+        self.items += len(labels)
+        self.call_seconds += seconds
+        self.error_items += sum(1 for lb in labels if is_error_label(lb))
+        self.empty_items += sum(1 for lb in labels if not (lb or "").strip())
+
+    def record_request(self, latency: Optional[float] = None, error: bool = False) -> None:
+        self.requests += 1
+        self.request_errors += int(error)
+        if latency is not None:
+            self.latencies.append(latency)
+
+    def add_tokens(self, input_tokens: Optional[int], output_tokens: Optional[int]) -> None:
+        self.input_tokens += int(input_tokens or 0)
+        self.output_tokens += int(output_tokens or 0)
+
+    # --------------------------------------------------------
+    def estimated_cost(self, model_id: str, price: Optional[Tuple[float, float]] = None) -> Optional[float]:
+        """USD 추정 비용. 로컬 백엔드는 0, 가격을 모르는 모델은 None."""
+        if self.backend in LOCAL_BACKENDS:
+            return 0.0
+        price = price or PRICE_PER_1M_TOKENS.get(model_id)
+        if price is None:
+            return None
+        cost = (self.input_tokens * price[0] + self.output_tokens * price[1]) / 1e6
+        return cost * self.price_scale
+
+    def summary(self, model_id: str = "", price: Optional[Tuple[float, float]] = None) -> Dict:
+        def ms(q: float) -> Optional[float]:
+            v = percentile(self.latencies, q)
+            return None if v is None else round(v * 1000, 1)
+
+        cost = self.estimated_cost(model_id, price)
+        return {
+            "backend": self.backend,
+            "model_id": model_id,
+            "calls": self.calls,
+            "items": self.items,
+            "seconds": round(self.call_seconds, 3),
+            "items_per_sec": round(self.items / self.call_seconds, 2) if self.call_seconds else None,
+            "requests": self.requests,
+            "request_errors": self.request_errors,
+            "retries": self.retries,
+            "latency_ms": {"p50": ms(50), "p90": ms(90), "p99": ms(99), "max": ms(100)},
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "tokens_per_item": round((self.input_tokens + self.output_tokens) / self.items, 2) if self.items else None,
+            "error_items": self.error_items,
+            "empty_items": self.empty_items,
+            "error_rate": round(self.error_items / self.items, 4) if self.items else 0.0,
+            "est_cost_usd": None if cost is None else round(cost, 8),
+        }
+
+
+def merge_metrics(parts: Sequence[Tuple[CallerMetrics, str, Optional[Tuple[float, float]]]]) -> Dict:
+    """
+    같은 backend 의 (metrics, model_id, price) 들을 합산한 summary.
+    지연 백분위는 요청 지연 전체로 다시 계산하고, 비용은 runner 별 추정치의 합 (하나라도 모르면 None).
+    """
+    total = CallerMetrics(parts[0][0].backend)
+    cost: Optional[float] = 0.0
+    for m, model_id, price in parts:
+        for k in ("calls", "items", "call_seconds", "error_items", "empty_items", "requests",
+                  "request_errors", "retries", "input_tokens", "output_tokens"):
+            setattr(total, k, getattr(total, k) + getattr(m, k))
+        total.latencies.extend(m.latencies)
+        c = m.estimated_cost(model_id, price)
+        cost = None if cost is None or c is None else cost + c
+
+    model_ids = list(dict.fromkeys(model_id for _, model_id, _ in parts))
+    out = total.summary(",".join(model_ids))
+    out["est_cost_usd"] = None if cost is None else round(cost, 8)
+    return out
@@ -37,11 +37,19 @@ List[str] -> List[str] 형태로 LLM 기반 분류를 수행하는 통합 유틸
 """
 
 from __future__ import annotations
-from typing import List, Dict, Callable
+from typing import List, Dict, Callable, Optional, Tuple
+from collections import deque
 import os
 import re
+import json
+import time
+import asyncio
+import hashlib
+import inspect
 import warnings
+import threading
 from mindcastlib.configs import LLMConfig
+from mindcastlib.src.llm_metrics_utils import CallerMetrics, BATCH_API_DISCOUNT
 
 #from mindcastlib.configs.llm_config import LLMConfig
 
@@ -167,7 +175,12 @@ try:
 except Exception:
     _HAS_TORCH = False
 
-ALLOWED_LLM_NAMES = ("gpt4o", "gpt-opensrc", "gemini") #"llama"
+ALLOWED_LLM_NAMES = ("gpt4o", "gpt-opensrc", "gemini", "llama")
+
+OPENAI_MODEL = "gpt-4o-mini"
+GEMINI_MODEL = "gemini-1.5-flash"
+HF_ZSHOT_MODEL = "MoritzLaurer/mDeBERTa-v3-base-mnli-xnli"
+HF_ZSHOT_FALLBACK_MODEL = "joeddav/xlm-roberta-large-xnli"
 
 
 # ---------------------------------------------------------------------
@@ -215,16 +228,19 @@ class RoleAdapter:
             self.labels = list(getattr(cfg, "SENTIMENT_CLASSES", ["분노", "슬픔", "불안", "상처", "당황", "기쁨"]))
             self._zshot_template = "이 문장의 감정은 {}이다."
             self._gen_instr = "아래 문장의 감정을 다음 후보 중 하나로만 출력해:"
+            self._pack_instr = "아래 {n}개 문장 각각의 감정을 다음 후보 중 하나로 분류해:"
         elif "주제" in role:
             self.task = "주제"
             self.labels = list(getattr(cfg, "TOPIC_CLASSES", ["경제", "정치", "사회", "연예", "건강","문화","세계","IT/과학","스포츠"]))
             self._zshot_template = "이 문장의 주제는 {}이다."
             self._gen_instr = "아래 문장의 주제를 다음 후보 중 하나로만 출력해:"
+            self._pack_instr = "아래 {n}개 문장 각각의 주제를 다음 후보 중 하나로 분류해:"
         else:
             self.task = "감정"
             self.labels = ["분노", "슬픔", "불안", "상처", "당황", "기쁨"]
             self._zshot_template = "이 문장의 감정은 {}이다."
             self._gen_instr = "아래 문장의 감정을 다음 후보 중 하나로만 출력해:"
+            self._pack_instr = "아래 {n}개 문장 각각의 감정을 다음 후보 중 하나로 분류해:"
 
         self.label_line = ", ".join(self.labels)
         self.idx2label = {str(i + 1): lb for i, lb in enumerate(self.labels)}
@@ -240,6 +256,45 @@ class RoleAdapter:
             f"문장: {text}\n라벨:"
         )
 
+    def packed_prompt(self, texts: List[str]) -> str:
+        """
+        K개 문장을 한 요청에 묶는 프롬프트 (지시문은 한 번만, 출력은 라벨 K개의 JSON 배열).
+        문장 안의 줄바꿈은 공백으로 바꿔 번호 매김이 깨지지 않게 한다.
+        """
+        prefix = f"{self.cfg.role}\n\n" if self.include_prefix and self.cfg.role else ""
+        n = len(texts)
+        lines = "\n".join(f"{i + 1}. {' '.join(str(t).split())}" for i, t in enumerate(texts))
+        example = json.dumps(self.labels[:2], ensure_ascii=False)
+        return (
+            f"{prefix}{self._pack_instr.format(n=n)} {self.label_line}\n"
+            f"- 각 문장마다 반드시 후보 중 하나만, 아무 설명 없이.\n"
+            f"- 출력 형식: 문장 번호 순서대로 라벨 {n}개를 담은 JSON 배열 하나만. 예: {example}\n\n"
+            f"{lines}\n라벨 JSON:"
+        )
+
+    def parse_packed(self, pred: str, n: int) -> List[str]:
+        """
+        packed_prompt 응답에서 JSON 배열을 찾아 라벨 n개로 변환 (각 요소는 pick_label 로 검증).
+        - ["기쁨", ...] 또는 [{"id": 1, "label": "기쁨"}, ...] 형식 허용
+        - 배열을 못 찾거나 길이가 다르면 위치를 믿을 수 없으므로 전부 "" (→ 호출 측에서 단건 폴백)
+        - {id, label} 형식인데 id 가 정확히 1..n 이 아니면 (누락/중복/범위 밖) 역시 전부 ""
+        """
+        m = re.search(r"\[.*\]", pred or "", re.S)
+        try:
+            items = json.loads(m.group(0)) if m else None
+        except ValueError:
+            items = None
+        if not isinstance(items, list) or len(items) != n:
+            return [""] * n
+
+        if all(isinstance(it, dict) for it in items):
+            ids = sorted(str(it.get("id")) for it in items)
+            if ids != sorted(str(i) for i in range(1, n + 1)):
+                return [""] * n
+            items = sorted(items, key=lambda it: int(it["id"]))
+            items = [it.get("label", "") for it in items]
+        return [self.pick_label(it) if isinstance(it, str) else "" for it in items]
+
     def llama_numeric_prompt(self, text: str) -> str:
         """LLaMA용 프롬프트: 숫자 한 글자만 출력하게 유도(생성형 바이어스/장황출력 방지)."""
         return (
@@ -282,12 +337,86 @@ class BaseCaller:
     역할:
     - 모든 백엔드 caller는 BaseCaller를 상속하고, __call__(List[str]) -> List[str]를 구현한다.
     - self.adapter(RoleAdapter)를 통해 라벨/프롬프트/템플릿 공통 유틸을 재사용한다.
+    - model_id / cache_prompt(text) 는 LLMPipeLine 의 라벨 캐시 key 에 사용된다.
+    - self.metrics(CallerMetrics) 에 요청별 지연/토큰/재시도/실패를 기록한다 (_timed, add_tokens).
     """
 
+    model_id = ""
+    whole_input = False     # True 면 labeling ModuleCallable 이 batch_size 대신 입력 전체를 한 번에 넘김
+
     def __init__(self, cfg: LLMConfig):
         self.cfg = cfg
         self.adapter = RoleAdapter(cfg) # Boolean으로 RoleAdapter 값 설정
+        # 생성형 caller 의 multi-item packing (pack_size=1 이면 기존 단건 프롬프트)
+        self.pack_size = max(1, int(getattr(cfg, "pack_size", 1)))
+        self.pack_stats = {"requests": 0, "packed_items": 0, "fallback_items": 0, "prompt_chars": 0}
+        self.metrics = CallerMetrics(getattr(cfg, "llm_name", ""))
+
+    def cache_prompt(self, text: str) -> str:
+        """라벨에 영향을 주는 실제 프롬프트 (packed 모드는 결과가 달라질 수 있으므로 K 도 포함)."""
+        prompt = self.adapter.generative_prompt(text)
+        return prompt if self.pack_size == 1 else f"{prompt}\x00pack={self.pack_size}"
+
+    def pack_indices(self, n: int) -> List[List[int]]:
+        return [list(range(i, min(i + self.pack_size, n))) for i in range(0, n, self.pack_size)]
+
+    def gen_max_tokens(self, n_items: int = 1) -> int:
+        # 단건은 기존과 동일, packed 는 라벨 수만큼 + JSON 구두점 여유
+        per_item = max(8, int(self.cfg.max_token))
+        return per_item if n_items == 1 else per_item * n_items + 16
+
+    def _count_request(self, prompt: str) -> None:
+        self.pack_stats["requests"] += 1
+        self.pack_stats["prompt_chars"] += len(prompt)
+
+    def _timed(self, fn: Callable, *args, **kwargs):
+        """요청 1건(API 호출 / 로컬 배치 forward)의 지연과 실패 여부를 metrics 에 기록."""
+        t0 = time.perf_counter()
+        try:
+            out = fn(*args, **kwargs)
+        except Exception:
+            self.metrics.record_request(time.perf_counter() - t0, error=True)
+            raise
+        self.metrics.record_request(time.perf_counter() - t0)
+        return out
+
+    def _label_generative(self, data: List[str], ask: Callable[[str, int], str], tag: str) -> List[str]:
+        """
+        생성형 caller(OpenAI/Gemini) 공통 루프. ask(prompt, max_tokens) -> 응답 문자열.
+        - pack_size 개씩 packed_prompt 로 한 번에 요청 → parse_packed
+        - 파싱 실패/라벨 밖 응답 항목만 generative_prompt 단건으로 폴백
+        - 요청 예외는 해당 항목들의 에러 문자열 (파이프라인은 계속 진행)
+        """
+        outs: List[str] = [""] * len(data)
+        for idx in self.pack_indices(len(data)):
+            if len(idx) > 1:
+                prompt = self.adapter.packed_prompt([data[i] for i in idx])
+                self._count_request(prompt)
+                try:
+                    labels = self.adapter.parse_packed(self._timed(ask, prompt, self.gen_max_tokens(len(idx))), len(idx))
+                except Exception as e:
+                    for i in idx:
+                        outs[i] = f"[{tag} 오류: {e}]"
+                    continue
+                for i, lb in zip(idx, labels):
+                    outs[i] = lb
+                self.pack_stats["packed_items"] += sum(1 for lb in labels if lb)
+
+            for i in idx:
+                if outs[i]:
+                    continue
+                if len(idx) > 1:
+                    self.pack_stats["fallback_items"] += 1
+                prompt = self.adapter.generative_prompt(data[i])
+                self._count_request(prompt)
+                try:
+                    outs[i] = self.adapter.pick_label(self._timed(ask, prompt, self.gen_max_tokens(1)))
+                except Exception as e:
+                    outs[i] = f"[{tag} 오류: {e}]"
+        return outs
 
+    def close(self) -> None:
+        """네트워크 client 등 caller 가 잡고 있는 자원 정리 (기본: 없음)."""
 
     def __call__(self, data: List[str]) -> List[str]:
         """
@@ -312,6 +441,8 @@ class OpenAICaller(BaseCaller):
     - 환경변수 OPENAI_API_KEY 필요
     """
 
+    model_id = OPENAI_MODEL
+
     def __call__(self, data: List[str]) -> List[str]:
         try:
             from openai import OpenAI
@@ -323,21 +454,18 @@ class OpenAICaller(BaseCaller):
             warnings.warn(f"OpenAI 호출 준비 실패: {e}")
             return ["[OpenAI 연결 실패]"] * len(data)
 
-        outs: List[str] = []
-        for text in data:
-            prompt = self.adapter.generative_prompt(text)
-            try:
-                resp = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.0,
-                    max_tokens=max(8, int(self.cfg.max_token)),
-                )
-                pred = (resp.choices[0].message.content or "").strip()
-                outs.append(self.adapter.pick_label(pred))
-            except Exception as e:
-                outs.append(f"[OpenAI 오류: {e}]")
-        return outs
+        def ask(prompt: str, max_tokens: int) -> str:
+            resp = client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.0,
+                max_tokens=max_tokens,
+            )
+            usage = getattr(resp, "usage", None)
+            self.metrics.add_tokens(getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None))
+            return (resp.choices[0].message.content or "").strip()
+
+        return self._label_generative(data, ask, "OpenAI")
 
 
 # ---------------------------- Hugging Face ----------------------------
@@ -356,39 +484,89 @@ class HFZeroShotCaller(BaseCaller):
     환경:
     - pip install transformers accelerate
     - GPU가 있으면 device=0, 없으면 CPU(-1)
+
+    파이프라인 재사용:
+    - 첫 호출 시 한 번만 로드(lazy)하고, registry_utils 의 프로세스 전역 레지스트리로
+      같은 (모델, device, dtype) 을 쓰는 caller / 파일 간에도 공유 → apply_func_to_* 배치마다 재로딩하지 않음
+    - 로드 직후 더미 문장으로 warm-up 1회 (첫 배치 지연 제거)
+    - cfg.zshot_backend="onnx" 이면 ONNX Runtime int8 (CPU), onnxruntime 이 없으면 torch 로 폴백
+    - cfg.zshot_engine="batched"(기본) 이면 같은 모델로 NLIZeroShotEngine 사용
+      (배치 전체 premise–hypothesis 쌍을 길이 정렬 + token budget 배치로 forward, 텍스트별 softmax 벡터화)
+      "pipeline" 이면 기존 HF pipeline(batch_size=16) 그대로
     """
 
-    def __call__(self, data: List[str]) -> List[str]:
-        try:
-            from transformers import pipeline
+    model_id = HF_ZSHOT_MODEL
+
+    def __init__(self, cfg: LLMConfig):
+        super().__init__(cfg)
+        self.device = "cuda:0" if (_HAS_TORCH and torch.cuda.is_available()) else "cpu"
+        self.zshot_backend = getattr(cfg, "zshot_backend", "torch")
+        self.zshot_dtype = getattr(cfg, "zshot_dtype", None)
+        self.model_name = getattr(cfg, "zshot_model", None) or HF_ZSHOT_MODEL
+        self.zshot_engine = getattr(cfg, "zshot_engine", "batched")
+        self.token_budget = getattr(cfg, "zshot_token_budget", 8192)
+        self.model_id = self._model_id(self.model_name)
+        self._zsc = None
+
+    def cache_prompt(self, text: str) -> str:
+        # NLI 는 텍스트 외에 hypothesis_template + 후보 라벨이 결과를 결정
+        return f"{self.adapter.zshot_template()}\x00{self.adapter.label_line}"
+
+    def _model_id(self, model_name: str) -> str:
+        # onnx int8 / 저정밀도 dtype 은 결과가 달라질 수 있으므로 라벨 캐시 key 를 분리
+        if self.zshot_backend == "onnx":
+            return f"{model_name}|onnx-int8"
+        return f"{model_name}|{self.zshot_dtype}" if self.zshot_dtype else model_name
+
+    def _load(self, model_name: str):
+        from mindcastlib.src.registry_utils import get_hf_pipeline, get_onnx_zeroshot_pipeline
+        if self.zshot_backend == "onnx":
+            try:
+                return get_onnx_zeroshot_pipeline(model_name)
+            except ImportError as e:
+                warnings.warn(f"ONNX backend 사용 불가 ({e}) → torch pipeline 사용")
+                self.zshot_backend = "torch"
+        return get_hf_pipeline("zero-shot-classification", model_name, self.device, self.zshot_dtype)
+
+    def _warmup(self, zsc) -> None:
+        # 레지스트리 공유 모델은 프로세스당 한 번만
+        model = getattr(zsc, "model", zsc)
+        if getattr(model, "_mc_warm", False):
+            return
+        zsc(sequences=["warm-up"], candidate_labels=self.adapter.labels,
+            hypothesis_template=self.adapter.zshot_template(), multi_label=False)
+        model._mc_warm = True
+
+    @property
+    def zsc(self):
+        if self._zsc is None:
             from transformers.utils import logging
             logging.set_verbosity_error()
-        except Exception as e:
-            warnings.warn(f"HuggingFace import 실패: {e}")
-            return ["[HF 연결 실패]"] * len(data)
-
-        device = 0 if (_HAS_TORCH and torch.cuda.is_available()) else -1
+            try:
+                zsc = self._load(self.model_name)
+            except Exception as e1:
+                warnings.warn(f"기본 NLI 모델 준비 실패: {e1} → XLM-R large로 대체")
+                self.model_name = HF_ZSHOT_FALLBACK_MODEL
+                zsc = self._load(self.model_name)
+            self.model_id = self._model_id(self.model_name)
+            if self.zshot_engine == "batched":
+                from mindcastlib.src.zeroshot_utils import NLIZeroShotEngine
+                zsc = NLIZeroShotEngine(zsc.tokenizer, zsc.model, max_length=getattr(zsc, "max_length", None),
+                                        token_budget=self.token_budget)
+            self._warmup(zsc)
+            self._zsc = zsc
+        return self._zsc
 
+    def __call__(self, data: List[str]) -> List[str]:
         try:
-            zsc = pipeline(
-                task="zero-shot-classification",
-                model="MoritzLaurer/mDeBERTa-v3-base-mnli-xnli",
-                device=device,
-            )
-        except Exception as e1:
-            warnings.warn(f"기본 NLI 모델 준비 실패: {e1} → XLM-R large로 대체")
-            try:
-                zsc = pipeline(
-                    task="zero-shot-classification",
-                    model="joeddav/xlm-roberta-large-xnli",
-                    device=device,
-                )
-            except Exception as e2:
-                warnings.warn(f"대체 NLI 모델 준비 실패: {e2}")
-                return ["[HF 연결 실패]"] * len(data)
+            zsc = self.zsc
+        except Exception as e:
+            warnings.warn(f"NLI 모델 준비 실패: {e}")
+            return ["[HF 연결 실패]"] * len(data)
 
         try:
-            results = zsc(
+            results = self._timed(
+                zsc,
                 sequences=data,
                 candidate_labels=self.adapter.labels,
                 hypothesis_template=self.adapter.zshot_template(),
@@ -419,6 +597,8 @@ class GeminiCaller(BaseCaller):
     개인적으로, gemini가 결과값이 제일 잘 나오는 것 같습니다.
     """
 
+    model_id = GEMINI_MODEL
+
     def __call__(self, data: List[str]) -> List[str]:
         try:
             import google.generativeai as genai
@@ -426,30 +606,28 @@ class GeminiCaller(BaseCaller):
             if not api_key:
                 raise RuntimeError("GEMINI_API_KEY 환경변수가 없습니다.")
             genai.configure(api_key=api_key)
-            model = genai.GenerativeModel("gemini-1.5-flash")
+            model = genai.GenerativeModel(GEMINI_MODEL)
         except Exception as e:
             warnings.warn(f"Gemini 호출 준비 실패: {e}")
             return ["[Gemini 연결 실패]"] * len(data)
 
-        outs: List[str] = []
-        for text in data:
-            prompt = self.adapter.generative_prompt(text)
-            try:
-                r = model.generate_content(
-                    prompt,
-                    generation_config={
-                        "temperature": 0.0,
-                        "max_output_tokens": max(8, int(self.cfg.max_token)),
-                        "top_p": 1.0,
-                        "top_k": 1,
-                    },
-                )
-                outs.append(self.adapter.pick_label(getattr(r, "text", "")))
-            except Exception as e:
-                outs.append(f"[Gemini 오류: {e}]")
-        return outs
+        def ask(prompt: str, max_tokens: int) -> str:
+            r = model.generate_content(
+                prompt,
+                generation_config={
+                    "temperature": 0.0,
+                    "max_output_tokens": max_tokens,
+                    "top_p": 1.0,
+                    "top_k": 1,
+                },
+            )
+            usage = getattr(r, "usage_metadata", None)
+            self.metrics.add_tokens(getattr(usage, "prompt_token_count", None),
+                                    getattr(usage, "candidates_token_count", None))
+            return getattr(r, "text", "")
+
+        return self._label_generative(data, ask, "Gemini")
 # -------------------------------- LLaMA -------------------------------
-# 미완성
 class LlamaCaller(BaseCaller):
     """
     LLaMA(및 호환 인스트럭트 LM) 기반 생성형 분류기.
@@ -469,6 +647,19 @@ class LlamaCaller(BaseCaller):
     환경:
     - pip install transformers accelerate sentencepiece torch
     - GPU가 있으면 device_map="auto"로 자동 할당, 없으면 CPU에서도 동작(느릴 수 있음)
+
+    추론 모드 (cfg.llama_mode):
+    - "score"(기본): 생성 대신 제약 채점. left padding 배치 forward 1회로 다음 토큰 logit 중
+      "1".."K" 토큰만 비교해 argmax → 라벨 (장황 출력/첫 라벨 바이어스 없음, 항상 후보 중 하나)
+    - "generate": 기존 greedy 생성 + 숫자 파싱 (left padding 배치 생성)
+    - 후보가 9개를 넘으면(두 자리 번호) 자동으로 generate
+
+    prefix KV-cache (cfg.llama_prefix_cache, 기본 True):
+    - 모든 프롬프트는 "문장: ..." 줄 앞까지(지시문 + 번호 라벨 목록 + chat 템플릿 앞부분)가 동일
+    - 그 prefix 의 KV-cache 를 (모델, task, prefix) 당 한 번만 계산해 ModelRegistry 에 보관하고,
+      배치마다 batch 크기로 펼쳐 "문장: {text}\n정답 번호:" (+ 템플릿 꼬리) 만 forward → 항목당 비용 ≈ 텍스트 길이
+    - 프롬프트는 전체로 한 번 토큰화해 앞부분이 prefix id 와 정확히 같을 때만 그 뒤를 suffix 로 사용
+      (경계에서 토큰이 합쳐지는 항목은 전체 프롬프트 forward 로 폴백) → 입력 id 는 cache 미사용과 동일
     """
 
     _digit_re = re.compile(r"\b([1-9])\b")
@@ -480,6 +671,7 @@ class LlamaCaller(BaseCaller):
             or getattr(cfg, "hf_model_name", None)
             or "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
         )
+        self.model_id = self.model_name
         try:
             from transformers import AutoTokenizer, pipeline
             try:
@@ -502,6 +694,33 @@ class LlamaCaller(BaseCaller):
         self.idx2label = {str(i + 1): lb for i, lb in enumerate(self.adapter.labels)}
         self.numbered = "; ".join([f"{i}) {lb}" for i, lb in self.idx2label.items()])
 
+        self.mode = getattr(cfg, "llama_mode", "score")
+        self.batch_size = int(getattr(cfg, "llama_batch_size", 16))
+        self.use_prefix_cache = bool(getattr(cfg, "llama_prefix_cache", True)) and self._gen is not None
+        self._prefix = None
+        self._label_token_ids = None
+        if self._tok is not None:
+            # 배치 생성/채점 모두 left padding (마지막 위치 = 다음 토큰 예측 위치)
+            self._tok.padding_side = "left"
+            if self._tok.pad_token is None:
+                self._tok.pad_token = self._tok.eos_token
+            self._label_token_ids = self._resolve_label_token_ids()
+        if self.mode == "score" and self._label_token_ids is None:
+            self.mode = "generate"
+
+    def _resolve_label_token_ids(self) -> Optional[List[int]]:
+        """"1".."K" 각각의 숫자 토큰 id. 한 자리 번호가 단일 토큰으로 안 잡히면 None (→ generate)."""
+        if len(self.idx2label) > 9:
+            return None
+        ids = []
+        for k in self.idx2label:
+            # sentencepiece 는 "1" → ["▁", "1"] 일 수 있으므로 마지막 토큰(숫자 자체)을 사용
+            pieces = self._tok.encode(k, add_special_tokens=False)
+            if not pieces or self._tok.decode(pieces[-1:]).strip() != k:
+                return None
+            ids.append(pieces[-1])
+        return ids if len(set(ids)) == len(ids) else None
+
     def _build_prompt(self, text: str) -> str:
         """
         숫자만 출력하도록 강하게 유도하는 한국어 시스템 프롬프트를 구성.
@@ -527,6 +746,127 @@ class LlamaCaller(BaseCaller):
                 return instr
         return instr
 
+    def cache_prompt(self, text: str) -> str:
+        # prefix cache 사용 여부는 입력 id 가 같으므로 key 에 넣지 않음
+        return f"{self._build_prompt(text)}\x00{self.mode}"
+
+    # --------------------------------------------------------
+    # 🔁 prefix KV-cache
+    # --------------------------------------------------------
+    _TEXT_SLOT = "\ue000"    # 프롬프트 분리용 자리표시 문자 (private use area)
+
+    def _prompt_prefix(self) -> str:
+        """_build_prompt 에서 텍스트 자리표시가 든 줄 앞까지 (모든 프롬프트에 공통인 문자열 prefix)."""
+        rendered = self._build_prompt(self._TEXT_SLOT)
+        return rendered[:rendered.rfind("\n", 0, rendered.index(self._TEXT_SLOT)) + 1]
+
+    def _prefix_state(self):
+        """(prefix 토큰 id, 레이어별 (key, value) (1, h, P, d)). (모델, task, prefix) 당 1회 계산."""
+        if self._prefix is None:
+            from mindcastlib.src.registry_utils import ModelRegistry
+            prefix = self._prompt_prefix()
+            model = self._gen.model
+
+            def _load():
+                # 전체 프롬프트와 같은 토큰화(BOS 등 앞쪽 special 포함), 끝에 붙는 special 은 제외
+                plain = self._tok(prefix, add_special_tokens=False)["input_ids"]
+                full = self._tok(prefix)["input_ids"]
+                head = next(i for i in range(len(full) - len(plain) + 1) if full[i:i + len(plain)] == plain)
+                ids = full[:head + len(plain)]
+                with torch.no_grad():
+                    cache = model(input_ids=torch.tensor([ids], device=model.device), use_cache=True).past_key_values
+                if hasattr(cache, "layers"):
+                    layers = [(layer.keys, layer.values) for layer in cache.layers]
+                elif hasattr(cache, "key_cache"):
+                    layers = list(zip(cache.key_cache, cache.value_cache))
+                else:
+                    layers = [tuple(kv[:2]) for kv in cache]
+                return ids, layers
+
+            key = ("llama_prefix_kv", self.model_name, self.adapter.task,
+                   hashlib.sha1(prefix.encode("utf-8")).hexdigest())
+            self._prefix = ModelRegistry.get(key, _load)
+        return self._prefix
+
+    def _split_prompts(self, texts: List[str]) -> List[Optional[List[int]]]:
+        """
+        각 프롬프트를 전체로 한 번 토큰화하고, 앞부분이 cache 된 prefix id 와 정확히 같으면
+        그 뒤 suffix id 를, 경계에서 토큰이 달라지면 None (→ 전체 프롬프트 forward 로 폴백).
+        """
+        prefix_ids = self._prefix_state()[0]
+        P = len(prefix_ids)
+        out: List[Optional[List[int]]] = []
+        for ids in self._tok([self._build_prompt(t) for t in texts])["input_ids"]:
+            out.append(list(ids[P:]) if len(ids) > P and list(ids[:P]) == prefix_ids else None)
+        return out
+
+    def _expand_prefix(self, layers, B: int):
+        # forward 가 cache 에 suffix 를 이어 붙이므로 배치마다 새 cache 로 복사
+        from transformers import DynamicCache
+        try:
+            cache = DynamicCache(config=self._gen.model.config)
+        except TypeError:
+            cache = DynamicCache()
+        for i, (k, v) in enumerate(layers):
+            cache.update(k.expand(B, -1, -1, -1).contiguous(), v.expand(B, -1, -1, -1).contiguous(), i)
+        return cache
+
+    def _forward_with_prefix(self, seqs: List[List[int]]):
+        """
+        prefix cache 뒤에 suffix id 들(_split_prompts 결과)을 right padding 으로 forward.
+        반환: (각 행 마지막 실제 위치의 logits (B, V), cache, attention mask (B, P+S), 마지막 위치 position (B,))
+        """
+        prefix_ids, layers = self._prefix_state()
+        n_prefix = len(prefix_ids)
+        model = self._gen.model
+        B, S = len(seqs), max(len(x) for x in seqs)
+        input_ids = torch.full((B, S), self._tok.pad_token_id, dtype=torch.long)
+        suffix_mask = torch.zeros(B, S, dtype=torch.long)
+        for b, x in enumerate(seqs):
+            input_ids[b, :len(x)] = torch.tensor(x, dtype=torch.long)
+            suffix_mask[b, :len(x)] = 1
+
+        attn = torch.cat([torch.ones(B, n_prefix, dtype=torch.long), suffix_mask], dim=1).to(model.device)
+        position_ids = (n_prefix + torch.arange(S)).expand(B, S).to(model.device)
+        with torch.no_grad():
+            out = model(
+                input_ids=input_ids.to(model.device),
+                attention_mask=attn,
+                position_ids=position_ids,
+                past_key_values=self._expand_prefix(layers, B),
+                use_cache=True,
+            )
+        last = (suffix_mask.sum(-1) - 1).to(model.device)
+        logits = out.logits[torch.arange(B, device=model.device), last]
+        return logits, out.past_key_values, attn, n_prefix + last
+
+    def _greedy_with_prefix(self, seqs: List[List[int]], max_new_tokens: int) -> List[str]:
+        """prefix cache 를 쓰는 greedy 생성 (generate 모드). 새 토큰은 행별 position 으로 이어 붙인다."""
+        model = self._gen.model
+        logits, cache, attn, pos = self._forward_with_prefix(seqs)
+        eos = getattr(self._tok, "eos_token_id", None)
+        B = len(seqs)
+        tokens: List[List[int]] = [[] for _ in range(B)]
+        done = [False] * B
+        nxt = logits.argmax(-1)
+        for step in range(max_new_tokens):
+            for b, t in enumerate(nxt.tolist()):
+                if not done[b]:
+                    if t == eos:
+                        done[b] = True
+                    else:
+                        tokens[b].append(t)
+            if all(done) or step == max_new_tokens - 1:
+                break
+            attn = torch.cat([attn, torch.ones(B, 1, dtype=attn.dtype, device=attn.device)], dim=1)
+            pos = pos + 1
+            with torch.no_grad():
+                out = model(input_ids=nxt[:, None], attention_mask=attn, position_ids=pos[:, None],
+                            past_key_values=cache, use_cache=True)
+            cache = out.past_key_values
+            nxt = out.logits[:, -1].argmax(-1)
+        return [self._tok.decode(t, skip_special_tokens=True) for t in tokens]
+
     def _parse_index(self, s: str) -> str:
         """
         생성된 텍스트에서 첫 한 자리 숫자를 추출하여 라벨로 변환.
@@ -540,30 +880,559 @@ class LlamaCaller(BaseCaller):
             return ""
         return self.idx2label.get(m.group(1), "")
 
+    def score_batch(self, prompts: List[str]) -> "torch.Tensor":
+        """
+        left padding 배치 forward 1회 → 마지막 위치의 "1".."K" 토큰 logit (B, K).
+        토큰화는 text-generation pipeline 이 문자열 프롬프트에 하는 것과 같이 토크나이저 기본값
+        (BOS 등 special token 포함) → generate 모드와 같은 입력 id.
+        """
+        model = self._gen.model
+        enc = self._tok(prompts, return_tensors="pt", padding=True)
+        input_ids = enc["input_ids"].to(model.device)
+        attn = enc["attention_mask"].to(model.device)
+        # left padding 이므로 실제 토큰 기준 위치 (generate 와 같은 방식)
+        position_ids = (attn.cumsum(-1) - 1).clamp(min=0)
+        with torch.no_grad():
+            logits = model(input_ids=input_ids, attention_mask=attn, position_ids=position_ids).logits[:, -1, :]
+        return logits[:, self._label_token_ids].float()
+
+    def _route(self, chunk: List[str], with_prefix: Callable, full: Callable) -> List:
+        """
+        prefix 로 분리되는 항목은 with_prefix(suffix id 들), 나머지(cache 미사용 / 경계 불일치)는
+        full(텍스트들) 로 처리해 입력 순서대로 합침. 각 호출은 요청 1건으로 계측.
+        """
+        seqs = self._split_prompts(chunk) if self.use_prefix_cache else [None] * len(chunk)
+        hit = [j for j, x in enumerate(seqs) if x is not None]
+        miss = [j for j, x in enumerate(seqs) if x is None]
+        results: List = [None] * len(chunk)
+        if hit:
+            for j, r in zip(hit, self._timed(with_prefix, [seqs[j] for j in hit])):
+                results[j] = r
+        if miss:
+            for j, r in zip(miss, self._timed(full, [chunk[j] for j in miss])):
+                results[j] = r
+        return results
+
+    def _generate_full(self, texts: List[str], max_new_tokens: int) -> List[str]:
+        ys = self._gen(
+            [self._build_prompt(t) for t in texts],
+            batch_size=len(texts),
+            max_new_tokens=max_new_tokens,
+            do_sample=False,
+            return_full_text=False,
+            repetition_penalty=1.0,
+            eos_token_id=getattr(self._tok, "eos_token_id", None),
+            pad_token_id=self._tok.pad_token_id,
+        )
+        return [y[0].get("generated_text") or y[0].get("text") or "" for y in ys]
+
+    def _call_score(self, data: List[str]) -> List[str]:
+        labels = list(self.idx2label.values())
+        outs: List[str] = []
+        for i in range(0, len(data), self.batch_size):
+            chunk = data[i:i + self.batch_size]
+            try:
+                scores = self._route(
+                    chunk,
+                    lambda seqs: self._forward_with_prefix(seqs)[0][:, self._label_token_ids],
+                    lambda texts: self.score_batch([self._build_prompt(t) for t in texts]),
+                )
+                outs.extend(labels[int(sc.argmax())] for sc in scores)
+            except Exception as e:
+                outs.extend([f"[LLaMA 오류: {e}]"] * len(chunk))
+        return outs
+
+    def _call_generate(self, data: List[str]) -> List[str]:
+        max_new = max(2, int(self.cfg.max_token))
+        outs: List[str] = []
+        for i in range(0, len(data), self.batch_size):
+            chunk = data[i:i + self.batch_size]
+            try:
+                gen_texts = self._route(
+                    chunk,
+                    lambda seqs: self._greedy_with_prefix(seqs, max_new),
+                    lambda texts: self._generate_full(texts, max_new),
+                )
+            except Exception as e:
+                outs.extend([f"[LLaMA 오류: {e}]"] * len(chunk))
+                continue
+            for gen_text in gen_texts:
+                gen_text = gen_text.strip()
+                outs.append(self._parse_index(gen_text) or self.adapter.pick_label(gen_text))
+        return outs
+
     def __call__(self, data: List[str]) -> List[str]:
         if self._gen is None:
             return ["[LLaMA 연결 실패]"] * len(data)
+        if self.mode == "score":
+            return self._call_score(data)
+        return self._call_generate(data)
 
-        outs: List[str] = []
-        for text in data:
-            prompt = self._build_prompt(text)
+
+# ---------------------------------------------------------------------
+# 비동기 동시 호출 엔진 (OpenAI / Gemini)
+# ---------------------------------------------------------------------
+class AsyncRateLimiter:
+    """
+    분당 요청 수(RPM) / 분당 토큰 수(TPM) 제한 (최근 window 초 sliding window).
+
+    - acquire(tokens): 한도 안에 들어올 때까지 대기 후 요청/토큰 기록
+    - correct(delta) : 응답 usage 로 추정 토큰 수 보정
+    - asyncio 단일 스레드에서 검사와 기록 사이에 await 가 없으므로 lock 불필요
+    - caller 에 붙어 있으므로 apply_func_to_* 의 배치 호출 사이에도 한도가 유지됨
+    """
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None, window: float = 60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self._requests: deque = deque()
+        self._tokens: deque = deque()       # (t, n)
+        self._token_sum = 0
+
+    def _prune(self, now: float) -> None:
+        while self._requests and now - self._requests[0] >= self.window:
+            self._requests.popleft()
+        while self._tokens and now - self._tokens[0][0] >= self.window:
+            self._token_sum -= self._tokens.popleft()[1]
+
+    async def acquire(self, tokens: int = 0) -> None:
+        while True:
+            now = time.monotonic()
+            self._prune(now)
+            ok_rpm = self.rpm is None or len(self._requests) < self.rpm
+            # 한 요청이 tpm 보다 커도 창이 비어 있으면 통과 (무한 대기 방지)
+            ok_tpm = self.tpm is None or self._token_sum + tokens <= self.tpm or not self._tokens
+            if ok_rpm and ok_tpm:
+                self._requests.append(now)
+                self._tokens.append((now, tokens))
+                self._token_sum += tokens
+                return
+
+            waits = []
+            if not ok_rpm:
+                waits.append(self._requests[0] + self.window - now)
+            if not ok_tpm:
+                waits.append(self._tokens[0][0] + self.window - now)
+            await asyncio.sleep(max(0.01, min(waits)))
+
+    def correct(self, delta: int) -> None:
+        if delta:
+            self._tokens.append((time.monotonic(), delta))
+            self._token_sum += delta
+
+
+class AsyncCaller(BaseCaller):
+    """
+    동시 요청 기반 생성형 caller 의 공통 엔진 (List[str] -> List[str] 계약 유지, 입력 순서대로 반환).
+
+    - concurrency  : 동시에 진행 중인 요청 수 상한 (asyncio.Semaphore)
+    - rpm / tpm    : AsyncRateLimiter 로 분당 요청/토큰 제한
+    - max_retries  : 429 / 5xx / 연결 오류는 지수 backoff 로 재시도, 그 외 오류는 요소별 에러 문자열
+    - pack_size    : _label_generative 와 같은 packed 요청 + 항목별 단건 폴백
+    - 이벤트 루프(전용 daemon 스레드)와 client 는 caller 당 1개를 만들어 배치 호출 사이에 재사용
+      (connection pool 유지, Jupyter 처럼 루프가 이미 도는 환경에서도 동작). close() 로 정리, 다음 호출 시 다시 생성.
+    파생 클래스는 _make_client() 와 _acomplete(client, prompt, max_tokens) -> (응답, (입력 토큰, 출력 토큰) | None) 를 구현한다.
+    """
+
+    name = "Async"
+    backoff = 1.0
+    whole_input = True      # 동시성은 semaphore 가 제한하므로 labeling 에서 입력 전체를 한 번에 받음
+
+    def __init__(self, cfg: LLMConfig):
+        super().__init__(cfg)
+        self.concurrency = max(1, int(getattr(cfg, "concurrency", 1)))
+        self.max_retries = int(getattr(cfg, "max_retries", 3))
+        self.limiter = AsyncRateLimiter(getattr(cfg, "rpm", None), getattr(cfg, "tpm", None))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client = None
+
+    def _make_client(self):
+        raise NotImplementedError
+
+    # --------------------------------------------------------
+    # 🔁 caller 수명 동안 유지되는 이벤트 루프 / client
+    # --------------------------------------------------------
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name=f"{self.name}-async", daemon=True)
+            self._thread.start()
+        return self._loop
+
+    async def _aclose_client(self) -> None:
+        client, self._client = self._client, None
+        close = getattr(client, "close", None)
+        if close is not None:
+            res = close()
+            if inspect.isawaitable(res):
+                await res
+
+    def close(self) -> None:
+        """client 를 닫고 이벤트 루프 스레드 종료 (다음 호출 시 다시 생성)."""
+        if self._loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._aclose_client(), self._loop).result()
+        except Exception as e:
+            warnings.warn(f"{self.name} client close 실패: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = self._thread = None
+
+    async def _acomplete(self, client, prompt: str, max_tokens: int) -> Tuple[str, Optional[Tuple[int, int]]]:
+        raise NotImplementedError
+
+    @staticmethod
+    def estimate_tokens(prompt: str, max_tokens: int) -> int:
+        # 한국어는 대략 글자당 1토큰 이하 → 프롬프트 글자 수 + 출력 상한으로 보수적으로 추정
+        return len(prompt) + max_tokens
+
+    @staticmethod
+    def _is_retryable(e: Exception) -> bool:
+        status = getattr(e, "status_code", None) or getattr(e, "code", None)
+        if isinstance(status, int) and (status == 429 or status >= 500):
+            return True
+        name = type(e).__name__
+        return any(k in name for k in ("RateLimit", "Timeout", "Connection", "ResourceExhausted", "ServiceUnavailable"))
+
+    async def _request(self, client, sem: asyncio.Semaphore, prompt: str, max_tokens: int) -> str:
+        """rate limit + 재시도를 거친 요청 1건. 재시도 불가/소진 시 마지막 예외를 올린다."""
+        est = self.estimate_tokens(prompt, max_tokens)
+        self._count_request(prompt)
+        async with sem:
+            for attempt in range(self.max_retries + 1):
+                await self.limiter.acquire(est)
+                t0 = time.perf_counter()
+                try:
+                    raw, usage = await self._acomplete(client, prompt, max_tokens)
+                except Exception as e:
+                    if attempt < self.max_retries and self._is_retryable(e):
+                        self.metrics.retries += 1
+                        await asyncio.sleep(self.backoff * (2 ** attempt))
+                        continue
+                    self.metrics.record_request(time.perf_counter() - t0, error=True)
+                    raise
+                # 지연은 마지막 시도 기준 (rate limit / backoff 대기 제외)
+                self.metrics.record_request(time.perf_counter() - t0)
+                if isinstance(usage, int):
+                    usage = (usage, 0)      # 입력/출력 구분 없이 총 토큰 수만 주는 구현
+                if usage:
+                    self.metrics.add_tokens(*usage)
+                    self.limiter.correct(sum(int(u or 0) for u in usage) - est)
+                return raw
+
+    async def _arun(self, data: List[str]) -> List[str]:
+        if self._client is None:
             try:
-                y = self._gen(
-                    prompt,
-                    max_new_tokens=max(2, int(self.cfg.max_token)),
-                    do_sample=False,
-                    temperature=0.0,
-                    return_full_text=False,
-                    repetition_penalty=1.0,
-                    eos_token_id=getattr(self._tok, "eos_token_id", None),
-                )
-                gen_text = (y[0].get("generated_text") or y[0].get("text") or "").strip()
-                label = self._parse_index(gen_text)
-                if not label:
-                    label = self.adapter.pick_label(gen_text)
-                outs.append(label)
+                self._client = self._make_client()
             except Exception as e:
-                outs.append(f"[LLaMA 오류: {e}]")
+                warnings.warn(f"{self.name} 호출 준비 실패: {e}")
+                return [f"[{self.name} 연결 실패]"] * len(data)
+        client = self._client
+
+        sem = asyncio.Semaphore(self.concurrency)
+        outs: List[str] = [""] * len(data)
+
+        async def single(i: int) -> None:
+            try:
+                raw = await self._request(client, sem, self.adapter.generative_prompt(data[i]), self.gen_max_tokens(1))
+                outs[i] = self.adapter.pick_label(raw)
+            except Exception as e:
+                outs[i] = f"[{self.name} 오류: {e}]"
+
+        async def unit(idx: List[int]) -> None:
+            if len(idx) > 1:
+                try:
+                    raw = await self._request(
+                        client, sem, self.adapter.packed_prompt([data[i] for i in idx]), self.gen_max_tokens(len(idx))
+                    )
+                except Exception as e:
+                    for i in idx:
+                        outs[i] = f"[{self.name} 오류: {e}]"
+                    return
+                labels = self.adapter.parse_packed(raw, len(idx))
+                for i, lb in zip(idx, labels):
+                    outs[i] = lb
+                self.pack_stats["packed_items"] += sum(1 for lb in labels if lb)
+                missing = [i for i in idx if not outs[i]]
+                self.pack_stats["fallback_items"] += len(missing)
+            else:
+                missing = idx
+            await asyncio.gather(*(single(i) for i in missing))
+
+        await asyncio.gather(*(unit(idx) for idx in self.pack_indices(len(data))))
+        return outs
+
+    def __call__(self, data: List[str]) -> List[str]:
+        if not data:
+            return []
+        return asyncio.run_coroutine_threadsafe(self._arun(data), self._ensure_loop()).result()
+
+
+class AsyncOpenAICaller(AsyncCaller):
+    """
+    OpenAICaller 의 동시 요청 버전 (openai.AsyncOpenAI).
+    cfg.api_base (또는 OPENAI_BASE_URL) 로 OpenAI 호환 로컬 mock 서버에 붙여 테스트 가능.
+    """
+
+    name = "OpenAI"
+    model_id = OPENAI_MODEL
+
+    def _make_client(self):
+        from openai import AsyncOpenAI
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY 환경변수가 없습니다.")
+        base_url = getattr(self.cfg, "api_base", None) or os.getenv("OPENAI_BASE_URL")
+        # 재시도는 엔진에서 처리
+        return AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+
+    async def _acomplete(self, client, prompt: str, max_tokens: int) -> Tuple[str, Optional[Tuple[int, int]]]:
+        resp = await client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.0,
+            max_tokens=max_tokens,
+        )
+        usage = getattr(resp, "usage", None)
+        tokens = (usage.prompt_tokens, usage.completion_tokens) if usage is not None else None
+        return (resp.choices[0].message.content or "").strip(), tokens
+
+
+class AsyncGeminiCaller(AsyncCaller):
+    """GeminiCaller 의 동시 요청 버전 (generate_content_async)."""
+
+    name = "Gemini"
+    model_id = GEMINI_MODEL
+
+    def _make_client(self):
+        import google.generativeai as genai
+        api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise RuntimeError("GEMINI_API_KEY 환경변수가 없습니다.")
+        genai.configure(api_key=api_key)
+        return genai.GenerativeModel(GEMINI_MODEL)
+
+    async def _acomplete(self, client, prompt: str, max_tokens: int) -> Tuple[str, Optional[Tuple[int, int]]]:
+        r = await client.generate_content_async(
+            prompt,
+            generation_config={
+                "temperature": 0.0,
+                "max_output_tokens": max_tokens,
+                "top_p": 1.0,
+                "top_k": 1,
+            },
+        )
+        usage = getattr(r, "usage_metadata", None)
+        tokens = (usage.prompt_token_count, usage.candidates_token_count) if usage is not None else None
+        return getattr(r, "text", ""), tokens
+
+
+# ---------------------------------------------------------------------
+# OpenAI Batch API (대규모 오프라인 라벨링)
+# ---------------------------------------------------------------------
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_MAX_REQUESTS = 50000          # Batch API 입력 파일 1개당 요청 수 상한
+BATCH_FINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+
+class OpenAIBatchCaller(BaseCaller):
+    """
+    OpenAI Batch API 기반 job 모드 (List[str] -> List[str] 계약 유지).
+
+    흐름:
+    1) 요청(JSONL, custom_id 부여)을 cfg.batch_dir 에 기록 → files.create(purpose="batch") → batches.create
+    2) batches.retrieve 로 완료될 때까지 polling (cfg.batch_poll_interval 초 간격)
+    3) output / error 파일을 custom_id 로 입력 순서에 다시 매핑
+    - pack_size > 1 이면 1차 배치는 packed 프롬프트, 파싱 실패 항목만 2차 배치에서 단건 프롬프트로 재요청
+    - 같은 요청 파일(내용 sha1)의 job manifest 가 있으면 재제출하지 않고 기존 batch 를 이어서 polling
+      (timeout / 프로세스 중단 후 재실행 시 비용 중복 없음)
+    - client 를 주입하면 그대로 사용 (로컬 fake batch endpoint 테스트용)
+    """
+
+    name = "OpenAI"
+    model_id = OPENAI_MODEL
+    whole_input = True      # Batch API 는 전체 입력을 한 job 으로 제출
+
+    def __init__(self, cfg: LLMConfig, client=None):
+        super().__init__(cfg)
+        self._client = client
+        self.batch_dir = getattr(cfg, "batch_dir", None) or os.path.join("outputs", "llm_batches")
+        self.poll_interval = float(getattr(cfg, "batch_poll_interval", 30.0))
+        self.timeout = getattr(cfg, "batch_timeout", None)
+        self.metrics.price_scale = BATCH_API_DISCOUNT
+
+    def _make_client(self):
+        if self._client is not None:
+            return self._client
+        from openai import OpenAI
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY 환경변수가 없습니다.")
+        base_url = getattr(self.cfg, "api_base", None) or os.getenv("OPENAI_BASE_URL")
+        return OpenAI(api_key=api_key, base_url=base_url)
+
+    # --------------------------------------------------------
+    # 📤 submit (manifest 로 재제출 방지)
+    # --------------------------------------------------------
+    def _request_line(self, custom_id: str, prompt: str, max_tokens: int) -> Dict:
+        self._count_request(prompt)
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": OPENAI_MODEL,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": 0.0,
+                "max_tokens": max_tokens,
+            },
+        }
+
+    def _submit(self, client, lines: List[Dict]) -> str:
+        payload = "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines)
+        job_key = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+        os.makedirs(self.batch_dir, exist_ok=True)
+        input_path = os.path.join(self.batch_dir, f"batch_{job_key}.jsonl")
+        manifest_path = os.path.join(self.batch_dir, f"batch_{job_key}.json")
+
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            status = getattr(client.batches.retrieve(manifest["batch_id"]), "status", None)
+            if status not in ("failed", "cancelled", "expired"):
+                print(f"[Batch] resume {manifest['batch_id']} ({status}) ← {manifest_path}")
+                return manifest["batch_id"]
+
+        with open(input_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        with open(input_path, "rb") as f:
+            input_file = client.files.create(file=f, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"batch_id": batch.id, "input_file_id": input_file.id, "n": len(lines)}, f)
+        print(f"[Batch] submitted {batch.id}: {len(lines)} requests → {input_path}")
+        return batch.id
+
+    # --------------------------------------------------------
+    # ⏳ polling + 📥 결과 수집
+    # --------------------------------------------------------
+    def _wait(self, client, batch_ids: List[str]) -> Dict[str, object]:
+        t0 = time.time()
+        done: Dict[str, object] = {}
+        while True:
+            for bid in batch_ids:
+                if bid not in done:
+                    b = client.batches.retrieve(bid)
+                    if getattr(b, "status", None) in BATCH_FINAL_STATES:
+                        done[bid] = b
+            if len(done) == len(batch_ids):
+                return done
+            if self.timeout is not None and time.time() - t0 > self.timeout:
+                raise TimeoutError(f"batch 대기 시간 초과 ({[b for b in batch_ids if b not in done]})")
+            time.sleep(self.poll_interval)
+
+    @staticmethod
+    def _read_file(client, file_id: Optional[str]) -> List[Dict]:
+        if not file_id:
+            return []
+        content = client.files.content(file_id)
+        text = getattr(content, "text", content)
+        if isinstance(text, bytes):
+            text = text.decode("utf-8")
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    def _collect(self, client, batch) -> Dict[str, Tuple[bool, str]]:
+        """custom_id → (성공 여부, 응답 문자열 또는 에러 메시지)."""
+        out: Dict[str, Tuple[bool, str]] = {}
+        rows = self._read_file(client, getattr(batch, "output_file_id", None))
+        rows += self._read_file(client, getattr(batch, "error_file_id", None))
+        for row in rows:
+            resp = row.get("response") or {}
+            body = resp.get("body") or {}
+            if row.get("error") or resp.get("status_code", 200) != 200:
+                err = row.get("error") or body.get("error") or {"status_code": resp.get("status_code")}
+                out[row["custom_id"]] = (False, str(err.get("message", err) if isinstance(err, dict) else err))
+                self.metrics.record_request(error=True)
+                continue
+            usage = body.get("usage") or {}
+            self.metrics.add_tokens(usage.get("prompt_tokens"), usage.get("completion_tokens"))
+            try:
+                out[row["custom_id"]] = (True, (body["choices"][0]["message"]["content"] or "").strip())
+                self.metrics.record_request()
+            except (KeyError, IndexError, TypeError) as e:
+                out[row["custom_id"]] = (False, f"응답 형식 오류 {e}")
+                self.metrics.record_request(error=True)
+        return out
+
+    def _run_round(self, client, requests: Dict[str, Tuple[str, int]]) -> Dict[str, Tuple[bool, str]]:
+        """{custom_id: (prompt, max_tokens)} 를 BATCH_MAX_REQUESTS 단위 job 으로 나눠 제출하고 결과 수집."""
+        lines = [self._request_line(cid, p, mt) for cid, (p, mt) in requests.items()]
+        batch_ids = [self._submit(client, lines[i:i + BATCH_MAX_REQUESTS])
+                     for i in range(0, len(lines), BATCH_MAX_REQUESTS)]
+        results: Dict[str, Tuple[bool, str]] = {}
+        for bid, batch in self._wait(client, batch_ids).items():
+            status = getattr(batch, "status", None)
+            if status != "completed":
+                print(f"[Warn] batch {bid} ended with status={status}")
+            results.update(self._collect(client, batch))
+        return results
+
+    # --------------------------------------------------------
+    def __call__(self, data: List[str]) -> List[str]:
+        if not data:
+            return []
+        try:
+            client = self._make_client()
+        except Exception as e:
+            warnings.warn(f"OpenAI 호출 준비 실패: {e}")
+            return ["[OpenAI 연결 실패]"] * len(data)
+
+        outs: List[str] = [""] * len(data)
+        groups = self.pack_indices(len(data))
+        try:
+            # 1차: packed (pack_size=1 이면 단건) 요청
+            res = self._run_round(client, {
+                f"u{j}": ((self.adapter.packed_prompt([data[i] for i in idx]) if len(idx) > 1
+                           else self.adapter.generative_prompt(data[idx[0]])),
+                          self.gen_max_tokens(len(idx)))
+                for j, idx in enumerate(groups)
+            })
+            for j, idx in enumerate(groups):
+                ok, content = res.get(f"u{j}", (False, "batch 결과 없음"))
+                if not ok:
+                    for i in idx:
+                        outs[i] = f"[OpenAI 오류: {content}]"
+                elif len(idx) > 1:
+                    labels = self.adapter.parse_packed(content, len(idx))
+                    for i, lb in zip(idx, labels):
+                        outs[i] = lb
+                    self.pack_stats["packed_items"] += sum(1 for lb in labels if lb)
+                else:
+                    outs[idx[0]] = self.adapter.pick_label(content)
+
+            # 2차: packed 파싱 실패 항목만 단건 프롬프트로
+            missing = [i for idx in groups if len(idx) > 1 for i in idx if not outs[i]]
+            if missing:
+                self.pack_stats["fallback_items"] += len(missing)
+                res = self._run_round(client, {
+                    f"s{i}": (self.adapter.generative_prompt(data[i]), self.gen_max_tokens(1)) for i in missing
+                })
+                for i in missing:
+                    ok, content = res.get(f"s{i}", (False, "batch 결과 없음"))
+                    outs[i] = self.adapter.pick_label(content) if ok else f"[OpenAI 오류: {content}]"
+        except Exception as e:
+            # 제출/polling 실패: 아직 채워지지 않은 항목만 에러 문자열 (manifest 가 남아 재실행 시 이어서 진행)
+            for i in range(len(data)):
+                if not outs[i]:
+                    outs[i] = f"[OpenAI 배치 오류: {e}]"
         return outs
 
 
@@ -578,6 +1447,9 @@ class LLMPipeLine:
     - 초기화 시 cfg.llm_name을 검증하고, 해당하는 Caller 인스턴스를 생성.
     - forward/__call__에서 입력 검증(List[str]) 후 Caller에게 위임.
     - 모든 Caller는 동일한 계약(입력/출력: List[str])을 지키므로 상위 레벨 코드가 단순해짐.
+    - cfg.label_cache 가 있으면 (backend, model id, 프롬프트, 텍스트) 단위 영구 캐시를 먼저 조회하고
+      miss 인 고유 텍스트만 Caller 에 넘긴다. 에러 문자열 / 빈 라벨은 캐시하지 않는다.
+    - Caller 호출마다 항목 수/소요 시간/에러 항목을 caller.metrics 에 기록 → metrics_summary()
 
     사용 예:
         cfg = LLMConfig().CLASSIFY_SENTIMENT()
@@ -590,7 +1462,13 @@ class LLMPipeLine:
         "gpt4o":       OpenAICaller, # OpenAI Chat Completions
         "gpt-opensrc": HFZeroShotCaller,  # Hugging Face zero-shot (NLI)
         "gemini":      GeminiCaller, # Google Generative AI
-        #"llama":       LlamaCaller, # LLaMA / TinyLlama / 호환 모델
+        "llama":       LlamaCaller, # LLaMA / TinyLlama / 호환 모델 (제약 채점)
+    }
+
+    # cfg.concurrency > 1 이면 동시 요청 버전 사용
+    _ASYNC_DISPATCH: Dict[str, Callable[[LLMConfig], BaseCaller]] = {
+        "gpt4o":       AsyncOpenAICaller,
+        "gemini":      AsyncGeminiCaller,
     }
 
     def __init__(self, cfg: LLMConfig):
@@ -598,7 +1476,61 @@ class LLMPipeLine:
         llm = (cfg.llm_name or "").strip()
         if llm not in ALLOWED_LLM_NAMES:
             raise ValueError(f"지원하지 않는 llm_name='{llm}'. 허용값: {ALLOWED_LLM_NAMES}")
-        self._caller = self._DISPATCH[llm](cfg)
+        if getattr(cfg, "batch_api", False) and llm == "gpt4o":
+            self._caller = OpenAIBatchCaller(cfg)
+        elif getattr(cfg, "concurrency", 1) > 1 and llm in self._ASYNC_DISPATCH:
+            self._caller = self._ASYNC_DISPATCH[llm](cfg)
+        else:
+            self._caller = self._DISPATCH[llm](cfg)
+        self.backend = llm
+
+        # 라벨 영구 캐시 (None: 사용 안 함, "auto": assets/.precomputed/LLMLabels/labels.sqlite)
+        self.cache = None
+        cache_path = getattr(cfg, "label_cache", None)
+        if cache_path is not None:
+            from mindcastlib.src.llm_cache_utils import LLMLabelCache, default_label_cache_path
+            self.cache = LLMLabelCache(default_label_cache_path() if cache_path == "auto" else cache_path)
+
+    def _cache_key(self, text: str) -> str:
+        from mindcastlib.src.llm_cache_utils import label_cache_key
+        return label_cache_key(self.backend, self._caller.model_id, self._caller.cache_prompt(text), text)
+
+    def _call_cached(self, data: List[str]) -> List[str]:
+        keys = [self._cache_key(t) for t in data]
+        found = self.cache.get_many(keys)
+
+        # 같은 배치 안의 중복 텍스트도 한 번만 호출
+        miss = list(dict.fromkeys(t for t, k in zip(data, keys) if k not in found))
+        fresh: Dict[str, str] = {}
+        if miss:
+            fresh = dict(zip(miss, self._call_caller(miss)))
+            # HF 폴백 모델처럼 호출 중 model_id 가 바뀔 수 있으므로 저장 key 는 호출 후에 계산
+            self.cache.put_many({self._cache_key(t): lb for t, lb in fresh.items()})
+        return [found[k] if k in found else fresh[t] for t, k in zip(data, keys)]
+
+    def _call_caller(self, data: List[str]) -> List[str]:
+        t0 = time.perf_counter()
+        outs = self._caller(data)
+        self._caller.metrics.record_call(outs, time.perf_counter() - t0)
+        return outs
+
+    @property
+    def whole_input(self) -> bool:
+        """Batch API / 동시 요청 caller 는 작은 배치로 나누면 손해 → 입력 전체를 한 번에 받음."""
+        return self._caller.whole_input
+
+    def close(self) -> None:
+        self._caller.close()
+
+    def cache_stats(self) -> Dict[str, float]:
+        return self.cache.stats() if self.cache is not None else {}
+
+    def metrics_summary(self) -> Dict:
+        """backend 별 비교용 요약: 요청/토큰/지연 백분위/재시도/에러율/추정 비용 + packing·캐시 통계."""
+        summary = self._caller.metrics.summary(self._caller.model_id, getattr(self.cfg, "price_per_1m", None))
+        summary["pack"] = dict(self._caller.pack_stats)
+        summary["cache"] = self.cache_stats()
+        return summary
 
     def forward(self, data: List[str]) -> List[str]:
         """
@@ -609,12 +1541,55 @@ class LLMPipeLine:
 
         if not isinstance(data, list) or (data and not isinstance(data[0], str)):
             raise ValueError("입력은 List[str]이어야 합니다.")
-        return self._caller(data)
+        if self.cache is not None and data:
+            return self._call_cached(data)
+        return self._call_caller(data)
 
     def __call__(self, data: List[str]) -> List[str]:
         return self.forward(data)
 
 
+# ---------------------------------------------------------------------
+# packing parity 측정
+# ---------------------------------------------------------------------
+def measure_pack_parity(
+    cfg: LLMConfig,
+    texts: List[str],
+    pack_sizes: Tuple[int, ...] = (1, 5, 10),
+    trues: Optional[List[str]] = None,
+) -> List[Dict]:
+    """
+    같은 texts 를 pack_size 별로 라벨링해 단건 모드(pack_size=1) 대비 일치율과 요청 수/프롬프트 길이 비교.
+    trues 가 있으면 정확도도 함께 계산. (실제 API 를 호출하므로 소량 샘플로 실행)
+    """
+    rows: List[Dict] = []
+    ref: Optional[List[str]] = None
+    for k in sorted(set((1,) + tuple(pack_sizes))):
+        # 라벨 캐시는 끄고 매번 실제로 호출
+        pipe = LLMPipeLine(cfg.model_copy(update={"pack_size": k, "label_cache": None}))
+        t0 = time.time()
+        preds = pipe(texts)
+        elapsed = time.time() - t0
+        stats = pipe._caller.pack_stats
+        if ref is None:
+            ref = preds
+
+        n = max(1, len(texts))
+        row = {
+            "pack_size": k,
+            "requests": stats["requests"],
+            "prompt_chars": stats["prompt_chars"],
+            "fallback_items": stats["fallback_items"],
+            "valid_rate": sum(1 for p in preds if p in pipe._caller.adapter.labels) / n,
+            "agreement_vs_single": sum(a == b for a, b in zip(preds, ref)) / n,
+            "seconds": round(elapsed, 2),
+        }
+        if trues is not None:
+            row["accuracy"] = sum(a == b for a, b in zip(preds, trues)) / n
+        rows.append(row)
+    return rows
+
+
 # ---------------------------------------------------------------------
 # 실행 예시
 # ---------------------------------------------------------------------
@@ -0,0 +1,327 @@
+# ============================================================
+# 📦 onnx_utils.py — ONNX Runtime (int8) CPU backend for text-classification / zero-shot (NLI)
+#  - sentiment / topic 모델을 ONNX 로 export + dynamic int8 quantization
+#  - export 결과는 assets/.precomputed/onnx/<model>/ 에 캐시 (meta.fp32.json / meta.int8.json 으로 무효화 판단)
+#  - HF text-classification pipeline 과 같은 라벨/score 형식으로 결과 반환
+#  - export 시 fp32 PyTorch 경로 대비 정확도 drift 를 측정해 meta 에 기록
+#    (기본 probe 12문장은 smoke check, 실제 판단은 probe_texts 로 실데이터 샘플을 넣어 측정)
+#
+# 필요 패키지(선택): onnx, onnxruntime  (없으면 ImportError → 호출 측에서 torch 로 폴백)
+# ============================================================
+from __future__ import annotations
+import os
+import json
+import logging
+from types import SimpleNamespace
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import torch
+
+from mindcastlib.src.analysis_utils import predict_text_classification_encoded
+from mindcastlib.src.zeroshot_utils import NLIZeroShotEngine
+
+
+ONNX_OPSET = 17
+
+# drift smoke check 용 기본 문장 (댓글/제목 느낌의 짧은 문장 위주)
+# 12문장으로는 일치율 0.95 같은 기준을 판단할 수 없으므로 min_agreement 경고는 DRIFT_MIN_SAMPLE 이상일 때만
+DRIFT_MIN_SAMPLE = 200
+DRIFT_PROBE_TEXTS: List[str] = [
+    "오늘 정말 행복한 하루였다",
+    "이게 말이 되냐 진짜 화난다",
+    "앞으로 어떻게 될지 너무 불안하네요",
+    "그 말에 상처받았어요",
+    "갑자기 이런 일이 생겨서 당황스럽다",
+    "너무 슬퍼서 눈물이 난다",
+    "코스피 사흘 만에 반등… 외국인 순매수",
+    "국회 본회의서 예산안 처리 무산",
+    "신형 스마트폰 공개, 인공지능 기능 강화",
+    "손흥민 시즌 10호골 폭발",
+    "미국 연준 기준금리 동결 결정",
+    "주말 나들이객 몰린 고속도로 정체",
+]
+
+
+def _default_cache_dir() -> str:
+    import mindcastlib
+    pkg_root = os.path.dirname(mindcastlib.__file__)
+    return os.path.join(pkg_root, "assets", ".precomputed", "onnx")
+
+
+def _require_onnxruntime():
+    try:
+        import onnxruntime  # noqa: F401
+    except Exception as e:
+        raise ImportError("onnx backend 사용에는 onnxruntime 이 필요합니다: pip install onnx onnxruntime") from e
+
+
+# ------------------------------------------------------------
+# 🔧 ONNX 모델 래퍼 — HF 모델처럼 model(**enc).logits / .config / .device 제공
+# ------------------------------------------------------------
+class OnnxSequenceClassifier:
+    def __init__(self, onnx_path: str, config, intra_op_threads: int | None = None):
+        _require_onnxruntime()
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        # 워커 풀에서 고정한 torch 스레드 수를 그대로 따름
+        opts.intra_op_num_threads = intra_op_threads or torch.get_num_threads()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(onnx_path, sess_options=opts, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.config = config
+        self.device = torch.device("cpu")
+
+    def __call__(self, **enc):
+        feeds = {}
+        for name in self.input_names:
+            if name in enc:
+                v = enc[name]
+                feeds[name] = (v.cpu().numpy() if torch.is_tensor(v) else np.asarray(v)).astype(np.int64)
+            elif name == "token_type_ids":
+                feeds[name] = np.zeros_like(feeds["input_ids"])
+        logits = self.session.run(["logits"], feeds)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+# ------------------------------------------------------------
+# ⚙️ Export (+ int8 quantization) with disk cache
+# ------------------------------------------------------------
+def _cache_meta(model_name: str, quantize: bool) -> Dict[str, Any]:
+    import transformers
+    return {
+        "model_name": model_name,
+        "quantize": quantize,
+        "opset": ONNX_OPSET,
+        "transformers": transformers.__version__,
+    }
+
+
+def export_onnx_classifier(
+    model_name: str,
+    cache_dir: str | None = None,
+    quantize: bool = True,
+    probe_texts: Sequence[str] | None = None,
+    max_length: int = 256,
+) -> Dict[str, Any]:
+    """
+    model_name 의 SequenceClassification 모델을 ONNX 로 export (필요 시 int8 quantize).
+    캐시가 유효하면 그대로 재사용. 반환: meta dict (onnx_path, drift 포함).
+    """
+    _require_onnxruntime()
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    cache_dir = cache_dir or _default_cache_dir()
+    out_dir = os.path.join(cache_dir, model_name.replace("/", "__"))
+    # fp32 / int8 은 meta 를 따로 둠 (quantize 를 번갈아 써도 서로의 캐시를 무효화하지 않음)
+    meta_path = os.path.join(out_dir, f"meta.{'int8' if quantize else 'fp32'}.json")
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    int8_path = os.path.join(out_dir, "model.int8.onnx")
+    onnx_path = int8_path if quantize else fp32_path
+
+    expected = _cache_meta(model_name, quantize)
+    if os.path.exists(meta_path) and os.path.exists(onnx_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if all(meta.get(k) == v for k, v in expected.items()):
+            logging.info(f"[ONNX] cache hit → {onnx_path}")
+            return meta
+        logging.info(f"[ONNX] cache meta mismatch → re-export {model_name}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    print(f"[ONNX] Exporting {model_name} → {out_dir}")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+
+    dummy = tokenizer(["안녕하세요", "onnx export 용 더미 문장입니다"], padding=True, return_tensors="pt")
+    input_names = [k for k in ("input_ids", "attention_mask", "token_type_ids") if k in dummy]
+    dynamic_axes = {k: {0: "batch", 1: "seq"} for k in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    class _LogitsOnly(torch.nn.Module):
+        # 입력 이름 순서를 고정하고 logits 만 출력
+        def __init__(self, m):
+            super().__init__()
+            self.m = m
+
+        def forward(self, *args):
+            return self.m(**dict(zip(input_names, args))).logits
+
+    with torch.no_grad():
+        torch.onnx.export(
+            _LogitsOnly(model),
+            tuple(dummy[k] for k in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+            dynamo=False,
+        )
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+    # fp32 PyTorch 대비 drift 측정 후 meta 에 기록
+    onnx_model = OnnxSequenceClassifier(onnx_path, model.config)
+    drift = measure_drift(
+        model, onnx_model, tokenizer,
+        texts=probe_texts or DRIFT_PROBE_TEXTS, max_length=max_length,
+    )
+    drift["kind"] = "sample" if drift["n"] >= DRIFT_MIN_SAMPLE else "smoke"
+    meta = {**expected, "onnx_path": onnx_path, "drift": drift}
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    print(f"[ONNX] drift vs fp32: {drift}")
+    return meta
+
+
+# ------------------------------------------------------------
+# 📏 Accuracy drift check (fp32 PyTorch vs ONNX)
+# ------------------------------------------------------------
+@torch.no_grad()
+def measure_drift(
+    torch_model,
+    onnx_model: OnnxSequenceClassifier,
+    tokenizer,
+    texts: Sequence[str],
+    max_length: int = 256,
+    batch_size: int = 32,
+) -> Dict[str, float]:
+    """
+    같은 입력에 대한 softmax 확률 차이와 top-1 일치율.
+    60-way 감정 모델이면 6대분류(합산) 기준 일치율도 함께 계산.
+    """
+    texts = list(texts)
+    p_ref, p_new = [], []
+    for i in range(0, len(texts), batch_size):
+        enc = tokenizer(texts[i:i + batch_size], truncation=True, max_length=max_length,
+                        padding=True, return_tensors="pt")
+        ref = torch_model(**{k: v.to(torch_model.device) for k, v in enc.items()}).logits.float().cpu()
+        new = onnx_model(**enc).logits.float()
+        p_ref.append(torch.softmax(ref, dim=-1))
+        p_new.append(torch.softmax(new, dim=-1))
+    p_ref, p_new = torch.cat(p_ref), torch.cat(p_new)
+
+    diff = (p_ref - p_new).abs()
+    out = {
+        "n": len(texts),
+        "top1_agreement": float((p_ref.argmax(-1) == p_new.argmax(-1)).float().mean()),
+        "max_abs_prob_diff": float(diff.max()),
+        "mean_abs_prob_diff": float(diff.mean()),
+    }
+    if p_ref.size(-1) == 60:
+        m_ref = p_ref.reshape(-1, 6, 10).sum(-1)
+        m_new = p_new.reshape(-1, 6, 10).sum(-1)
+        out["top1_agreement_6way"] = float((m_ref.argmax(-1) == m_new.argmax(-1)).float().mean())
+    return out
+
+
+def check_drift(model_name: str, drift: Dict[str, Any], min_agreement: float | None, key: str) -> None:
+    """drift[key] 가 min_agreement 미만이면 경고. smoke check(표본 < DRIFT_MIN_SAMPLE)는 수치만 기록."""
+    agreement = drift.get(key)
+    if min_agreement is None or agreement is None:
+        return
+    if drift.get("n", 0) < DRIFT_MIN_SAMPLE:
+        logging.info(
+            f"[ONNX] {model_name}: smoke check only (n={drift.get('n')}, {key}={agreement:.3f}) "
+            f"— 실데이터 샘플로 측정하려면 export_onnx_classifier(..., probe_texts=...)"
+        )
+        return
+    if agreement < min_agreement:
+        logging.warning(
+            f"[ONNX] {model_name}: {key} {agreement:.3f} < {min_agreement} "
+            f"(n={drift['n']}, fp32 대비 drift 큼, backend='torch' 고려)"
+        )
+
+
+# ------------------------------------------------------------
+# 🧩 pipeline 호환 래퍼 (ModuleCallable 에서 HF pipeline 대신 사용)
+# ------------------------------------------------------------
+class OnnxTextClassificationPipeline:
+    """
+    HF text-classification pipeline 대체. .task / .tokenizer / .model 을 같은 이름으로 제공하므로
+    predict_6sentiments / predict_text_classification_encoded / should_collapse6 를 그대로 사용.
+    """
+
+    task = "text-classification"
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: str | None = None,
+        quantize: bool = True,
+        max_length: int = 256,
+        min_agreement: float | None = 0.95,
+    ):
+        from transformers import AutoConfig, AutoTokenizer
+
+        meta = export_onnx_classifier(model_name, cache_dir=cache_dir, quantize=quantize, max_length=max_length)
+        # 60-way 감정 모델은 실제 사용하는 6대분류 기준 일치율로 판단
+        drift = meta.get("drift", {})
+        check_drift(model_name, drift, min_agreement,
+                    "top1_agreement_6way" if "top1_agreement_6way" in drift else "top1_agreement")
+
+        self.meta = meta
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = OnnxSequenceClassifier(meta["onnx_path"], AutoConfig.from_pretrained(model_name))
+
+    def __call__(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        enc = self.tokenizer(batch, truncation=True, max_length=self.max_length, padding=True, return_tensors="pt")
+        out = predict_text_classification_encoded(enc, self.model)
+        return out[0] if single else out
+
+
+class OnnxZeroShotPipeline:
+    """
+    HF zero-shot-classification pipeline 대체 (NLI 모델을 ONNX int8 로 export).
+    HFZeroShotCaller 가 쓰는 인자(sequences / candidate_labels / hypothesis_template / multi_label)와
+    결과 형식을 그대로 따르며, 추론은 NLIZeroShotEngine (길이 정렬 + token budget 배치)으로 수행.
+    """
+
+    task = "zero-shot-classification"
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: str | None = None,
+        quantize: bool = True,
+        max_length: int = 256,
+        min_agreement: float | None = 0.95,
+    ):
+        from transformers import AutoConfig, AutoTokenizer
+
+        meta = export_onnx_classifier(model_name, cache_dir=cache_dir, quantize=quantize, max_length=max_length)
+        check_drift(model_name, meta.get("drift", {}), min_agreement, "top1_agreement")
+
+        self.meta = meta
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = OnnxSequenceClassifier(meta["onnx_path"], AutoConfig.from_pretrained(model_name))
+        self.engine = NLIZeroShotEngine(self.tokenizer, self.model, max_length=max_length)
+
+    def __call__(self, sequences, candidate_labels, hypothesis_template: str = "This example is {}.",
+                 multi_label: bool = False, **kwargs):
+        return self.engine(sequences, candidate_labels, hypothesis_template, multi_label=multi_label)
+
+
+# ------------------------------------------------------------
+# 🧪 drift 리포트 (python -m mindcastlib.src.onnx_utils <model_name> [texts.json] [--fp32])
+#   texts.json: 실데이터 문장 리스트 (DRIFT_MIN_SAMPLE 이상 권장). 캐시를 지우고 다시 측정할 것
+# ------------------------------------------------------------
+if __name__ == "__main__":
+    import sys
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    name = args[0] if args else "hun3359/klue-bert-base-sentiment"
+    texts = None
+    if len(args) > 1:
+        with open(args[1], "r", encoding="utf-8") as f:
+            texts = json.load(f)
+    meta = export_onnx_classifier(name, quantize="--fp32" not in sys.argv, probe_texts=texts)
+    print(json.dumps(meta, ensure_ascii=False, indent=2))
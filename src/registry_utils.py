@@ -0,0 +1,151 @@
+# ============================================================
+# 📦 registry_utils.py — 프로세스 단위 모델 레지스트리
+#  - (kind, model_name, device, dtype) 키로 한 번만 로드하고 공유 인스턴스를 반환
+#  - sequential_analysis 처럼 파일마다 AnalysisPipeLine 을 만들어도
+#    HF pipeline / sarcasm RoBERTa-large / KoSimCSE 로딩 비용은 프로세스당 1회
+# ============================================================
+from __future__ import annotations
+import threading
+import logging
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import torch
+
+
+_DTYPE_ALIASES: Dict[str, torch.dtype] = {
+    "fp32": torch.float32, "float32": torch.float32,
+    "fp16": torch.float16, "float16": torch.float16,
+    "bf16": torch.bfloat16, "bfloat16": torch.bfloat16,
+}
+
+
+def resolve_dtype(dtype: Optional[str]) -> Optional[torch.dtype]:
+    """config 의 dtype 문자열("bf16", "fp16", ...)을 torch.dtype 으로 변환. None → 모델 기본값."""
+    if dtype is None:
+        return None
+    if dtype not in _DTYPE_ALIASES:
+        raise ValueError(f"지원하지 않는 dtype='{dtype}'. 허용값: {sorted(_DTYPE_ALIASES)}")
+    return _DTYPE_ALIASES[dtype]
+
+
+class ModelRegistry:
+    """
+    로드된 모델을 키 단위로 보관하는 프로세스 전역 캐시.
+
+    - get(key, loader): 키가 없으면 loader() 로 한 번 로드 후 저장, 이후에는 같은 인스턴스 반환
+    - 같은 키를 동시에 요청해도 한 번만 로드되도록 키별 lock 사용
+    - 반환된 인스턴스는 공유되므로 호출 측에서 파라미터를 수정하면 안 된다 (eval 전용)
+    """
+
+    _instances: Dict[Hashable, Any] = {}
+    _locks: Dict[Hashable, threading.Lock] = {}
+    _guard = threading.Lock()
+
+    @classmethod
+    def get(cls, key: Hashable, loader: Callable[[], Any]) -> Any:
+        if key in cls._instances:
+            return cls._instances[key]
+
+        with cls._guard:
+            lock = cls._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            if key not in cls._instances:
+                logging.info(f"[Registry] loading {key}")
+                cls._instances[key] = loader()
+            else:
+                logging.info(f"[Registry] reuse {key}")
+        return cls._instances[key]
+
+    @classmethod
+    def contains(cls, key: Hashable) -> bool:
+        return key in cls._instances
+
+    @classmethod
+    def keys(cls):
+        return list(cls._instances.keys())
+
+    @classmethod
+    def release(cls, key: Hashable) -> None:
+        cls._instances.pop(key, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._instances.clear()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+
+# ------------------------------------------------------------
+# 🔧 자주 쓰는 로더 헬퍼
+# ------------------------------------------------------------
+def get_hf_pipeline(task: str, model_name: str, device: str, dtype: Optional[str] = None):
+    """transformers.pipeline 공유 인스턴스. 같은 모델을 쓰는 sentiment/classifier runner 도 공유."""
+    def _load():
+        from transformers import pipeline
+        device_index = int(device.split(":")[-1]) if "cuda" in device else -1
+        kwargs = {}
+        if dtype is not None:
+            kwargs["torch_dtype"] = resolve_dtype(dtype)
+        return pipeline(task, model=model_name, device=device_index, **kwargs)
+
+    return ModelRegistry.get(("hf_pipeline", task, model_name, device, dtype), _load)
+
+
+def get_hf_encoder(model_name: str, device: str = "cpu", dtype: Optional[str] = None) -> Tuple[Any, Any]:
+    """(tokenizer, AutoModel) 공유 인스턴스 (eval 모드)."""
+    def _load():
+        from transformers import AutoTokenizer, AutoModel
+        kwargs = {}
+        if dtype is not None:
+            kwargs["torch_dtype"] = resolve_dtype(dtype)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        encoder = AutoModel.from_pretrained(model_name, **kwargs).to(device)
+        encoder.eval()
+        return tokenizer, encoder
+
+    return ModelRegistry.get(("hf_encoder", model_name, device, dtype), _load)
+
+
+def get_onnx_pipeline(
+    model_name: str,
+    quantize: bool = True,
+    cache_dir: Optional[str] = None,
+    max_length: int = 256,
+    min_agreement: Optional[float] = 0.95,
+):
+    """ONNX Runtime text-classification 공유 인스턴스 (CPU 전용, export 결과는 디스크 캐시)."""
+    def _load():
+        from mindcastlib.src.onnx_utils import OnnxTextClassificationPipeline
+        return OnnxTextClassificationPipeline(
+            model_name,
+            cache_dir=cache_dir,
+            quantize=quantize,
+            max_length=max_length,
+            min_agreement=min_agreement,
+        )
+
+    dtype = "int8" if quantize else "fp32"
+    return ModelRegistry.get(("onnx_pipeline", model_name, "cpu", dtype, max_length), _load)
+
+
+def get_onnx_zeroshot_pipeline(
+    model_name: str,
+    quantize: bool = True,
+    cache_dir: Optional[str] = None,
+    max_length: int = 256,
+    min_agreement: Optional[float] = 0.95,
+):
+    """ONNX Runtime zero-shot(NLI) 공유 인스턴스 (export 캐시는 text-classification 과 공유)."""
+    def _load():
+        from mindcastlib.src.onnx_utils import OnnxZeroShotPipeline
+        return OnnxZeroShotPipeline(
+            model_name,
+            cache_dir=cache_dir,
+            quantize=quantize,
+            max_length=max_length,
+            min_agreement=min_agreement,
+        )
+
+    dtype = "int8" if quantize else "fp32"
+    return ModelRegistry.get(("onnx_zeroshot", model_name, "cpu", dtype, max_length), _load)
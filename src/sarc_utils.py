@@ -1,11 +1,11 @@
 # ============================================================
 # 📦 sarcasm_utils.py — DeltaWoPerLayerModel inference helper
 # ============================================================
-import os, math, torch
+import os, math, torch, logging
 import torch.nn as nn
 import torch.nn.functional as F
 from transformers import AutoModel, AutoTokenizer, AutoConfig
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # ✅ 외부 model_config.py에서 sarcasm 모델 설정 불러오기
 from mindcastlib.configs import DefaultModuleConfig
@@ -63,6 +63,43 @@ class DeltaWoDense(nn.Module):
         return out_base + torch.matmul(x, delta)
 
 
+class FusedDeltaWoDense(nn.Module):
+    """
+    추론 전용 DeltaWoDense (학습된 DeltaWoDense 에서 변환, 출력 동일)
+      - delta 는 CLS(또는 mean) 벡터만 쓰므로 q/k LoRA 를 전체 토큰이 아닌 pooled 벡터에만 적용
+      - q/k 의 A 를 하나로 stack → GEMM 1회, LoRA scale 은 B 에 fold, dropout 제거
+      - base dense 와 delta 를 (W^T + delta) 로 합쳐 baddbmm 1회로 계산
+    """
+    def __init__(self, m: DeltaWoDense):
+        super().__init__()
+        q, k = m.q_lora, m.k_lora
+        self.r = q.r
+        self.use_cls = m.use_cls
+        self.delta_scale = m.delta_scale
+        self.inv_sqrt = 1.0 / math.sqrt(q.B.weight.size(0))
+
+        with torch.no_grad():
+            self.A = nn.Linear(m.hidden_size, 2 * self.r, bias=False)
+            self.A.weight.copy_(torch.cat([q.A.weight, k.A.weight], dim=0))
+            self.register_buffer("Bq", (q.B.weight * q.scale).clone())
+            self.register_buffer("Bk", (k.B.weight * k.scale).clone())
+            # Linear: y = x W^T + b  →  W^T 를 미리 만들어 둠 (in, out)
+            self.register_buffer("weight_t", m.base_o.weight.t().contiguous().clone())
+            bias = m.base_o.bias
+            self.register_buffer("bias", None if bias is None else bias.clone())
+
+    def forward(self, x):
+        pooled = x[:, 0, :] if self.use_cls else x.mean(dim=1)
+        a = self.A(pooled)
+        qv = a[:, :self.r] @ self.Bq.t()
+        kv = a[:, self.r:] @ self.Bk.t()
+        delta = torch.softmax(qv.unsqueeze(2) * kv.unsqueeze(1) * self.inv_sqrt, dim=-1)
+        w = self.weight_t + delta * self.delta_scale
+        if self.bias is None:
+            return torch.bmm(x, w)
+        return torch.baddbmm(self.bias, x, w)
+
+
 # ============================================================
 # 🧩 Main Model
 # ============================================================
@@ -109,13 +146,32 @@ class DeltaWoPerLayerModel(nn.Module):
 # ============================================================
 # 🧩 Loader + Inference
 # ============================================================
-def load_sarcasm_model(device: str = None):
-    """model_config.py의 DefaultModuleConfig 기반 sarcasm 모델 로드"""
+def load_sarcasm_model(
+    device: str = None,
+    dtype: str = None,
+    fuse: bool = True,
+    quantize_int8: bool = False,
+    compile_mode: Optional[str] = None,
+    model_name: Optional[str] = None,
+    ckpt_path: Optional[str] = None,
+):
+    """
+    model_config.py의 DefaultModuleConfig 기반 sarcasm 모델 로드
+      - model_name / ckpt_path : 주면 기본 config 값 대신 사용 (ModelRegistry key 와 일치)
+      - fuse          : DeltaWoDense → FusedDeltaWoDense, dropout 제거 (추론 전용)
+      - quantize_int8 : CPU dynamic int8 (nn.Linear), fp32 에만 적용
+      - compile_mode  : None | "script"(TorchScript trace) | "compile"(torch.compile)
+    """
+    from mindcastlib.src.registry_utils import resolve_dtype
+
     cfg = DefaultModuleConfig().sarcasm_model
     device = device or cfg.device
 
-    model = DeltaWoPerLayerModel(cfg.model_dump()).to(device)
-    ckpt_path = cfg.ckpt_path
+    model_cfg = cfg.model_dump()
+    if model_name:
+        model_cfg["model_name"] = model_name
+    model = DeltaWoPerLayerModel(model_cfg).to(device)
+    ckpt_path = ckpt_path or cfg.ckpt_path
     if ckpt_path and os.path.exists(ckpt_path):
         print(f"[INFO] Loading checkpoint from: {ckpt_path}")
         state = torch.load(ckpt_path, map_location=device)
@@ -124,22 +180,136 @@ def load_sarcasm_model(device: str = None):
         print(f"[WARN] Checkpoint not found at {ckpt_path}")
     model.eval()
     tokenizer = model.tokenizer
+
+    if fuse:
+        model = fuse_for_inference(model)
+    if dtype is not None:
+        model = model.to(resolve_dtype(dtype))
+    if quantize_int8:
+        model = quantize_int8_cpu(model, device=device, dtype=dtype)
+    if compile_mode is not None:
+        model = compile_sarcasm_model(model, tokenizer, mode=compile_mode, device=device)
     return model, tokenizer
 
 
+# ============================================================
+# ⚡ Inference mode (fuse / int8 / TorchScript / torch.compile)
+# ============================================================
+def fuse_for_inference(model: DeltaWoPerLayerModel) -> DeltaWoPerLayerModel:
+    """학습 그래프 → 추론 그래프. 가중치 로드 후, dtype 변환 전에 호출."""
+    for layer in model.base.encoder.layer:
+        dense = layer.attention.output.dense
+        if isinstance(dense, DeltaWoDense):
+            layer.attention.output.dense = FusedDeltaWoDense(dense)
+
+    # HF base 의 dropout 은 eval() 로 비활성 (attention 구현이 .p 를 참조하므로 모듈은 유지)
+    for i, m in enumerate(model.classifier):
+        if isinstance(m, nn.Dropout):
+            model.classifier[i] = nn.Identity()
+
+    for p in model.parameters():
+        p.requires_grad = False
+    return model.eval()
+
+
+def quantize_int8_cpu(model: nn.Module, device: str = "cpu", dtype: Optional[str] = None) -> nn.Module:
+    """nn.Linear dynamic int8 quantization (CPU 전용). fused delta 경로(weight_t)는 fp32 유지."""
+    if "cuda" in str(device):
+        logging.warning("[Sarcasm] int8 dynamic quantization 은 CPU 전용 → 건너뜀")
+        return model
+    if dtype not in (None, "fp32", "float32"):
+        logging.warning(f"[Sarcasm] int8 quantization 은 fp32 모델에만 적용 (dtype={dtype}) → 건너뜀")
+        return model
+    from torch.ao.quantization import quantize_dynamic
+    print("[INFO] Applying dynamic int8 quantization (nn.Linear)")
+    return quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+class _ScriptedSarcasmModel(nn.Module):
+    """trace 된 모듈에 tokenizer 속성을 붙여 원래 모델과 같은 방식으로 사용"""
+    def __init__(self, traced, tokenizer):
+        super().__init__()
+        self.traced = traced
+        self.tokenizer = tokenizer
+
+    def forward(self, input_ids, attention_mask):
+        return self.traced(input_ids, attention_mask)
+
+
+# trace 검증용: 배치 크기·패딩 길이가 서로 다른 입력들
+_TRACE_CHECK_TEXTS = [
+    ["한 문장"],
+    ["가", "조금 더 길어서 패딩이 생기는 두 번째 문장", "세 번째"],
+    ["trace 때 본 길이보다 훨씬 긴 입력으로 위치 임베딩과 마스크 경로가 제대로 일반화되는지 확인하는 문장입니다 " * 3],
+]
+
+
+def _trace_args(tokenizer, texts, device):
+    enc = tokenizer(texts, padding=True, truncation=True, max_length=128, return_tensors="pt")
+    return (enc["input_ids"].to(device), enc["attention_mask"].to(device))
+
+
+def compile_sarcasm_model(
+    model: nn.Module,
+    tokenizer,
+    mode: str = "script",
+    device: str = "cpu",
+    export_path: Optional[str] = None,
+) -> nn.Module:
+    """
+    mode="script"  : torch.jit.trace — 길이가 다른 check_inputs 로 eager 와 출력 비교 후 사용
+                     (export_path 가 있으면 torch.jit.save 로 저장)
+    mode="compile" : torch.compile(dynamic=True)
+    실패하면 경고 후 eager 모델 그대로 반환.
+    """
+    if mode not in ("script", "compile"):
+        raise ValueError("compile_mode must be None, 'script' or 'compile'")
+    try:
+        if mode == "compile":
+            return torch.compile(model, dynamic=True)
+
+        # padding 이 있는 예제로 trace → attention mask 경로가 그래프에 남도록
+        args = _trace_args(tokenizer, ["짧은 문장", "trace 용으로 조금 더 긴 예제 문장입니다"], device)
+        # 길이/배치가 다른 입력으로 trace 결과를 eager 와 비교 (shape 의존 분기가 굳었으면 실패)
+        checks = [_trace_args(tokenizer, texts, device) for texts in _TRACE_CHECK_TEXTS]
+        with torch.no_grad():
+            traced = torch.jit.trace(model, args, check_trace=True, check_inputs=checks)
+            for chk in checks:
+                ref, got = model(*chk).float(), traced(*chk).float()
+                if not torch.allclose(ref, got, atol=1e-4, rtol=1e-3):
+                    diff = (ref - got).abs().max().item()
+                    raise RuntimeError(f"traced 출력이 eager 와 다름 (len={chk[0].shape[1]}, max|Δ|={diff:.2e})")
+        if export_path:
+            os.makedirs(os.path.dirname(export_path) or ".", exist_ok=True)
+            torch.jit.save(traced, export_path)
+            print(f"[INFO] TorchScript saved → {export_path}")
+        return _ScriptedSarcasmModel(traced, tokenizer)
+    except Exception as e:
+        logging.warning(f"[Sarcasm] compile_mode='{mode}' 실패 ({e}) → eager 사용")
+        return model
+
+
 @torch.no_grad()
 def predict_sarcasm(texts, model, tokenizer, device="cuda", max_length=128):
     single = isinstance(texts, str)
     batch_texts = [texts] if single else texts
-    enc = tokenizer(batch_texts, truncation=True, padding=True, max_length=max_length, return_tensors="pt").to(device)
+    enc = tokenizer(batch_texts, truncation=True, padding=True, max_length=max_length, return_tensors="pt")
+    out = predict_sarcasm_encoded(enc, model, device=device)
+    return out[0] if single else out
+
+
+@torch.no_grad()
+def predict_sarcasm_encoded(enc, model, device="cuda"):
+    """이미 토큰화된 배치(enc)로 sarcasm 추론 (공유 토큰화 경로)."""
+    enc = {k: v.to(device) for k, v in enc.items()}  # 공유 인코딩은 제자리 이동하지 않음
     logits = model(enc["input_ids"], enc["attention_mask"])
-    probs = torch.softmax(logits, dim=-1)
+    probs = torch.softmax(logits.float(), dim=-1)
     preds = probs.argmax(dim=-1)
     out = []
     for p, s in zip(preds.cpu().tolist(), probs[:, 1].cpu().tolist()):
         label = "sarcastic" if p == 1 else "non-sarcastic"
         out.append({"label": label, "score": float(s)})
-    return out[0] if single else out
+    return out
 
 
 # ============================================================
@@ -1,5 +1,6 @@
 import os
-from typing import Dict, Any, List, Tuple
+import hashlib
+from typing import Callable, Dict, Any, List, Tuple, Union
 
 import torch
 import torch.nn as nn
@@ -27,34 +28,224 @@ def load_suicide_monthly_config(
 
 # ------------------------------------------------------------
 # ⚙️ BOW Precompute (한국어 subtag → 문장화 임베딩)
+#  - 모든 (keyword, subtag) 템플릿 문장을 padding 배치로 인코딩
+#  - (model, template, keyword, subtag) 단위 임베딩 캐시 → 월별 config 간 공통 subtag 재사용
+#  - 캐시 키에 model/template/pooling/version 이 포함되므로 하나라도 바뀌면 자동으로 다시 인코딩
 # ------------------------------------------------------------
+BOW_POOLING = "masked_mean"
+BOW_PACK_VERSION = 1    # 임베딩 계산 방식/pack 포맷이 바뀌면 올림 → subtag 캐시와 pack 모두 무효화
+
+
+def masked_mean_pool(token_emb: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+    """padding 토큰을 제외한 mean pooling. (B, L, H), (B, L) → (B, H)"""
+    mask = attention_mask.unsqueeze(-1).to(token_emb.dtype)
+    return (token_emb * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1.0)
+
+
+def _bow_cache_key(model_name: str, template: str, keyword: str, subtag: str,
+                   pooling: str = None, version: int = None) -> str:
+    pooling = pooling or BOW_POOLING
+    version = BOW_PACK_VERSION if version is None else version
+    payload = "\x00".join([model_name, template, keyword, subtag, pooling, str(version)])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _bow_cache_path(save_path: str, model_name: str) -> str:
+    return os.path.join(os.path.dirname(save_path), "_cache", f"{model_name.replace('/', '__')}.pt")
+
+
+def bow_meta_path(bow_path: str) -> str:
+    root, _ = os.path.splitext(bow_path)
+    return f"{root}.meta.json"
+
+
+def bow_meta(suicide_keywords: Dict[str, List[str]], model_name: str, template: str) -> Dict[str, Any]:
+    """BOW_<date>.pt 가 어떤 설정으로 만들어졌는지 (BOW_<date>.meta.json 에 기록, 다르면 재계산)"""
+    from mindcastlib.src.checkpoint_utils import config_sha1
+    return {
+        "model_name": model_name,
+        "template": template,
+        "keywords_sha1": config_sha1(suicide_keywords),
+        "pooling": BOW_POOLING,
+        "version": BOW_PACK_VERSION,
+    }
+
+
 def precompute_bow_embeddings(
     suicide_keywords: Dict[str, List[str]],
     save_path: str,
     tokenizer: AutoTokenizer,
     encoder: AutoModel,
     template: str,
+    model_name: str = None,
+    batch_size: int = 64,
+    cache_path: str = None,
 ):
+    from mindcastlib.src.checkpoint_utils import atomic_write_json
+
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
     encoder.eval()
+    model_name = model_name or encoder.config._name_or_path
+    cache_path = cache_path or _bow_cache_path(save_path, model_name)
 
-    bow_emb = {}
+    cache: Dict[str, torch.Tensor] = {}
+    if os.path.exists(cache_path):
+        cache = torch.load(cache_path)
+
+    # 캐시에 없는 템플릿 문장만 모아서 배치 인코딩
+    pairs = [(kw, st) for kw, subtags in suicide_keywords.items() for st in subtags]
+    keys = {pair: _bow_cache_key(model_name, template, *pair) for pair in pairs}
+    todo = [pair for pair in dict.fromkeys(pairs) if keys[pair] not in cache]
+    print(f"[Precompute] BOW {len(pairs)} subtags (cache hit {len(pairs) - len(todo)}, encode {len(todo)})")
 
+    device = next(encoder.parameters()).device
     with torch.no_grad():
-        for kw, subtags in suicide_keywords.items():
-            bow_emb[kw] = {}
-            for st in subtags:
-                text = template.format(subtag=st, keyword=kw)
-                inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-                outputs = encoder(**inputs)
-                token_emb = outputs.last_hidden_state
-                sent_emb = token_emb.mean(dim=1).squeeze(0)
-                bow_emb[kw][st] = sent_emb.cpu()
+        for i in range(0, len(todo), batch_size):
+            chunk = todo[i:i + batch_size]
+            texts = [template.format(subtag=st, keyword=kw) for kw, st in chunk]
+            inputs = tokenizer(texts, return_tensors="pt", truncation=True, padding=True)
+            inputs = {k: v.to(device) for k, v in inputs.items()}
+            token_emb = encoder(**inputs).last_hidden_state
+            sent_emb = masked_mean_pool(token_emb, inputs["attention_mask"]).float().cpu()
+            for pair, emb in zip(chunk, sent_emb):
+                cache[keys[pair]] = emb.clone()
+
+    if todo:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        torch.save(cache, f"{cache_path}.tmp")
+        os.replace(f"{cache_path}.tmp", cache_path)
+
+    bow_emb = {}
+    for kw, subtags in suicide_keywords.items():
+        bow_emb[kw] = {st: cache[keys[(kw, st)]] for st in subtags}
 
     torch.save(bow_emb, save_path)
+    atomic_write_json(bow_meta_path(save_path), bow_meta(suicide_keywords, model_name, template))
     print(f"[Precompute] Saved BOW embeddings → {save_path}")
 
 
+# ------------------------------------------------------------
+# 📦 BOW tensor pack (정규화/stack 된 추론용 텐서를 BOW_<date>.pack.pt 로 캐시)
+# ------------------------------------------------------------
+def bow_pack_path(bow_path: str) -> str:
+    root, _ = os.path.splitext(bow_path)
+    return f"{root}.pack.pt"
+
+
+def build_bow_pack(bow_emb: Dict[str, Dict[str, torch.Tensor]], source_sha1: str = None) -> Dict[str, Any]:
+    """
+    {keyword: {subtag: emb}} → 추론용 pack
+      - bow_norm         : (M, H) subtag 임베딩, L2 정규화
+      - centroid_norm    : (K, H) keyword centroid, L2 정규화 (subtag 별 중복 없이 K 개만)
+      - keyword_of_subtag: (M,) subtag → keyword index
+    """
+    keywords, subtags, kw_index, embs, centroids = [], [], [], [], []
+    for kw, st_embs in bow_emb.items():
+        if not st_embs:
+            continue
+        stacked = torch.stack([e.float() for e in st_embs.values()], dim=0)
+        k = len(keywords)
+        keywords.append(kw)
+        centroids.append(stacked.mean(dim=0))
+        for st in st_embs.keys():
+            subtags.append(st)
+            kw_index.append(k)
+        embs.append(stacked)
+
+    return {
+        "version": BOW_PACK_VERSION,
+        "source_sha1": source_sha1,
+        "keywords": keywords,
+        "subtags": subtags,
+        "keyword_of_subtag": torch.tensor(kw_index, dtype=torch.long),
+        "bow_norm": F.normalize(torch.cat(embs, dim=0), dim=-1).contiguous(),
+        "centroid_norm": F.normalize(torch.stack(centroids, dim=0), dim=-1).contiguous(),
+    }
+
+
+# ------------------------------------------------------------
+# 🔎 token × subtag 최대 유사도 (index mode)
+#   dense   : (B, L, M) einsum 한 번 (기본, 정확)
+#   blocked : subtag 를 block 단위로 나눠 계산 (정확, 메모리 O(B·L·block))
+#   topk    : 토큰별 top-k subtag 후보만 사용 (blocked matmul 로 구한 정확한 top-k)
+#   faiss   : 토큰별 top-k 를 FAISS HNSW (ANN) 로 검색 (pip install faiss-cpu, 없으면 topk)
+#   topk/faiss 의 top-k 는 후보 keyword 선정에만 사용:
+#     - 후보 keyword (배치 내 어떤 토큰의 top-k 에라도 subtag 가 걸린 keyword) 의 subtag 열은 정확히 재계산
+#     - 나머지 subtag 는 SUBTAG_FLOOR 로 채움 → threshold 를 넘지 못하고 keyword 평균도 끌어올리지 않음
+#       (k 번째 점수 같은 상한으로 채우면 keyword 평균이 부풀어 dense 와 판정이 달라짐)
+# ------------------------------------------------------------
+INDEX_MODES = ("dense", "blocked", "topk", "faiss")
+SUBTAG_FLOOR = -1.0     # cosine 최솟값 (-inf 는 sweep 에서 가중치 0 과 곱하면 nan)
+
+
+def token_subtag_max_dense(token_norm: torch.Tensor, bow_norm: torch.Tensor, attn_mask: torch.Tensor) -> torch.Tensor:
+    sim = torch.einsum("blh,mh->blm", token_norm, bow_norm)
+    sim = sim.masked_fill(~attn_mask.unsqueeze(-1).bool(), -1e4)
+    return sim.max(dim=1).values                                   # (B, M)
+
+
+def token_subtag_max_blocked(
+    token_norm: torch.Tensor, bow_norm: torch.Tensor, attn_mask: torch.Tensor, block_size: int = 1024,
+) -> torch.Tensor:
+    mask = ~attn_mask.unsqueeze(-1).bool()
+    out = []
+    for i in range(0, bow_norm.size(0), block_size):
+        sim = torch.einsum("blh,mh->blm", token_norm, bow_norm[i:i + block_size])
+        out.append(sim.masked_fill(mask, -1e4).max(dim=1).values)
+    return torch.cat(out, dim=1)
+
+
+def token_topk_blocked(
+    token_flat: torch.Tensor, bow_norm: torch.Tensor, k: int, block_size: int = 1024,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """(N, H) 토큰별 정확한 top-k subtag (scores, ids). block 마다 top-k 후 누적 결과와 병합."""
+    best_s, best_i = None, None
+    for i in range(0, bow_norm.size(0), block_size):
+        sim = token_flat @ bow_norm[i:i + block_size].t()
+        s, idx = sim.topk(min(k, sim.size(1)), dim=1)
+        idx = idx + i
+        if best_s is not None:
+            s, pos = torch.cat([best_s, s], dim=1).topk(min(k, best_s.size(1) + s.size(1)), dim=1)
+            idx = torch.cat([best_i, idx], dim=1).gather(1, pos)
+        best_s, best_i = s, idx
+    return best_s, best_i
+
+
+def candidate_subtag_mask(
+    ids: torch.Tensor, attn_mask: torch.Tensor, keyword_of_subtag: torch.Tensor,
+) -> torch.Tensor:
+    """
+    토큰별 top-k 후보 ids (B·L, k) → title 별 정확히 계산할 subtag (B, M) bool.
+    padding 토큰의 후보는 제외하고, 후보 subtag 가 속한 keyword 의 subtag 전체를 포함 (keyword 평균이 정확하도록).
+    title 자신의 토큰 후보만 보므로 결과는 배치 구성과 무관.
+    """
+    B, L = attn_mask.shape
+    K = int(keyword_of_subtag.max()) + 1
+    kw_ids = keyword_of_subtag[ids].reshape(B, -1)                        # (B, L·k)
+    valid = attn_mask.bool().repeat_interleave(ids.size(1), dim=1)        # (B, L·k)
+    hit_kw = torch.zeros(B, K, dtype=torch.long, device=ids.device)
+    hit_kw.scatter_add_(1, kw_ids, valid.long())
+    return (hit_kw > 0)[:, keyword_of_subtag]
+
+
+class FaissSubtagIndex:
+    """subtag 임베딩(L2 정규화)에 대한 HNSW inner-product 인덱스 (CPU)."""
+
+    def __init__(self, bow_norm: torch.Tensor, hnsw_m: int = 32, ef_search: int = 64):
+        import faiss
+        emb = bow_norm.detach().float().cpu().contiguous().numpy()
+        self.index = faiss.IndexHNSWFlat(emb.shape[1], hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        self.index.hnsw.efSearch = ef_search
+        self.index.add(emb)
+
+    def search(self, token_flat: torch.Tensor, k: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        scores, ids = self.index.search(token_flat.detach().float().cpu().contiguous().numpy(), k)
+        scores, ids = torch.from_numpy(scores), torch.from_numpy(ids)
+        # 결과가 k 개보다 적으면 id=-1 → 해당 토큰의 1 순위 후보로 대체 (후보 keyword 집합은 그대로)
+        missing = ids < 0
+        return scores.masked_fill(missing, float("-inf")), torch.where(missing, ids[:, :1], ids).clamp(min=0)
+
+
 # ------------------------------------------------------------
 # 🔍 Suicide Similarity Search Model
 # ------------------------------------------------------------
@@ -92,6 +283,22 @@ class SimilaritySearchModel(nn.Module):
             "이 문장은 '{subtag}' (키워드: {keyword})에 대한 한국 뉴스 기사 제목이다."
         )
 
+        # 제목 토큰화 길이 상한 / 길이 정렬 micro-batch 크기
+        self.max_length = cfg.get("max_length", 128)
+        self.batch_size = cfg.get("batch_size", 64)
+
+        # token × subtag 유사도 계산 방식 (INDEX_MODES 참고)
+        self.index_mode = cfg.get("index_mode", "dense")
+        if self.index_mode not in INDEX_MODES:
+            raise ValueError(f"[ERROR] index_mode must be one of {INDEX_MODES}")
+        self.index_topk = cfg.get("index_topk", 32)
+        self.index_block_size = cfg.get("index_block_size", 1024)
+
+        # 제목 임베딩 영구 저장소 (None: 사용 안 함, "auto": assets/.precomputed/TitleEmbeddings/)
+        self.embedding_store_path = cfg.get("embedding_store")
+        self.embedding_store_tokens = cfg.get("embedding_store_tokens", "fp16")
+        self.dtype = cfg.get("dtype")
+
         # ────────────────────────────────────────────────
         # 2) bow_root 자동 설정 (절대경로)
         # ────────────────────────────────────────────────
@@ -112,203 +319,457 @@ class SimilaritySearchModel(nn.Module):
         self.subtag_thresholds = monthly_cfg.get("subtag_thresholds", {})
 
         # ────────────────────────────────────────────────
-        # 4) 임베딩 모델 로딩
+        # 4) 임베딩 모델 로딩 (프로세스 레지스트리로 공유)
         # ────────────────────────────────────────────────
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.encoder = AutoModel.from_pretrained(self.model_name)
-        self.encoder.eval()
+        from mindcastlib.src.registry_utils import get_hf_encoder
+
+        self.tokenizer, self.encoder = get_hf_encoder(
+            self.model_name,
+            device=cfg.get("encoder_device", "cpu"),
+            dtype=cfg.get("dtype"),
+        )
 
         file_key = self.current_date.replace("-", "_")
         self.bow_path = os.path.join(self.bow_root, f"BOW_{file_key}.pt")
 
         self.bow_emb = self._load_or_precompute()
+        self._load_bow_pack()
+
+        self.embedding_store = None
+        if self.embedding_store_path is not None:
+            from mindcastlib.src.embedding_utils import TitleEmbeddingStore, store_namespace
+
+            path = self.embedding_store_path
+            if path == "auto":
+                path = os.path.join(pkg_root, "assets", ".precomputed", "TitleEmbeddings",
+                                    f"{self.model_name.replace('/', '__')}.sqlite")
+            self.embedding_store = TitleEmbeddingStore(
+                path,
+                namespace=store_namespace(self.model_name, self.max_length, self.dtype),
+                token_dtype=self.embedding_store_tokens,
+            )
+            print(f"[Load] Title embedding store → {path}")
 
     # --------------------------------------------------------
     def _load_or_precompute(self):
-        if os.path.exists(self.bow_path):
-            print(f"[Load] BOW Loaded from {self.bow_path}")
-            return torch.load(self.bow_path)
+        expected = bow_meta(self.keyword_config, self.model_name, self.template)
+        meta_path = bow_meta_path(self.bow_path)
+        if os.path.exists(self.bow_path) and os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta == expected:
+                print(f"[Load] BOW Loaded from {self.bow_path}")
+                return torch.load(self.bow_path)
+            print(f"[Warn] {self.bow_path} was built with different model/template/keywords → Precomputing...")
+        else:
+            print(f"[Warn] {self.bow_path} (or meta) not found → Precomputing...")
 
-        print(f"[Warn] {self.bow_path} not found → Precomputing...")
         precompute_bow_embeddings(
             suicide_keywords=self.keyword_config,
             save_path=self.bow_path,
             tokenizer=self.tokenizer,
             encoder=self.encoder,
             template=self.template,
+            model_name=self.model_name,
         )
         return torch.load(self.bow_path)
 
     # --------------------------------------------------------
-    def _encode_titles(self, titles: List[str]):
-        inputs = self.tokenizer(titles, padding=True, truncation=True, return_tensors="pt")
+    def _load_or_build_pack(self) -> Dict[str, Any]:
+        from mindcastlib.src.checkpoint_utils import file_sha1
+
+        pack_path = bow_pack_path(self.bow_path)
+        source_sha1 = file_sha1(self.bow_path)
+        if os.path.exists(pack_path):
+            pack = torch.load(pack_path)
+            if pack.get("version") == BOW_PACK_VERSION and pack.get("source_sha1") == source_sha1:
+                print(f"[Load] BOW pack Loaded from {pack_path}")
+                return pack
+            print(f"[Warn] {pack_path} is stale → Rebuilding...")
+
+        pack = build_bow_pack(self.bow_emb, source_sha1=source_sha1)
+        torch.save(pack, pack_path)
+        print(f"[Precompute] Saved BOW pack → {pack_path}")
+        return pack
+
+    def _load_bow_pack(self):
+        # 로드 시 1회: 정규화된 텐서를 encoder device/dtype 으로 올려 둠 (배치마다 재구성 X)
+        pack = self._load_or_build_pack()
+        param = next(self.encoder.parameters())
+        self.keywords: List[str] = pack["keywords"]
+        self.subtag_list: List[str] = pack["subtags"]
+        self.keyword_of_subtag = pack["keyword_of_subtag"].to(param.device)
+        self.bow_norm = pack["bow_norm"].to(device=param.device, dtype=param.dtype).contiguous()
+        self.centroid_norm = pack["centroid_norm"].to(device=param.device, dtype=param.dtype).contiguous()
+
+        # 판정용 상수 텐서: subtag 별 threshold (M,), keyword 별 subtag 수 (K,)
+        self.subtag_thr = torch.tensor(
+            [self.subtag_thresholds.get(st, self.default_threshold) for st in self.subtag_list],
+            dtype=torch.float32, device=param.device,
+        )
+        self.subtag_count = torch.bincount(self.keyword_of_subtag, minlength=len(self.keywords)).float()
+
+        self.faiss_index = None
+        if self.index_mode == "faiss":
+            try:
+                self.faiss_index = FaissSubtagIndex(self.bow_norm)
+                print(f"[Load] FAISS HNSW index built ({self.bow_norm.size(0)} subtags)")
+            except ImportError:
+                print("[Warn] faiss not installed → index_mode='topk' 로 대체")
+                self.index_mode = "topk"
+
+    # --------------------------------------------------------
+    def _token_subtag_max(self, token_norm: torch.Tensor, attn_mask: torch.Tensor,
+                          mode: str = None) -> torch.Tensor:
+        mode = mode or self.index_mode
+        if mode == "dense":
+            return token_subtag_max_dense(token_norm, self.bow_norm, attn_mask)
+        if mode == "blocked":
+            return token_subtag_max_blocked(token_norm, self.bow_norm, attn_mask, self.index_block_size)
+
+        M = self.bow_norm.size(0)
+        k = min(self.index_topk, M)
+        token_flat = token_norm.reshape(-1, token_norm.size(-1))
+        if mode == "faiss" and self.faiss_index is not None:
+            _, ids = self.faiss_index.search(token_flat, k)
+            ids = ids.to(token_norm.device)
+        else:
+            _, ids = token_topk_blocked(token_flat, self.bow_norm, k, self.index_block_size)
+
+        # 후보 keyword 의 subtag 만 정확히 계산 (배치 내 후보 열의 합집합으로 한 번에), 나머지는 floor
+        need = candidate_subtag_mask(ids, attn_mask, self.keyword_of_subtag)
+        cols = need.any(dim=0).nonzero(as_tuple=True)[0]
+        out = token_norm.new_full((token_norm.size(0), M), SUBTAG_FLOOR)
+        if cols.numel():
+            out[:, cols] = token_subtag_max_blocked(token_norm, self.bow_norm[cols], attn_mask, self.index_block_size)
+        return out.masked_fill(~need, SUBTAG_FLOOR)
+
+    # --------------------------------------------------------
+    def _encode_titles(self, titles: List[str], inputs=None):
+        if self.embedding_store is not None:
+            return self._encode_titles_stored(titles, inputs=inputs)
+        return self._encode_titles_raw(titles, inputs=inputs)
+
+    def _encode_titles_stored(self, titles: List[str], inputs=None):
+        """저장소 hit 은 그대로, miss 만 encoder 로 인코딩 후 저장. 반환 형식은 _encode_titles_raw 와 동일."""
+        store = self.embedding_store
+        entries = store.get_many(titles)
+
+        miss = [i for i in range(len(titles)) if i not in entries]
+        if miss:
+            sub = None
+            if inputs is not None:
+                sub = {k: v[miss] for k, v in inputs.items()}
+            token_emb, sent_emb, attn_mask = self._encode_titles_raw([titles[i] for i in miss], inputs=sub)
+            valid = attn_mask.bool()
+            tok_list = [token_emb[j][valid[j]].float().cpu() for j in range(len(miss))]
+            store.put_many([titles[i] for i in miss], sent_emb, tok_list)
+            for j, i in enumerate(miss):
+                entries[i] = (sent_emb[j].float().cpu(), store.compress(tok_list[j]))
+
+        # 저장된 (길이별) 토큰 임베딩을 right padding 배치로 조립
+        param = next(self.encoder.parameters())
+        B = len(titles)
+        L = max(entries[i][1].size(0) for i in range(B))
+        H = entries[0][1].size(1)
+        token_emb = torch.zeros(B, L, H, dtype=param.dtype, device=param.device)
+        attn_mask = torch.zeros(B, L, dtype=torch.long, device=param.device)
+        for i in range(B):
+            tok = entries[i][1]
+            token_emb[i, :tok.size(0)] = tok.to(device=param.device, dtype=param.dtype)
+            attn_mask[i, :tok.size(0)] = 1
+        sent_emb = torch.stack([entries[i][0] for i in range(B)]).to(device=param.device, dtype=param.dtype)
+        return token_emb, sent_emb, attn_mask
+
+    def _encode_titles_raw(self, titles: List[str], inputs=None):
+        # inputs: AnalysisPipeLine 공유 토큰화 경로에서 미리 만든 인코딩 (없으면 직접 토큰화)
+        if inputs is None:
+            inputs = self.tokenizer(titles, padding=True, truncation=True,
+                                    max_length=self.max_length, return_tensors="pt")
+        device = next(self.encoder.parameters()).device
+        inputs = {k: v.to(device) for k, v in inputs.items()}
 
         with torch.no_grad():
             outputs = self.encoder(**inputs)
-            token_emb = outputs.last_hidden_state          # (B, L, H)
-            sent_emb = token_emb.mean(dim=1)               # (B, H)
+            token_emb = outputs.last_hidden_state                               # (B, L, H)
+            sent_emb = masked_mean_pool(token_emb, inputs["attention_mask"])    # (B, H), padding 제외
 
         return token_emb, sent_emb, inputs["attention_mask"]
 
     # --------------------------------------------------------
     def _prepare_bow_tensors(self):
-        subtag_list = []
-        keyword_of_subtag = []
-        subtag_embs = []
-
-        # keyword centroid
-        kw_to_embs = {kw: [emb for emb in subtags.values()] for kw, subtags in self.bow_emb.items()}
-        kw_centroid = {
-            kw: torch.stack(embs, dim=0).mean(dim=0)
-            for kw, embs in kw_to_embs.items()
-        }
+        # (하위 호환) pack 에서 subtag 단위 텐서/리스트로 펼쳐서 반환
+        bow_tensor = self.bow_norm
+        centroid_tensor = self.centroid_norm.index_select(0, self.keyword_of_subtag)
+        keyword_of_subtag = [self.keywords[k] for k in self.keyword_of_subtag.tolist()]
+        return bow_tensor, centroid_tensor, list(self.subtag_list), keyword_of_subtag
 
-        centroid_list = []
-
-        for kw, subtags in self.bow_emb.items():
-            centroid = kw_centroid[kw]
-            for st, emb in subtags.items():
-                subtag_list.append(st)
-                keyword_of_subtag.append(kw)
-                subtag_embs.append(emb.unsqueeze(0))
-                centroid_list.append(centroid.unsqueeze(0))
-
-        bow_tensor = torch.cat(subtag_embs, dim=0)
-        centroid_tensor = torch.cat(centroid_list, dim=0)
-
-        return bow_tensor, centroid_tensor, subtag_list, keyword_of_subtag
 
+    # --------------------------------------------------------
+    # 📏 길이 정렬 batching
+    #   - 토큰 길이 내림차순으로 batch_size 씩 나눠 forward, 배치별로 padding 을 잘라냄
+    #   - masked pooling 이므로 결과는 배치 구성과 무관, 출력은 입력 순서로 복원
+    # --------------------------------------------------------
+    def predict(self, titles: List[str], inputs=None, batch_size: int = None) -> List[Dict[str, Any]]:
+        if not titles:
+            return []
+        batch_size = batch_size or self.batch_size
+        if inputs is None:
+            inputs = self.tokenizer(titles, padding=True, truncation=True,
+                                    max_length=self.max_length, return_tensors="pt")
+
+        lengths = inputs["attention_mask"].sum(dim=1)
+        order = torch.argsort(lengths, descending=True, stable=True).tolist()
+        left_pad = getattr(self.tokenizer, "padding_side", "right") == "left"
+
+        results: List[Dict[str, Any]] = [None] * len(titles)
+        for i in range(0, len(order), batch_size):
+            idx = order[i:i + batch_size]
+            L = int(lengths[idx].max())
+            cols = slice(-L, None) if left_pad else slice(0, L)
+            chunk = {k: v[idx][:, cols] for k, v in inputs.items()}
+            for j, r in zip(idx, self.forward([titles[j] for j in idx], inputs=chunk)):
+                results[j] = r
+        return results
 
     # --------------------------------------------------------
-    # 🔥 Final integrated forward()
+    # 📐 네 가지 유사도 행렬 (threshold sweep 에서도 그대로 캐시해서 사용)
+    #   token_subtag (B, M), sent_subtag (B, M), token_centroid (B, K), sent_centroid (B, K)
     # --------------------------------------------------------
-    def forward(self, titles: List[str]) -> List[Dict[str, Any]]:
+    def similarity_matrices(self, titles: List[str], inputs=None) -> Dict[str, torch.Tensor]:
         device = next(self.encoder.parameters()).device
 
         # 1) Encode titles
-        token_emb, sent_emb, attn_mask = self._encode_titles(titles)
+        token_emb, sent_emb, attn_mask = self._encode_titles(titles, inputs=inputs)
         token_emb = token_emb.to(device)
         sent_emb = sent_emb.to(device)
         attn_mask = attn_mask.to(device)
 
-        B, L, H = token_emb.shape
-
-        # 2) Prepare data
-        bow_tensor, centroid_tensor, subtag_list, keyword_of_subtag = self._prepare_bow_tensors()
-        bow_tensor = bow_tensor.to(device)
-        centroid_tensor = centroid_tensor.to(device)
-        M = bow_tensor.size(0)
-
-        # 3) Normalize
+        # 2) Normalize (BOW pack 은 로드 시 정규화 + device 상주)
         token_norm = F.normalize(token_emb, dim=-1)
         sent_norm = F.normalize(sent_emb.unsqueeze(1), dim=-1).squeeze(1)
-        bow_norm = F.normalize(bow_tensor, dim=-1)
-        centroid_norm = F.normalize(centroid_tensor, dim=-1)
-
-        # 4) token similarities
-        sim_token_subtag = torch.einsum("blh,mh->blm", token_norm, bow_norm)
-        sim_token_centroid = torch.einsum("blh,mh->blm", token_norm, centroid_norm)
-
-        mask = attn_mask.unsqueeze(-1).bool()
-        sim_token_subtag = sim_token_subtag.masked_fill(~mask, -1e4)
-        sim_token_centroid = sim_token_centroid.masked_fill(~mask, -1e4)
-
-        max_token_subtag = sim_token_subtag.max(dim=1).values   # (B, M)
-        max_token_centroid = sim_token_centroid.max(dim=1).values
-
-        # 5) sentence sim
-        sim_sent_subtag = torch.matmul(sent_norm, bow_norm.t())
-        sim_sent_centroid = torch.matmul(sent_norm, centroid_norm.t())
-
-        # 6) final weighted similarity
-        w = self.sim_weights
-        final_sim = (
-            w["token_subtag"] * max_token_subtag +
-            w["sent_subtag"] * sim_sent_subtag +
-            w["token_centroid"] * max_token_centroid +
-            w["sent_centroid"] * sim_sent_centroid
-        )
 
-        final_sim_cpu = final_sim.cpu()
+        # 3) token sim (subtag 는 index_mode 에 따라) / sentence sim
+        return {
+            "token_subtag": self._token_subtag_max(token_norm, attn_mask),
+            "sent_subtag": torch.matmul(sent_norm, self.bow_norm.t()),
+            "token_centroid": token_subtag_max_dense(token_norm, self.centroid_norm, attn_mask),
+            "sent_centroid": torch.matmul(sent_norm, self.centroid_norm.t()),
+        }
 
-        unique_keywords = list(set(keyword_of_subtag))
+    # --------------------------------------------------------
+    # 🔥 Final integrated forward()
+    # --------------------------------------------------------
+    def forward(self, titles: List[str], inputs=None) -> List[Dict[str, Any]]:
+        sims = self.similarity_matrices(titles, inputs=inputs)
+        final_sim = combine_similarities(sims, self.sim_weights, self.keyword_of_subtag)
+        suicide_related, winner, subtag_active = decide_suicide(
+            final_sim, self.keyword_of_subtag, self.subtag_count, self.subtag_thr,
+        )
+        return self.format_results(titles, suicide_related, winner, subtag_active)
 
-        CENTROID_THRESHOLD = 0.40
-        LOW_THRESHOLD = 0.5
+    def format_results(self, titles, suicide_related, winner, subtag_active) -> List[Dict[str, Any]]:
+        # dict 는 출력 시에만 생성
+        subtag_active = subtag_active.cpu().tolist()
+        suicide_related = suicide_related.cpu().tolist()
+        winner = winner.cpu().tolist()
 
         results = []
-
-        # --------------------------------------------------------
-        # Per title inference
-        # --------------------------------------------------------
-        for b in range(B):
-
-            keyword_avg_sim = {}
-            for kw in unique_keywords:
-                idxs = [i for i, k in enumerate(keyword_of_subtag) if k == kw]
-                keyword_avg_sim[kw] = final_sim_cpu[b, idxs].mean().item()
-
-            # completely unrelated
-            if max(keyword_avg_sim.values()) < LOW_THRESHOLD:
-                keyword_mask = {kw: False for kw in unique_keywords}
-                subtag_mask = {st: False for st in subtag_list}
-                results.append({
-                    "title": titles[b],
-                    "suicide_related": False,
-                    "keyword_mask": keyword_mask,
-                    "subtag_mask": subtag_mask,
-                    "winner_keyword": None,
-                })
-                continue
-
-            # centroid filter
-            filtered = {
-                kw: avg for kw, avg in keyword_avg_sim.items()
-                if avg >= CENTROID_THRESHOLD
-            }
-            if not filtered:
-                filtered = keyword_avg_sim
-
-            winner_kw = max(filtered, key=filtered.get)
-
-            # winner subtag mask
-            keyword_mask = {}
-            subtag_mask = {}
-
-            for kw in unique_keywords:
-                keyword_mask[kw] = False
-
-            for j, st in enumerate(subtag_list):
-                kw = keyword_of_subtag[j]
-
-                if kw != winner_kw:
-                    subtag_mask[st] = False
-                    continue
-
-                thr = self.subtag_thresholds.get(st, self.default_threshold)
-                subtag_mask[st] = final_sim_cpu[b, j].item() > thr
-
-            winner_has_active = any(
-                subtag_mask[st]
-                for st, kw in zip(subtag_list, keyword_of_subtag)
-                if kw == winner_kw
-            )
-            if winner_has_active:
-                keyword_mask[winner_kw] = True
-
-            suicide_related = any(keyword_mask.values())
-
+        for b in range(len(titles)):
+            winner_kw = self.keywords[winner[b]] if suicide_related[b] else None
             results.append({
                 "title": titles[b],
-                "suicide_related": suicide_related,
-                "keyword_mask": keyword_mask,
-                "subtag_mask": subtag_mask,
-                "winner_keyword": winner_kw if suicide_related else None,
+                "suicide_related": suicide_related[b],
+                "keyword_mask": {kw: kw == winner_kw for kw in self.keywords},
+                "subtag_mask": dict(zip(self.subtag_list, subtag_active[b])),
+                "winner_keyword": winner_kw,
             })
-
         return results
 
 
+# ------------------------------------------------------------
+# ⚖️ 유사도 결합 + 판정 (forward / threshold sweep 공용)
+#   - grid 축(G)을 앞에 붙이면 여러 설정을 한 번에 계산
+# ------------------------------------------------------------
+CENTROID_THRESHOLD = 0.40
+LOW_THRESHOLD = 0.5
+SIM_KEYS = ("token_subtag", "sent_subtag", "token_centroid", "sent_centroid")
+
+
+def combine_similarities(
+    sims: Dict[str, torch.Tensor],
+    weights: Union[Dict[str, float], torch.Tensor],
+    keyword_of_subtag: torch.Tensor,
+) -> torch.Tensor:
+    """
+    weights: {SIM_KEYS: w} → (N, M)  /  (G, 4) 텐서 (SIM_KEYS 순서) → (G, N, M)
+    centroid 유사도 (N, K) 는 keyword_of_subtag 로 subtag 단위로 펼쳐서 결합
+    """
+    mats = [
+        sims["token_subtag"],
+        sims["sent_subtag"],
+        sims["token_centroid"][:, keyword_of_subtag],
+        sims["sent_centroid"][:, keyword_of_subtag],
+    ]
+    if isinstance(weights, dict):
+        return sum(weights[k] * m for k, m in zip(SIM_KEYS, mats))
+    w = weights.to(device=mats[0].device, dtype=mats[0].dtype)
+    return sum(w[:, i, None, None] * m for i, m in enumerate(mats))
+
+
+def decide_suicide(
+    final_sim: torch.Tensor,
+    keyword_of_subtag: torch.Tensor,
+    subtag_count: torch.Tensor,
+    subtag_thr: torch.Tensor,
+    centroid_threshold: Union[float, torch.Tensor] = CENTROID_THRESHOLD,
+    low_threshold: Union[float, torch.Tensor] = LOW_THRESHOLD,
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    final_sim (N, M) 또는 (G, N, M) → (suicide_related, winner, subtag_active)
+    grid 일 때 subtag_thr 는 (G, M), centroid/low threshold 는 (G,) 텐서
+    """
+    final_sim = final_sim.float()
+    K = subtag_count.numel()
+    grid = final_sim.dim() == 3
+    if grid:
+        subtag_thr = subtag_thr.unsqueeze(-2) if subtag_thr.dim() == 2 else subtag_thr
+        if torch.is_tensor(centroid_threshold):
+            centroid_threshold = centroid_threshold.to(final_sim.device).reshape(-1, 1, 1)
+        if torch.is_tensor(low_threshold):
+            low_threshold = low_threshold.to(final_sim.device).reshape(-1, 1)
+
+    # keyword 평균 유사도: subtag → keyword scatter 합 / subtag 수
+    keyword_avg_sim = final_sim.new_zeros(final_sim.shape[:-1] + (K,))
+    keyword_avg_sim = keyword_avg_sim.index_add_(-1, keyword_of_subtag, final_sim) / subtag_count
+
+    # completely unrelated
+    related_any = keyword_avg_sim.max(dim=-1).values >= low_threshold
+
+    # centroid filter (통과한 keyword 가 없으면 전체 후보) → masked argmax (동점이면 앞 keyword)
+    passed = keyword_avg_sim >= centroid_threshold
+    passed = passed | ~passed.any(dim=-1, keepdim=True)
+    winner = keyword_avg_sim.masked_fill(~passed, float("-inf")).argmax(dim=-1)
+
+    # winner keyword 의 subtag 중 threshold 를 넘는 것만 활성
+    subtag_active = (
+        (final_sim > subtag_thr)
+        & (keyword_of_subtag == winner.unsqueeze(-1))
+        & related_any.unsqueeze(-1)
+    )
+    return subtag_active.any(dim=-1), winner, subtag_active
+
+
+# ------------------------------------------------------------
+# 🎛️ Threshold sweep (encoder 재실행 없이 캐시된 유사도로 여러 설정 평가)
+#   grid_spec 키 (없으면 모델 현재 값):
+#     sim_weights             : [{token_subtag, sent_subtag, token_centroid, sent_centroid}, ...]
+#     threshold               : subtag_thresholds 에 없는 subtag 의 기본 threshold
+#     subtag_threshold_offset : 모든 subtag threshold 에 더하는 값
+#     centroid_threshold / low_threshold
+# ------------------------------------------------------------
+def compute_similarity_cache(model: "SimilaritySearchModel", titles: List[str], batch_size: int = None) -> Dict[str, Any]:
+    """제목별 네 유사도 행렬 (CPU fp32) + 검증용 메타. torch.save 로 저장해 두고 sweep 마다 재사용."""
+    batch_size = batch_size or model.batch_size
+    chunks = {k: [] for k in SIM_KEYS}
+    for i in range(0, len(titles), batch_size):
+        sims = model.similarity_matrices(titles[i:i + batch_size])
+        for k in SIM_KEYS:
+            chunks[k].append(sims[k].float().cpu())
+    out = {k: torch.cat(v) if v else torch.empty(0) for k, v in chunks.items()}
+    out["meta"] = similarity_cache_meta(model, titles)
+    return out
+
+
+def similarity_cache_meta(model: "SimilaritySearchModel", titles: List[str]) -> Dict[str, Any]:
+    from mindcastlib.src.checkpoint_utils import config_sha1
+    return {
+        "model_name": model.model_name,
+        "max_length": model.max_length,
+        "index_mode": model.index_mode,
+        "bow": config_sha1({"keywords": model.keywords, "subtags": model.subtag_list, "bow": model.bow_path}),
+        "titles": config_sha1(titles),
+    }
+
+
+def build_sweep_grid(model: "SimilaritySearchModel", grid_spec: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    import itertools
+    axes = {
+        "sim_weights": grid_spec.get("sim_weights", [model.sim_weights]),
+        "threshold": grid_spec.get("threshold", [model.default_threshold]),
+        "subtag_threshold_offset": grid_spec.get("subtag_threshold_offset", [0.0]),
+        "centroid_threshold": grid_spec.get("centroid_threshold", [CENTROID_THRESHOLD]),
+        "low_threshold": grid_spec.get("low_threshold", [LOW_THRESHOLD]),
+    }
+    settings = []
+    for values in itertools.product(*axes.values()):
+        setting = dict(zip(axes.keys(), values))
+        w = setting["sim_weights"]
+        total = sum(w.values())
+        setting["sim_weights"] = {k: w.get(k, 0.0) / total for k in SIM_KEYS}
+        settings.append(setting)
+    return settings
+
+
+def sweep_thresholds(
+    model: "SimilaritySearchModel",
+    sims: Dict[str, torch.Tensor],
+    settings: List[Dict[str, Any]],
+    reduce: Callable[[torch.Tensor, torch.Tensor, torch.Tensor], Dict[str, Any]] = None,
+    grid_chunk: int = 16,
+    title_chunk: int = 4096,
+) -> List[Dict[str, Any]]:
+    """
+    settings 별 판정 결과 요약.
+      - n_related    : suicide_related 제목 수
+      - keyword_hits : winner keyword 별 related 제목 수
+    reduce(related (N,), winner (N,), subtag_active (N, M)) 가 있으면 그 결과 dict 를 요약에 합침
+    (예: scripts/sweep_suicide_thresholds.py 의 게시글 단위 SEEI 집계).
+    """
+    kw_idx = model.keyword_of_subtag.cpu()
+    subtag_count = model.subtag_count.cpu()
+    K, M = len(model.keywords), len(model.subtag_list)
+    N = sims["token_subtag"].size(0)
+
+    explicit = torch.tensor([st in model.subtag_thresholds for st in model.subtag_list])
+    explicit_thr = torch.tensor([model.subtag_thresholds.get(st, 0.0) for st in model.subtag_list])
+
+    summaries = []
+    for g0 in range(0, len(settings), grid_chunk):
+        group = settings[g0:g0 + grid_chunk]
+        G = len(group)
+        weights = torch.tensor([[st["sim_weights"][k] for k in SIM_KEYS] for st in group])
+        default = torch.tensor([st["threshold"] for st in group]).unsqueeze(1)
+        offset = torch.tensor([st["subtag_threshold_offset"] for st in group]).unsqueeze(1)
+        subtag_thr = torch.where(explicit, explicit_thr, default) + offset                  # (G, M)
+        centroid = torch.tensor([st["centroid_threshold"] for st in group])
+        low = torch.tensor([st["low_threshold"] for st in group])
+
+        related = torch.zeros(G, N, dtype=torch.bool)
+        winner = torch.zeros(G, N, dtype=torch.long)
+        active = torch.zeros(G, N, M, dtype=torch.bool) if reduce is not None else None
+        for n0 in range(0, N, title_chunk):
+            part = {k: v[n0:n0 + title_chunk] for k, v in sims.items() if k in SIM_KEYS}
+            final_sim = combine_similarities(part, weights, kw_idx)                         # (G, n, M)
+            r, w, a = decide_suicide(final_sim, kw_idx, subtag_count, subtag_thr, centroid, low)
+            related[:, n0:n0 + title_chunk] = r
+            winner[:, n0:n0 + title_chunk] = w
+            if active is not None:
+                active[:, n0:n0 + title_chunk] = a
+
+        hits = torch.zeros(G, K).scatter_add_(1, winner, related.float())
+        for g, setting in enumerate(group):
+            summary = {
+                "setting": setting,
+                "n_related": int(related[g].sum()),
+                "keyword_hits": {kw: int(hits[g, k]) for k, kw in enumerate(model.keywords)},
+            }
+            if reduce is not None:
+                summary.update(reduce(related[g], winner[g], active[g]))
+            summaries.append(summary)
+    return summaries
+
+
 # ------------------------------------------------------------
 # 🔬 Example 실행
 # ------------------------------------------------------------
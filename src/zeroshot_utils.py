@@ -0,0 +1,132 @@
+# ============================================================
+# 📦 zeroshot_utils.py — NLI 기반 zero-shot 분류 공통 유틸
+#  - entailment label id 탐색, (텍스트 × 후보 라벨) entailment logit → 점수 변환
+#  - HF zero-shot-classification pipeline 과 같은 결과 형식
+#    {"sequence": str, "labels": [...], "scores": [...]} (점수 내림차순)
+#  - NLIZeroShotEngine : 길이 정렬 + token budget 배치의 batched NLI 엔진 (torch / ONNX 공용)
+# ============================================================
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence
+
+import torch
+
+
+def entailment_id(config) -> int:
+    """NLI 모델 config.label2id 에서 'entail...' 라벨 id (없으면 HF pipeline 과 같이 -1)."""
+    for label, idx in (getattr(config, "label2id", None) or {}).items():
+        if str(label).lower().startswith("entail"):
+            return int(idx)
+    return -1
+
+
+def zero_shot_scores(logits: torch.Tensor, entail_id: int, multi_label: bool = False) -> torch.Tensor:
+    """
+    logits: (B, n_labels, n_nli_classes) → scores (B, n_labels)
+    - multi_label=False : 후보 라벨들의 entailment logit 에 softmax (라벨 간 합 = 1)
+    - multi_label=True  : 라벨별로 contradiction vs entailment softmax (독립 확률)
+    """
+    logits = logits.float()
+    if multi_label or logits.size(1) == 1:
+        contradiction_id = -1 if entail_id == 0 else 0
+        pair = logits[..., [contradiction_id, entail_id]]
+        return torch.softmax(pair, dim=-1)[..., 1]
+    return torch.softmax(logits[..., entail_id], dim=-1)
+
+
+def format_zero_shot(texts: Sequence[str], labels: Sequence[str], scores: torch.Tensor) -> List[Dict[str, Any]]:
+    """scores (B, n_labels) → pipeline 형식 dict 리스트."""
+    # HF pipeline 과 같은 동점 순서 (오름차순 stable argsort 를 뒤집음)
+    order = scores.argsort(dim=-1, stable=True).flip(-1).tolist()
+    values = scores.tolist()
+    return [
+        {
+            "sequence": text,
+            "labels": [labels[j] for j in idx],
+            "scores": [values[b][j] for j in idx],
+        }
+        for b, (text, idx) in enumerate(zip(texts, order))
+    ]
+
+
+# ------------------------------------------------------------
+# ⚙️ Batched NLI engine
+#  - 배치 전체의 (텍스트 × 후보 라벨) premise–hypothesis 쌍을 한 번에 토큰화
+#  - 쌍 길이로 정렬 후 "패딩 포함 토큰 수 ≤ token_budget" 단위로 묶어 forward (padding 낭비 최소화)
+#  - entailment logit 을 원래 위치로 되돌려 (B, n_labels, C) 로 만든 뒤 텍스트별 softmax 를 한 번에 계산
+# ------------------------------------------------------------
+def budget_batches(lengths: Sequence[int], token_budget: int, max_batch: int | None = None) -> List[List[int]]:
+    """
+    길이 오름차순으로 정렬한 index 를 (배치 크기 × 배치 내 최대 길이) ≤ token_budget 이 되도록 분할.
+    한 쌍이 budget 보다 길어도 단독 배치로는 처리한다.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches: List[List[int]] = []
+    cur: List[int] = []
+    for i in order:
+        # 오름차순이므로 현재 쌍이 배치 내 최대 길이
+        if cur and ((len(cur) + 1) * lengths[i] > token_budget or (max_batch and len(cur) >= max_batch)):
+            batches.append(cur)
+            cur = []
+        cur.append(i)
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+class NLIZeroShotEngine:
+    """
+    HF zero-shot-classification pipeline 과 같은 호출 형식/결과의 batched NLI 엔진.
+    model 은 model(**enc).logits 를 주는 SequenceClassification (torch 모델 또는 OnnxSequenceClassifier).
+    """
+
+    task = "zero-shot-classification"
+
+    def __init__(self, tokenizer, model, max_length: Optional[int] = None, token_budget: int = 8192,
+                 max_batch: int = 256):
+        self.tokenizer = tokenizer
+        self.model = model
+        # None → HF pipeline 과 같이 tokenizer.model_max_length 까지 (비정상적으로 큰 값이면 512)
+        model_max = getattr(tokenizer, "model_max_length", 512)
+        self.max_length = max_length or (model_max if model_max <= 100000 else 512)
+        self.token_budget = token_budget
+        self.max_batch = max_batch
+        self.entailment_id = entailment_id(model.config)
+
+    def _tokenize_pairs(self, premises: List[str], hypotheses: List[str]) -> Dict[str, List[List[int]]]:
+        try:
+            return self.tokenizer(premises, hypotheses, truncation="only_first", max_length=self.max_length)
+        except Exception as e:
+            # 가설만으로 max_length 를 넘는 경우 등 (HF pipeline 과 같은 처리)
+            if "too short" not in str(e):
+                raise
+            return self.tokenizer(premises, hypotheses, truncation=False)
+
+    @torch.no_grad()
+    def scores(self, texts: Sequence[str], labels: Sequence[str], hypothesis_template: str,
+               multi_label: bool = False) -> torch.Tensor:
+        """(B, n_labels) zero-shot 점수."""
+        B, n = len(texts), len(labels)
+        hyps = [hypothesis_template.format(lb) for lb in labels]
+        premises = [t for t in texts for _ in range(n)]
+        enc = self._tokenize_pairs(premises, hyps * B)
+        keys = [k for k in ("input_ids", "attention_mask", "token_type_ids") if k in enc]
+        lengths = [len(ids) for ids in enc["input_ids"]]
+
+        device = getattr(self.model, "device", torch.device("cpu"))
+        n_cls = len(self.model.config.id2label)
+        logits = torch.empty(B * n, n_cls, dtype=torch.float32)
+        for idx in budget_batches(lengths, self.token_budget, self.max_batch):
+            batch = self.tokenizer.pad({k: [enc[k][i] for i in idx] for k in keys}, return_tensors="pt")
+            out = self.model(**{k: v.to(device) for k, v in batch.items()}).logits
+            logits[idx] = out.float().cpu()
+        return zero_shot_scores(logits.view(B, n, n_cls), self.entailment_id, multi_label)
+
+    def __call__(self, sequences, candidate_labels, hypothesis_template: str = "This example is {}.",
+                 multi_label: bool = False, **kwargs):
+        single = isinstance(sequences, str)
+        texts = [sequences] if single else list(sequences)
+        labels = [candidate_labels] if isinstance(candidate_labels, str) else list(candidate_labels)
+        if not texts:
+            return []
+        out = format_zero_shot(texts, labels, self.scores(texts, labels, hypothesis_template, multi_label))
+        return out[0] if single else out
@@ -0,0 +1,134 @@
+# ============================================================
+# 🧪 tests/conftest.py — 작은 랜덤 가중치 모델 (네트워크/GPU 없이 실행)
+#  - 실행: mindcastlib 의 상위 디렉터리에서  python -m pytest mindcastlib/tests -q
+#  - 한국어 문자 단위 WordPiece vocab + 2-layer BERT/RoBERTa
+# ============================================================
+import json
+import os
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+PKG_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUICIDE_CONFIG_ROOT = os.path.join(PKG_ROOT, "configs", "suicide")
+SUICIDE_CONFIG = "suicide_keyword_final"
+
+SAMPLE_TEXTS = [
+    "청년 실업률이 급증하고 있다",
+    "주식 시장이 상승 중이다",
+    "가계부채와 빚 문제가 심각하다",
+    "구직 단념자 역대 최대… 쉬었음 청년 늘어",
+    "소비자물가 3%대 상승, 서민 부담 커져",
+    "국회 본회의서 예산안 처리 무산",
+    "오늘 정말 행복한 하루였다",
+    "이 문장은 경제에 관한 내용이다.",
+]
+
+
+def _tiny_dims(**kw):
+    return dict(hidden_size=32, num_hidden_layers=2, num_attention_heads=4, intermediate_size=64, **kw)
+
+
+@pytest.fixture(scope="session")
+def tiny_tokenizer_dir(tmp_path_factory):
+    from transformers import AutoTokenizer
+
+    with open(os.path.join(SUICIDE_CONFIG_ROOT, f"{SUICIDE_CONFIG}.json"), encoding="utf-8") as f:
+        keywords = json.load(f)["keywords"]
+    text = "".join(SAMPLE_TEXTS) + "".join(k + "".join(v) for k, v in keywords.items())
+    text += "이 문장은 '{}' (키워드: )에 대한 한국 뉴스 기사 제목이다. 정치 경제 사회"
+    text += "다음 한국어 문장의 감정를 번호로만 답하라. 라벨 후보: 1) 분노; 2) 슬픔; 3) 불안; 4) 상처; 5) 당황; 6) 기쁨"
+    text += "- 출력 형식: 오직 숫자 한 글자 (예: 1) 추가 문자, 공백, 설명 금지 정답 번호: <|>[]"
+    chars = sorted(set(text.lower() + "abcdefghijklmnopqrstuvwxyz0123456789") - {" "})
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + chars + ["##" + c for c in chars]
+
+    # vocab.txt + tokenizer_config 만 두고 AutoTokenizer 로 읽음 (transformers 4 / 5 공통 형식)
+    # strip_accents=False: 기본 BERT 정규화는 NFD 로 한글 음절을 자모로 분해함
+    d = tmp_path_factory.mktemp("tiny_tok")
+    with open(d / "vocab.txt", "w", encoding="utf-8") as f:
+        f.write("\n".join(vocab))
+    with open(d / "tokenizer_config.json", "w", encoding="utf-8") as f:
+        json.dump({"tokenizer_class": "BertTokenizer", "do_lower_case": True,
+                   "tokenize_chinese_chars": False, "strip_accents": False}, f)
+    assert len(AutoTokenizer.from_pretrained(str(d))) == len(vocab)
+    return str(d)
+
+
+def _save_with_tokenizer(model, tok_dir, out_dir):
+    from transformers import AutoTokenizer
+
+    model.save_pretrained(str(out_dir))
+    AutoTokenizer.from_pretrained(tok_dir).save_pretrained(str(out_dir))
+    return str(out_dir)
+
+
+@pytest.fixture(scope="session")
+def tiny_encoder_dir(tiny_tokenizer_dir, tmp_path_factory):
+    """suicide SimilaritySearchModel 용 RoBERTa encoder."""
+    from transformers import AutoTokenizer, RobertaConfig, RobertaModel
+
+    torch.manual_seed(0)
+    vocab_size = len(AutoTokenizer.from_pretrained(tiny_tokenizer_dir))
+    model = RobertaModel(RobertaConfig(vocab_size=vocab_size, pad_token_id=0, **_tiny_dims()))
+    return _save_with_tokenizer(model, tiny_tokenizer_dir, tmp_path_factory.mktemp("tiny_enc"))
+
+
+@pytest.fixture(scope="session")
+def tiny_nli_dir(tiny_tokenizer_dir, tmp_path_factory):
+    """entailment/neutral/contradiction 3-way NLI 분류기 (entailment id 0)."""
+    from transformers import AutoTokenizer, BertConfig, BertForSequenceClassification
+
+    torch.manual_seed(0)
+    vocab_size = len(AutoTokenizer.from_pretrained(tiny_tokenizer_dir))
+    id2label = {0: "entailment", 1: "neutral", 2: "contradiction"}
+    cfg = BertConfig(
+        vocab_size=vocab_size, num_labels=3, id2label=id2label,
+        label2id={v: k for k, v in id2label.items()}, **_tiny_dims(),
+    )
+    model = BertForSequenceClassification(cfg)
+    return _save_with_tokenizer(model, tiny_tokenizer_dir, tmp_path_factory.mktemp("tiny_nli"))
+
+
+# TinyLlama 류 chat 템플릿 (BOS 는 템플릿이 아니라 토크나이저가 붙임)
+LLAMA_CHAT_TEMPLATE = (
+    "{% for m in messages %}{{ '<|' + m['role'] + '|>\\n' + m['content'] + eos_token + '\\n' }}{% endfor %}"
+    "{% if add_generation_prompt %}{{ '<|assistant|>\\n' }}{% endif %}"
+)
+
+
+@pytest.fixture(scope="session")
+def tiny_llama_dir(tiny_tokenizer_dir, tmp_path_factory):
+    """
+    LlamaCaller 용 causal LM. 토크나이저는 Llama 처럼 BOS 만 앞에 붙이고 chat 템플릿을 가짐.
+    lm_head 는 번호 "1".."6" 토큰 행만 (+r, -r) 쌍으로 두고 나머지는 0 → greedy 첫 토큰이 항상 번호.
+    """
+    pytest.importorskip("accelerate")      # LlamaCaller 의 pipeline(device_map="auto")
+    from tokenizers.processors import TemplateProcessing
+    from transformers import AutoTokenizer, LlamaConfig, LlamaForCausalLM
+
+    tok = AutoTokenizer.from_pretrained(tiny_tokenizer_dir)
+    tok.bos_token, tok.eos_token = "[CLS]", "[SEP]"
+    tok.backend_tokenizer.post_processor = TemplateProcessing(
+        single="[CLS] $A", pair="[CLS] $A $B", special_tokens=[("[CLS]", tok.cls_token_id)],
+    )
+    tok.chat_template = LLAMA_CHAT_TEMPLATE
+
+    torch.manual_seed(0)
+    cfg = LlamaConfig(
+        vocab_size=len(tok), num_key_value_heads=2, max_position_embeddings=1024,
+        pad_token_id=tok.pad_token_id, bos_token_id=tok.bos_token_id, eos_token_id=tok.eos_token_id,
+        initializer_range=0.2, **_tiny_dims(),      # 기본(0.02)이면 마지막 토큰이 logit 을 지배해 라벨이 모두 같음
+    )
+    model = LlamaForCausalLM(cfg)
+    digits = [tok.convert_tokens_to_ids(str(i)) for i in range(1, 7)]
+    with torch.no_grad():
+        rows = torch.randn(3, cfg.hidden_size)
+        model.lm_head.weight.zero_()
+        model.lm_head.weight[digits] = torch.cat([rows, -rows]) * 10
+
+    d = tmp_path_factory.mktemp("tiny_llama")
+    model.save_pretrained(str(d))
+    tok.save_pretrained(str(d))
+    return str(d)
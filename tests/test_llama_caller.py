@@ -0,0 +1,100 @@
+# ============================================================
+# 🧪 LlamaCaller — score 모드 채점이 generate 모드(pipeline) 라벨과 같은지, prefix KV-cache 가 정확한지
+# ============================================================
+import random
+
+import pytest
+import torch
+
+from mindcastlib.configs import LLMConfig
+from mindcastlib.src.llm_utils import LlamaCaller
+
+from conftest import SAMPLE_TEXTS
+
+
+@pytest.fixture(scope="module")
+def make_caller(tiny_llama_dir):
+    mp = pytest.MonkeyPatch()
+    mp.setenv("HF_LLM_MODEL", tiny_llama_dir)
+
+    def make(**overrides):
+        cfg = LLMConfig.CLASSIFY_SENTIMENT().model_copy(update={"llm_name": "llama", "llama_batch_size": 4, **overrides})
+        caller = LlamaCaller(cfg)
+        assert caller._gen is not None
+        return caller
+
+    yield make
+    mp.undo()
+
+
+@pytest.fixture(scope="module")
+def texts():
+    rng = random.Random(0)
+    words = " ".join(SAMPLE_TEXTS).split()
+    return SAMPLE_TEXTS + [" ".join(rng.choices(words, k=rng.randint(1, 12))) for _ in range(12)]
+
+
+def test_score_batch_keeps_bos(make_caller):
+    caller = make_caller(llama_prefix_cache=False)
+    prompts = [caller._build_prompt(t) for t in SAMPLE_TEXTS[:3]]
+    assert not prompts[0].startswith(caller._tok.bos_token)     # 템플릿에는 BOS 없음 → 토크나이저가 붙여야 함
+
+    seen = []
+    hook = caller._gen.model.register_forward_pre_hook(lambda m, a, kw: seen.append(kw["input_ids"]), with_kwargs=True)
+    try:
+        caller.score_batch(prompts)
+    finally:
+        hook.remove()
+    ids, attn = seen[0], caller._tok(prompts, return_tensors="pt", padding=True)["attention_mask"]
+    first = ids.gather(1, (attn == 0).sum(-1, keepdim=True))        # left padding 뒤 첫 실제 토큰
+    assert (first == caller._tok.bos_token_id).all()
+
+
+def test_score_matches_generate(make_caller, texts):
+    generated = make_caller(llama_mode="generate", llama_prefix_cache=False)(texts)
+    scored = make_caller(llama_mode="score", llama_prefix_cache=False)(texts)
+    assert all(generated) and len(set(generated)) > 1
+    assert scored == generated
+
+
+# ------------------------------------------------------------
+# prefix KV-cache
+# ------------------------------------------------------------
+def test_prefix_split_is_exact(make_caller, texts):
+    caller = make_caller()
+    prefix_ids, _ = caller._prefix_state()
+    seqs = caller._split_prompts(texts)
+    assert all(x is not None for x in seqs)
+
+    full = caller._tok([caller._build_prompt(t) for t in texts])["input_ids"]
+    assert [prefix_ids + x for x in seqs] == [list(ids) for ids in full]
+
+    model = caller._gen.model
+    got = caller._forward_with_prefix(seqs)[0]
+    with torch.no_grad():
+        ref = torch.stack([model(input_ids=torch.tensor([ids])).logits[0, -1] for ids in full])
+    assert torch.allclose(got, ref, atol=1e-4)
+
+
+@pytest.mark.parametrize("mode", ["score", "generate"])
+def test_prefix_cache_matches_full_forward(make_caller, texts, mode):
+    ref = make_caller(llama_mode=mode, llama_prefix_cache=False)(texts)
+    assert make_caller(llama_mode=mode)(texts) == ref
+
+
+def test_prefix_boundary_mismatch_falls_back(make_caller, texts, monkeypatch):
+    ref = make_caller(llama_prefix_cache=False)(texts)
+
+    # prefix 가 special token 중간에서 끊기면 전체 토큰화의 앞부분과 달라짐 → 전 항목 폴백
+    caller = make_caller()
+    prefix = caller._prompt_prefix()
+    cut = prefix.index(caller._tok.eos_token) + 2
+    monkeypatch.setattr(caller, "_prompt_prefix", lambda: prefix[:cut])
+    assert caller._split_prompts(texts) == [None] * len(texts)
+    assert caller(texts) == ref
+
+    # 일부만 폴백해도 입력 순서대로 합쳐짐
+    caller = make_caller()
+    split = caller._split_prompts
+    monkeypatch.setattr(caller, "_split_prompts", lambda ts: [x if j % 2 else None for j, x in enumerate(split(ts))])
+    assert caller(texts) == ref
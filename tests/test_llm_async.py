@@ -0,0 +1,154 @@
+# ============================================================
+# 🧪 AsyncRateLimiter 윈도우 / AsyncCaller (fake client, 네트워크 없음)
+# ============================================================
+import asyncio
+import threading
+import time
+
+import pytest
+
+from mindcastlib.configs import LLMConfig
+from mindcastlib.src.llm_utils import AsyncCaller, AsyncRateLimiter, LLMPipeLine
+
+WINDOW = 0.2
+
+
+def _acquire_all(limiter, tokens):
+    async def run():
+        stamps = []
+        for n in tokens:
+            await limiter.acquire(n)
+            stamps.append(time.monotonic())
+        return stamps
+    return asyncio.run(run())
+
+
+# ------------------------------------------------------------
+# AsyncRateLimiter
+# ------------------------------------------------------------
+def test_rpm_window():
+    limiter = AsyncRateLimiter(rpm=3, window=WINDOW)
+    stamps = _acquire_all(limiter, [0] * 7)
+    # 첫 3개는 바로, 이후로는 어떤 window 안에도 요청이 3개 이하
+    assert stamps[2] - stamps[0] < WINDOW / 2
+    for i in range(3, len(stamps)):
+        assert stamps[i] - stamps[i - 3] >= WINDOW - 0.01
+
+
+def test_tpm_window_and_correct():
+    limiter = AsyncRateLimiter(tpm=100, window=WINDOW)
+    t0 = time.monotonic()
+    _acquire_all(limiter, [60, 30])
+    assert time.monotonic() - t0 < WINDOW / 2          # 90 ≤ 100
+    stamps = _acquire_all(limiter, [60])
+    assert stamps[0] - t0 >= WINDOW - 0.01              # 150 > 100 → 창이 빌 때까지 대기
+
+    # usage 보정: 추정보다 적게 썼으면 바로 여유가 생김
+    limiter = AsyncRateLimiter(tpm=100, window=WINDOW)
+    _acquire_all(limiter, [90])
+    limiter.correct(-80)
+    t0 = time.monotonic()
+    _acquire_all(limiter, [50])
+    assert time.monotonic() - t0 < WINDOW / 2
+
+
+def test_oversized_request_passes_when_window_empty():
+    limiter = AsyncRateLimiter(tpm=10, window=WINDOW)
+    t0 = time.monotonic()
+    _acquire_all(limiter, [1000])
+    assert time.monotonic() - t0 < WINDOW / 2
+
+
+# ------------------------------------------------------------
+# AsyncCaller
+# ------------------------------------------------------------
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FakeClient:
+    def __init__(self):
+        self.loop = None
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeAsyncCaller(AsyncCaller):
+    name = "Fake"
+    backoff = 0.001
+
+    def __init__(self, cfg):
+        super().__init__(cfg)
+        self.clients = []
+        self.inflight = self.peak = 0
+        self.failures = {}
+
+    def _make_client(self):
+        self.clients.append(FakeClient())
+        return self.clients[-1]
+
+    async def _acomplete(self, client, prompt, max_tokens):
+        # client 는 만들어진 이벤트 루프에서만 사용되어야 함
+        loop = asyncio.get_running_loop()
+        assert client.loop in (None, loop)
+        client.loop = loop
+
+        self.inflight += 1
+        self.peak = max(self.peak, self.inflight)
+        await asyncio.sleep(0.002)
+        self.inflight -= 1
+        if "flaky" in prompt and self.failures.get(prompt, 0) < 2:
+            self.failures[prompt] = self.failures.get(prompt, 0) + 1
+            raise RateLimitError("rate limited")
+        if "broken" in prompt:
+            raise ValueError("boom")
+        return ("기쁨" if "좋" in prompt else "분노"), (10, 1)
+
+
+@pytest.fixture
+def caller():
+    cfg = LLMConfig.CLASSIFY_SENTIMENT()
+    cfg.llm_name = "gpt4o"
+    cfg.concurrency = 4
+    c = FakeAsyncCaller(cfg)
+    yield c
+    c.close()
+
+
+def test_async_caller_order_retry_and_errors(caller):
+    data = [f"좋은 {i}" if i % 2 else f"나쁜 {i}" for i in range(12)] + ["flaky 좋", "broken"]
+    out = caller(data)
+    assert out[:12] == ["기쁨" if i % 2 else "분노" for i in range(12)]
+    assert out[12] == "기쁨"                         # 429 두 번 후 성공
+    assert out[13].startswith("[Fake 오류")
+    assert 1 < caller.peak <= caller.concurrency
+    assert caller.metrics.retries == 2
+    assert caller([]) == []
+
+
+def test_async_caller_reuses_one_client_and_closes(caller):
+    for _ in range(3):
+        caller(["좋아", "싫어"])
+    assert len(caller.clients) == 1
+
+    # 이미 이벤트 루프가 도는 환경 (Jupyter 등) 에서도 같은 client
+    async def inside():
+        return caller(["좋아"])
+    assert asyncio.run(inside()) == ["기쁨"]
+    assert len(caller.clients) == 1
+
+    caller.close()
+    assert caller.clients[0].closed
+    assert not any(t.name == "Fake-async" for t in threading.enumerate())
+
+    # close 후 다시 호출하면 새 client
+    assert caller(["좋아"]) == ["기쁨"]
+    assert len(caller.clients) == 2
+
+
+def test_pipeline_passes_whole_input_for_async(caller):
+    pipe = LLMPipeLine.__new__(LLMPipeLine)
+    pipe._caller = caller
+    assert pipe.whole_input
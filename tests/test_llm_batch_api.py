@@ -0,0 +1,140 @@
+# ============================================================
+# 🧪 OpenAIBatchCaller — files / batches 를 흉내내는 fake client 주입 (네트워크 없음)
+# ============================================================
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from mindcastlib.configs import LLMConfig
+from mindcastlib.src.llm_utils import OpenAIBatchCaller
+
+
+def _truth(text):
+    return "기쁨" if "좋" in text else "분노"
+
+
+def _answer(prompt):
+    """packed 프롬프트면 JSON 배열, 단건이면 라벨 하나. 'broken' 이 섞인 packed 요청은 빈 배열."""
+    if prompt.endswith("라벨 JSON:"):
+        texts = [ln.split(". ", 1)[1] for ln in prompt.split("\n") if ln[:1].isdigit() and ". " in ln]
+        if any("broken" in t for t in texts):
+            return "[]"
+        return json.dumps([_truth(t) for t in texts], ensure_ascii=False)
+    return _truth(prompt.split("문장: ", 1)[1].rsplit("\n라벨:", 1)[0])
+
+
+class FakeBatchClient:
+    """
+    OpenAI client 의 files / batches 부분만 흉내냄.
+    - polls_needed 번째 retrieve 에서 completed (그 전에는 in_progress, None 이면 끝나지 않음)
+    - 단건 프롬프트에 'err' 가 있으면 error 파일로 500 응답
+    """
+
+    def __init__(self, polls_needed=2):
+        self.polls_needed = polls_needed
+        self.store = {}
+        self.jobs = {}
+        self.polls = {}
+        self.files = SimpleNamespace(create=self._file_create, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._batch_create, retrieve=self._batch_retrieve)
+
+    def _file_create(self, file, purpose):
+        assert purpose == "batch"
+        fid = f"file-{len(self.store)}"
+        self.store[fid] = file.read().decode("utf-8")
+        return SimpleNamespace(id=fid)
+
+    def _file_content(self, fid):
+        return SimpleNamespace(text=self.store[fid])
+
+    def _batch_create(self, input_file_id, endpoint, completion_window):
+        bid = f"batch-{len(self.jobs)}"
+        self.jobs[bid] = input_file_id
+        self.polls[bid] = 0
+        return SimpleNamespace(id=bid)
+
+    def _batch_retrieve(self, bid):
+        self.polls[bid] += 1
+        if self.polls_needed is None or self.polls[bid] < self.polls_needed:
+            return SimpleNamespace(id=bid, status="in_progress")
+
+        out, err = [], []
+        for line in self.store[self.jobs[bid]].splitlines():
+            req = json.loads(line)
+            prompt = req["body"]["messages"][0]["content"]
+            if "err" in prompt and not prompt.endswith("라벨 JSON:"):
+                err.append({"custom_id": req["custom_id"],
+                            "response": {"status_code": 500, "body": {"error": {"message": "server down"}}}})
+            else:
+                out.append({"custom_id": req["custom_id"], "error": None,
+                            "response": {"status_code": 200, "body": {
+                                "choices": [{"message": {"content": _answer(prompt)}}],
+                                "usage": {"prompt_tokens": 50, "completion_tokens": 5}}}})
+        self.store[f"out-{bid}"] = "\n".join(json.dumps(r, ensure_ascii=False) for r in out)
+        self.store[f"err-{bid}"] = "\n".join(json.dumps(r, ensure_ascii=False) for r in err)
+        return SimpleNamespace(id=bid, status="completed", output_file_id=f"out-{bid}", error_file_id=f"err-{bid}")
+
+
+def _caller(tmp_path, client, **overrides):
+    cfg = LLMConfig.CLASSIFY_SENTIMENT()
+    cfg.llm_name = "gpt4o"
+    cfg.batch_dir = str(tmp_path)
+    cfg.batch_poll_interval = 0.0
+    for k, v in overrides.items():
+        setattr(cfg, k, v)
+    return OpenAIBatchCaller(cfg, client=client)
+
+
+DATA = [f"좋은 하루 {i}" if i % 3 else f"나쁜 하루 {i}" for i in range(10)]
+EXPECTED = [_truth(t) for t in DATA]
+
+
+@pytest.mark.parametrize("pack_size", [1, 4])
+def test_batch_caller_maps_results_in_order(tmp_path, pack_size):
+    client = FakeBatchClient()
+    caller = _caller(tmp_path, client, pack_size=pack_size)
+    assert caller(DATA) == EXPECTED
+    assert len(client.jobs) == 1
+    assert caller.metrics.input_tokens == 50 * caller.metrics.requests
+    assert caller([]) == []
+
+
+def test_packed_parse_failure_falls_back_to_single_round(tmp_path):
+    client = FakeBatchClient()
+    caller = _caller(tmp_path, client, pack_size=4)
+    data = DATA[:4] + ["broken 좋"] + DATA[4:]
+    out = caller(data)
+    assert out == [_truth(t) for t in data]
+    # 1차 packed job + 2차 단건 job (broken 이 든 pack 4개 항목만)
+    assert len(client.jobs) == 2
+    assert caller.pack_stats["fallback_items"] == 4
+
+
+def test_error_rows_become_error_labels(tmp_path):
+    caller = _caller(tmp_path, FakeBatchClient())
+    out = caller(["좋아", "err 좋아", "싫어"])
+    assert out[0] == "기쁨" and out[2] == "분노"
+    assert out[1] == "[OpenAI 오류: server down]"
+    assert caller.metrics.request_errors == 1
+
+
+def test_timeout_then_resume_without_resubmit(tmp_path):
+    client = FakeBatchClient(polls_needed=None)
+    caller = _caller(tmp_path, client, batch_timeout=0.0)
+    out = caller(DATA)
+    assert all(lb.startswith("[OpenAI 배치 오류:") for lb in out)
+    assert len(client.jobs) == 1
+
+    # 같은 요청으로 재실행 → manifest 의 batch 를 이어서 polling, 재제출 없음
+    client.polls_needed = client.polls["batch-0"] + 2
+    caller = _caller(tmp_path, client)
+    assert caller(DATA) == EXPECTED
+    assert len(client.jobs) == 1
+
+
+def test_client_setup_failure(tmp_path, monkeypatch):
+    caller = _caller(tmp_path, None)
+    monkeypatch.setattr(caller, "_make_client", lambda: (_ for _ in ()).throw(RuntimeError("no key")))
+    with pytest.warns(UserWarning):
+        assert caller(["좋아", "싫어"]) == ["[OpenAI 연결 실패]"] * 2
@@ -0,0 +1,39 @@
+# ============================================================
+# 🧪 RoleAdapter.parse_packed — packed 응답 파싱 edge case
+# ============================================================
+import pytest
+
+from mindcastlib.configs import LLMConfig
+from mindcastlib.src.llm_utils import RoleAdapter
+
+
+@pytest.fixture(scope="module")
+def adapter():
+    return RoleAdapter(LLMConfig.CLASSIFY_SENTIMENT())
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ('["기쁨", "분노"]', ["기쁨", "분노"]),
+    ('결과: ["기쁨", "분노"] 입니다', ["기쁨", "분노"]),                       # 앞뒤 설명문
+    ('[{"id": 2, "label": "기쁨"}, {"id": 1, "label": "분노"}]', ["분노", "기쁨"]),   # id 순서로 복원
+    ('[{"id": "1", "label": "기쁨"}, {"id": "2", "label": "분노"}]', ["기쁨", "분노"]),
+    ('["기쁨", "행복"]', ["기쁨", ""]),                                       # 라벨 밖 → 해당 항목만 폴백
+    ('["기쁨", 3]', ["기쁨", ""]),
+])
+def test_parse_packed(adapter, raw, expected):
+    assert adapter.parse_packed(raw, 2) == expected
+
+
+@pytest.mark.parametrize("raw", [
+    "",
+    None,
+    "기쁨, 분노",                                                          # 배열 없음
+    '["기쁨", "분노"',                                                      # 깨진 JSON
+    '["기쁨"]',                                                            # 길이 불일치
+    '["기쁨", "분노", "슬픔"]',
+    '[{"id": 0, "label": "기쁨"}, {"id": 1, "label": "분노"}]',              # id 가 1..n 이 아님
+    '[{"id": 1, "label": "기쁨"}, {"id": 1, "label": "분노"}]',              # id 중복
+    '[{"id": 1, "label": "기쁨"}, {"label": "분노"}]',                       # id 누락
+])
+def test_parse_packed_rejects_untrusted_positions(adapter, raw):
+    assert adapter.parse_packed(raw, 2) == ["", ""]
@@ -0,0 +1,67 @@
+# ============================================================
+# 🧪 suicide index_mode — topk/faiss 판정이 dense 와 같은지 (번들 config)
+# ============================================================
+import pytest
+import torch
+import torch.nn.functional as F
+
+from mindcastlib.configs import DefaultModuleConfig
+from mindcastlib.src.suicide_utils import SimilaritySearchModel, SUBTAG_FLOOR
+
+from conftest import SAMPLE_TEXTS, SUICIDE_CONFIG, SUICIDE_CONFIG_ROOT
+
+
+@pytest.fixture(scope="module")
+def model(tiny_encoder_dir, tmp_path_factory):
+    cfg = DefaultModuleConfig().suicide_model.model_dump()
+    cfg.update({
+        "model_name": tiny_encoder_dir,
+        "current_date": SUICIDE_CONFIG,
+        "suicide_config_root": SUICIDE_CONFIG_ROOT,
+        "bow_root": str(tmp_path_factory.mktemp("bow")),
+        "embedding_store": None,
+    })
+    return SimilaritySearchModel(cfg)
+
+
+def _decisions(results):
+    return [(r["suicide_related"], r["keyword_mask"]) for r in results]
+
+
+@pytest.mark.parametrize("mode", ["topk", "faiss"])
+def test_index_mode_matches_dense(model, mode):
+    if mode == "faiss":
+        pytest.importorskip("faiss")
+        from mindcastlib.src.suicide_utils import FaissSubtagIndex
+        model.faiss_index = FaissSubtagIndex(model.bow_norm)
+
+    titles = SAMPLE_TEXTS + model.subtag_list
+    model.index_mode = "dense"
+    ref = model.predict(titles)
+    model.index_mode = mode
+    try:
+        out = model.predict(titles)
+    finally:
+        model.index_mode = "dense"
+    assert _decisions(out) == _decisions(ref)
+
+
+def test_topk_floors_unretrieved_keywords(model):
+    """후보에 없던 keyword 의 subtag 는 floor, 후보 keyword 의 subtag 는 dense 와 같은 값."""
+    token_emb, _, attn_mask = model._encode_titles(SAMPLE_TEXTS)
+    token_norm = F.normalize(token_emb, dim=-1)
+    exact = model._token_subtag_max(token_norm, attn_mask, mode="dense")
+
+    model.index_topk = 1
+    try:
+        approx = model._token_subtag_max(token_norm, attn_mask, mode="topk")
+    finally:
+        model.index_topk = DefaultModuleConfig().suicide_model.index_topk
+
+    rescored = approx > SUBTAG_FLOOR
+    assert rescored.any() and not rescored.all()
+    assert torch.allclose(approx[rescored], exact[rescored])
+    # keyword 단위로 전부 재계산되거나 전부 floor
+    for k in range(len(model.keywords)):
+        cols = rescored[:, model.keyword_of_subtag == k]
+        assert torch.equal(cols.all(dim=1), cols.any(dim=1))
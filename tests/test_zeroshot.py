@@ -0,0 +1,82 @@
+# ============================================================
+# 🧪 zeroshot_utils — NLIZeroShotEngine 이 HF pipeline 과 같은 결과인지, budget_batches 분할
+# ============================================================
+import random
+
+import pytest
+import torch
+
+from mindcastlib.src.zeroshot_utils import NLIZeroShotEngine, budget_batches
+
+from conftest import SAMPLE_TEXTS
+
+LABELS = ["기쁨", "슬픔", "분노", "불안"]
+TEMPLATE = "이 문장의 감정은 {}이다."
+
+
+@pytest.fixture(scope="module")
+def zsc(tiny_nli_dir):
+    from transformers import pipeline
+    return pipeline("zero-shot-classification", model=tiny_nli_dir, device=-1)
+
+
+@pytest.fixture(scope="module")
+def texts():
+    rng = random.Random(0)
+    words = " ".join(SAMPLE_TEXTS).split()
+    # 길이가 제각각인 문장 (budget 분할 / padding 경로)
+    return SAMPLE_TEXTS + [" ".join(rng.choices(words, k=rng.randint(1, 30))) for _ in range(40)]
+
+
+def _by_label(result):
+    return dict(zip(result["labels"], result["scores"]))
+
+
+@pytest.mark.parametrize("multi_label", [False, True])
+@pytest.mark.parametrize("token_budget", [64, 8192])
+def test_engine_matches_pipeline(zsc, texts, multi_label, token_budget):
+    ref = zsc(sequences=texts, candidate_labels=LABELS, hypothesis_template=TEMPLATE,
+              multi_label=multi_label, batch_size=8)
+    engine = NLIZeroShotEngine(zsc.tokenizer, zsc.model, token_budget=token_budget)
+    out = engine(texts, LABELS, TEMPLATE, multi_label=multi_label)
+
+    assert len(out) == len(ref)
+    for a, b in zip(out, ref):
+        assert a["sequence"] == b["sequence"]
+        sa, sb = _by_label(a), _by_label(b)
+        assert all(abs(sa[lb] - sb[lb]) < 1e-5 for lb in LABELS)
+        assert a["scores"] == sorted(a["scores"], reverse=True)
+
+
+def test_engine_single_and_empty(zsc):
+    engine = NLIZeroShotEngine(zsc.tokenizer, zsc.model)
+    one = engine(SAMPLE_TEXTS[0], LABELS, TEMPLATE)
+    assert isinstance(one, dict) and sorted(one["labels"]) == sorted(LABELS)
+    assert engine([], LABELS, TEMPLATE) == []
+
+
+# ------------------------------------------------------------
+# budget_batches
+# ------------------------------------------------------------
+@pytest.mark.parametrize("budget, max_batch", [(20, None), (64, None), (64, 3), (1, None)])
+def test_budget_batches_partition(budget, max_batch):
+    rng = random.Random(budget)
+    lengths = [rng.randint(1, 30) for _ in range(50)]
+    batches = budget_batches(lengths, budget, max_batch)
+
+    # 모든 index 가 정확히 한 번씩
+    assert sorted(i for b in batches for i in b) == list(range(len(lengths)))
+    for b in batches:
+        longest = max(lengths[i] for i in b)
+        # 단독 배치만 budget 초과 허용
+        assert len(b) * longest <= budget or len(b) == 1
+        if max_batch:
+            assert len(b) <= max_batch
+    # 길이 오름차순으로 이어짐 → 배치 간 길이 구간이 겹치지 않음
+    flat = [lengths[i] for b in batches for i in b]
+    assert flat == sorted(flat)
+
+
+def test_budget_batches_examples():
+    assert budget_batches([5, 1, 9, 3, 20], 20) == [[1, 3, 0], [2], [4]]
+    assert budget_batches([], 10) == []